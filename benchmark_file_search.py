@@ -0,0 +1,122 @@
+"""Benchmark spoken-query file search over a large catalog
+
+    python benchmark_file_search.py                 # 200,000 synthetic files
+    python benchmark_file_search.py --files 500000
+    python benchmark_file_search.py --root ~/       # crawl a real tree first
+
+Reports catalog lookup and ranking latency (p50/p95) and, for the synthetic
+catalog, how often the intended file is in the top 5 for fuzzy ranking
+versus exact keyword matching.
+"""
+import argparse
+import os
+import random
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "features"))
+
+from file_index import FileIndex
+from file_ranker import FileRanker, candidate_grams, query_tokens
+
+WORDS = ["budget", "invoice", "report", "notes", "resume", "contract", "summary", "draft", "final", "plan",
+         "letter", "receipt", "taxes", "project", "meeting", "schedule", "photos", "holiday", "thesis", "chapter",
+         "proposal", "design", "review", "travel", "insurance", "statement", "presentation", "lecture", "recipe",
+         "backup"]
+EXTENSIONS = ["pdf", "docx", "xlsx", "txt", "jpg", "png", "pptx", "csv", "zip", "mp3"]
+SPOKEN_YEARS = {2019: "twenty nineteen", 2020: "twenty twenty", 2021: "twenty twenty one",
+                2022: "twenty twenty two", 2023: "twenty twenty three", 2024: "twenty twenty four"}
+KINDS = {"xlsx": "spreadsheet", "csv": "spreadsheet", "docx": "document", "pdf": "document",
+         "pptx": "presentation", "jpg": "photo", "png": "photo"}
+
+
+def typo(word, rng):
+    """One dropped, doubled or swapped letter, as a recognizer or a user might produce"""
+    i = rng.randrange(1, len(word) - 1)
+    return rng.choice([word[:i] + word[i + 1:], word[:i] + word[i] + word[i:],
+                       word[:i] + word[i + 1] + word[i] + word[i + 2:]])
+
+
+def synthetic_rows(count, rng):
+    now = time.time()
+    for i in range(count):
+        first, second, third = rng.sample(WORDS, 3)
+        year = rng.choice(list(SPOKEN_YEARS))
+        name = f"{first.capitalize()} {second} {third} {year}.{rng.choice(EXTENSIONS)}"
+        directory = f"/home/user/{rng.choice(['Documents', 'Downloads', 'Desktop', 'Pictures'])}/{i % 997}"
+        yield f"{directory}/{i}-{name}", f"{i}-{name}" if i % 3 else name, rng.randrange(1, 10 ** 7), \
+            now - rng.randrange(0, 3 * 365) * 86400
+
+
+def spoken_query(name, rng):
+    """How a user would ask for a file: words, spoken year, maybe a kind word and a typo"""
+    stem, ext = os.path.splitext(name.split("-", 1)[-1])
+    first, second, third, year = stem.lower().split()
+    words = [first, typo(second, rng) if rng.random() < 0.5 else second, third, SPOKEN_YEARS[int(year)]]
+    if ext[1:] in KINDS:
+        words.insert(3, KINDS[ext[1:]])
+    return " ".join(words)
+
+
+def percentile(samples, p):
+    ordered = sorted(samples)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * p))] if ordered else 0.0
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--files", type=int, default=200_000, help="synthetic catalog size")
+    parser.add_argument("--queries", type=int, default=200)
+    parser.add_argument("--root", help="crawl this directory instead of using a synthetic catalog")
+    parser.add_argument("--seed", type=int, default=7)
+    args = parser.parse_args()
+    rng = random.Random(args.seed)
+
+    with tempfile.TemporaryDirectory() as db_dir:
+        index = FileIndex(os.path.join(db_dir, "files.sqlite3"))
+        started = time.perf_counter()
+        if args.root:
+            index.crawl(os.path.expanduser(args.root), background=False)
+            rows = index.files_in(os.path.expanduser(args.root))
+            targets = [rng.choice(rows) for _ in range(min(args.queries, len(rows)))]
+            queries = [(os.path.splitext(name)[0].replace("_", " "), path) for path, name, _, _ in targets]
+        else:
+            rows = list(synthetic_rows(args.files, rng))
+            for i in range(0, len(rows), 10_000):
+                index._upsert([row + (0,) for row in rows[i:i + 10_000]])
+            index.db.commit()
+            targets = rng.sample(rows, args.queries)
+            queries = [(spoken_query(name, rng), path) for path, name, _, _ in targets]
+        print(f"Catalog: {index.count():,} files in {time.perf_counter() - started:.1f}s")
+
+        ranker = FileRanker()
+        lookup_ms, rank_ms, exact_ms = [], [], []
+        fuzzy_hits = exact_hits = 0
+        for query, target in queries:
+            tokens = query_tokens(query)
+            started = time.perf_counter()
+            candidates = index.candidates(candidate_grams(tokens))
+            looked_up = time.perf_counter()
+            ranked = ranker.rank(tokens, candidates, limit=5)
+            done = time.perf_counter()
+            lookup_ms.append((looked_up - started) * 1000)
+            rank_ms.append((done - looked_up) * 1000)
+            fuzzy_hits += any(candidate[0] == target for _, candidate in ranked)
+
+            started = time.perf_counter()
+            exact = index.search(query.lower().split(), limit=5)
+            exact_ms.append((time.perf_counter() - started) * 1000)
+            exact_hits += any(row[0] == target for row in exact)
+
+        total = [a + b for a, b in zip(lookup_ms, rank_ms)]
+        print(f"Queries: {len(queries)}  e.g. {queries[0][0]!r}")
+        for label, samples in (("candidate lookup", lookup_ms), ("ranking", rank_ms), ("fuzzy total", total),
+                               ("exact keywords", exact_ms)):
+            print(f"  {label:<17} p50 {percentile(samples, 0.5):7.1f} ms   p95 {percentile(samples, 0.95):7.1f} ms")
+        print(f"  target in top 5: fuzzy {fuzzy_hits / len(queries):.0%}, exact {exact_hits / len(queries):.0%}")
+        index.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -1,15 +1,20 @@
 import os
+import hashlib
 import logging
 import google.generativeai as genai
 from PIL import Image
 import requests
 from dotenv import load_dotenv
 import time
-from quick_actions import QuickActions
-from search_control import SearchControl
-from browser_control import BrowserControl
-from spotify_control import SpotifyControl
-from camera_control import CameraControl
+from service_registry import services
+from intent_router import router
+from llm_cache import LLMCache, DEFAULT_DB_PATH, topic_policy
+from semantic_cache import SemanticCache
+from text_stream import prefetch, stream_paragraphs
+from llm_client import llm_client, LLMCancelled
+from llm_batcher import LLMBatcher
+from local_llm import OllamaClient, ModelRouter, ollama_options
+from single_flight import single_flight, fingerprint
 from datetime import datetime
 import re
 
@@ -20,6 +25,9 @@ load_dotenv()
 logging.getLogger('absl').setLevel(logging.ERROR)
 os.environ['GRPC_PYTHON_LOG_LEVEL'] = 'error'
 
+# Answers cached under these policies are long-form and always come from Gemini
+LONG_FORM_POLICIES = ("explain", "research")
+
 class AIServices:
     _instance = None
     _initialized = False
@@ -43,11 +51,8 @@ class AIServices:
                     "introduction": "Hi, I'm Vani, your AI assistant!"
                 }
                 
-                # Initialize services
+                # Initialize services (controls come from the shared registry on first use)
                 genai.configure(api_key=os.getenv('GEMINI_API_KEY'))
-                self.quick = QuickActions()
-                self.search = SearchControl()
-                self.browser = BrowserControl()
                 
                 # Configure models
                 self.gemini = genai.GenerativeModel('gemini-1.5-flash')
@@ -63,10 +68,21 @@ class AIServices:
                     "stop_sequences": ["."]
                 }
                 
-                # Initialize caches and services
-                self.prompt_cache = {}
-                self.spotify = SpotifyControl()
-                self.camera = CameraControl()
+                # Initialize caches (responses persist across restarts under .cache)
+                self.prompt_cache = LLMCache(db_path=DEFAULT_DB_PATH)
+                # Second tier: near-duplicate spoken prompts ("what's" vs "what is")
+                self.semantic_cache = SemanticCache(threshold=float(os.getenv('SEMANTIC_CACHE_THRESHOLD', '0.7')))
+                # Local model (Ollama) for short prompts, Gemini for the rest; each backs up the other
+                self.local_llm = OllamaClient()
+                self.router = ModelRouter(
+                    self.local_llm,
+                    cancel_errors=(LLMCancelled,),
+                    call=lambda fn, *args: llm_client.call(
+                        fn, *args, name="ollama", deadline=30, hedge=False, retries=0, rate_limit=False)
+                )
+                
+                # Short questions asked together share one request
+                self.batcher = LLMBatcher(self._send_batch, self.query_gemini)
                 self.flight_details = {}
                 
                 # Mark initialization complete
@@ -76,6 +92,39 @@ class AIServices:
                 print(f"Error initializing {self.name}: {str(e)}")
                 raise
 
+    # Shared controls, created by the service registry the first time they are used
+    @property
+    def quick(self):
+        return services.get("quick")
+
+    @property
+    def search(self):
+        return services.get("search")
+
+    @property
+    def browser(self):
+        return services.get("browser")
+
+    @property
+    def spotify(self):
+        return services.get("spotify")
+
+    @property
+    def camera(self):
+        return services.get("camera")
+
+    @property
+    def system(self):
+        return services.get("system")
+
+    @property
+    def files(self):
+        return services.get("files")
+
+    @property
+    def tts_service(self):
+        return services.get("tts")
+
     def create_subtasks(self, main_task):
         """Break down main task into subtasks using Gemini"""
         try:
@@ -89,10 +138,13 @@ class AIServices:
             
             Keep subtasks concise and specific."""
             
-            response = self.gemini.generate_content(
+            response = llm_client.call(
+                self.gemini.generate_content,
                 prompt,
-                    generation_config=self.generation_config
-                )
+                name="gemini.subtasks",
+                deadline=15,
+                generation_config=self.generation_config
+            )
             
             if response and hasattr(response, 'text'):
                 return response.text.strip()
@@ -105,24 +157,24 @@ class AIServices:
     def analyze_subtask(self, subtask):
         """Analyze subtask complexity using Ollama"""
         try:
-            payload = {
-                "model": "mistral",
-                "prompt": f"""Analyze this subtask and provide:
+            prompt = f"""Analyze this subtask and provide:
                 1. Estimated time to complete
                 2. Complexity level (Easy/Medium/Hard)
                 3. Key requirements
                 
                 Subtask: {subtask}
                 
-                Keep the response brief and structured.""",
-                "stream": False
-            }
+                Keep the response brief and structured."""
             
-            response = requests.post(self.ollama_url, json=payload)
-            if response.status_code == 200:
-                return response.json()['response']
-            return "Could not analyze subtask."
+            # Local model first; Gemini answers if Ollama is down or slow
+            text = self.router.generate(
+                prompt,
+                lambda: llm_client.call(self.gemini.generate_content, prompt, name="gemini.analyze", deadline=15).text
+            )
+            return text.strip() if text else "Could not analyze subtask."
             
+        except LLMCancelled:
+            return "Cancelled."
         except Exception as e:
             print(f"Error analyzing subtask: {str(e)}")
             return "Error analyzing subtask complexity."
@@ -135,8 +187,11 @@ class AIServices:
             
             Format as bullet points and keep suggestions specific and actionable."""
             
-            response = self.gemini.generate_content(
+            response = llm_client.call(
+                self.gemini.generate_content,
                 prompt,
+                name="gemini.suggestions",
+                deadline=15,
                 generation_config=self.generation_config
             )
             
@@ -148,17 +203,22 @@ class AIServices:
             print(f"Error getting suggestions: {str(e)}")
             return "Error generating subtask suggestions."
 
+    def _describe_image(self, image_path, prompt):
+        with Image.open(image_path) as image:
+            return llm_client.call(
+                self.vision_model.generate_content,
+                [prompt, image],
+                name="gemini.vision",
+                deadline=20
+            ).text
+
     def analyze_image(self, image_path, prompt):
         """Analyze image using Gemini Vision"""
         try:
-            # Load image
-            image = Image.open(image_path)
-            
-            # Generate response with Gemini Vision
-            response = self.vision_model.generate_content([
-                prompt,
-                image
-            ])
+            # The same picture and question already in flight share that request
+            with open(image_path, 'rb') as f:
+                key = fingerprint("gemini.vision", prompt, hashlib.sha256(f.read()).hexdigest())
+            text = single_flight.do(key, self._describe_image, image_path, prompt)
             
             # Clean up temporary image file
             try:
@@ -167,50 +227,175 @@ class AIServices:
             except:
                 pass
             
-            return response.text
+            return text
             
+        except LLMCancelled:
+            return "Cancelled."
         except Exception as e:
             print(f"Image analysis error: {e}")
             return "I had trouble analyzing that image."
 
-    def query_gemini(self, prompt, timeout=5):
-        """Query Gemini with caching"""
-        try:
-            # Check cache first
-            cache_key = prompt.lower().strip()
-            if cache_key in self.prompt_cache:
-                return self.prompt_cache[cache_key]
-            
-            # Generate new response
-            response = self.gemini.generate_content(
+    def _cached_response(self, prompt, cache_policy, config):
+        cached = self.prompt_cache.get(prompt, cache_policy, config)
+        if cached is None:
+            cached = self.semantic_cache.get(prompt, cache_policy, config)
+        return cached
+
+    def _generate(self, prompt, config, cache_policy, timeout):
+        """Uncached answer, stored in both cache tiers"""
+        # Short prompts may be answered by the local model
+        text = self.router.generate(
+            prompt,
+            lambda: llm_client.call(
+                self.gemini.generate_content,
                 prompt,
-                generation_config=self.generation_config
-            )
+                name="gemini.query",
+                deadline=timeout,
+                generation_config=config
+            ).text,
+            long_form=str(cache_policy) in LONG_FORM_POLICIES,
+            options=ollama_options(config)
+        )
+        if text:
+            self.prompt_cache.put(prompt, text, cache_policy, config)
+            self.semantic_cache.put(prompt, text, cache_policy, config)
+        return text
+
+    def query_gemini(self, prompt, timeout=10, generation_config=None, cache_policy="default", stream=False):
+        """Query Gemini with caching
+
+        timeout is the deadline in seconds, retries and hedged requests included.
+        generation_config overrides individual settings for this call.
+        cache_policy names a policy in llm_cache.POLICIES (e.g. "research" keeps
+        answers for a week); time-sensitive prompts are never cached.
+        With stream=True a generator of text chunks is returned instead.
+        """
+        if stream:
+            return self.stream_gemini(prompt, generation_config, cache_policy, timeout)
+        try:
+            config = dict(self.generation_config, **(generation_config or {}))
             
-            if response and hasattr(response, 'text'):
-                # Cache the response
-                self.prompt_cache[cache_key] = response.text
-                # Limit cache size
-                if len(self.prompt_cache) > 100:
-                    self.prompt_cache.pop(next(iter(self.prompt_cache)))
-            return response.text
+            # Check cache first
+            cached = self._cached_response(prompt, cache_policy, config)
+            if cached is not None:
+                return cached
             
-            return "Could not generate response"
+            # Identical prompts already in flight share that request
+            key = fingerprint("gemini.query", LLMCache.make_key(prompt, config), cache_policy)
+            text = single_flight.do(key, self._generate, prompt, config, cache_policy, timeout)
+            return text or "Could not generate response"
             
+        except LLMCancelled:
+            return "Cancelled."
         except Exception as e:
             print(f"Query error: {str(e)}")
             return f"Error generating response: {str(e)}"
 
+    def _send_batch(self, prompt):
+        """Raw reply to a batch prompt (a JSON array of answers)"""
+        config = dict(
+            self.generation_config,
+            stop_sequences=[],  # "." would cut the array off after the first answer
+            max_output_tokens=2048,
+            response_mime_type="application/json"
+        )
+        response = llm_client.call(
+            self.gemini.generate_content,
+            prompt,
+            name="gemini.batch",
+            deadline=20,
+            generation_config=config
+        )
+        return response.text
+
+    def answer_questions(self, questions, cache_policy="default"):
+        """Answers to several independent questions, in order
+
+        Cached answers are reused; short uncached questions go to Gemini as a
+        single batched request, long ones as concurrent individual queries.
+        """
+        config = self.generation_config
+        answers = [self._cached_response(q, cache_policy, config) for q in questions]
+        missing = [i for i, answer in enumerate(answers) if answer is None]
+        short = [i for i in missing if self.batcher.batchable(questions[i])]
+        long = [i for i in missing if i not in short]
+        
+        futures = {i: self.batcher.submit(questions[i]) for i in short}
+        for i, answer in zip(long, llm_client.map(
+                lambda q: self.query_gemini(q, cache_policy=cache_policy),
+                [questions[i] for i in long],
+                on_error=lambda q, e: f"Could not answer '{q}': {e}")):
+            answers[i] = answer
+        
+        for i, future in futures.items():
+            try:
+                answers[i] = future.result()
+            except LLMCancelled:
+                answers[i] = "Cancelled."
+            except Exception as e:
+                print(f"Batch query error: {e}")
+                answers[i] = f"Error generating response: {str(e)}"
+                continue
+            self.prompt_cache.put(questions[i], answers[i], cache_policy, config)
+            self.semantic_cache.put(questions[i], answers[i], cache_policy, config)
+        return answers
+
+    def stream_gemini(self, prompt, generation_config=None, cache_policy="default", timeout=10):
+        """Yield response text chunks as Gemini produces them
+
+        A cached answer is yielded as a single chunk; a fully received answer
+        is cached like query_gemini's.
+        """
+        config = dict(self.generation_config, **(generation_config or {}))
+        cached = self._cached_response(prompt, cache_policy, config)
+        if cached is not None:
+            yield cached
+            return
+        
+        def remote_stream():
+            response = llm_client.stream(
+                self.gemini.generate_content,
+                prompt,
+                name="gemini.stream",
+                deadline=timeout,
+                generation_config=config,
+                stream=True
+            )
+            for chunk in response:
+                text = getattr(chunk, 'text', '')
+                if text:
+                    yield text
+        
+        try:
+            parts = []
+            for text in self.router.stream(prompt, remote_stream, long_form=str(cache_policy) in LONG_FORM_POLICIES,
+                                           options=ollama_options(config)):
+                parts.append(text)
+                yield text
+        except LLMCancelled:
+            return
+        except Exception as e:
+            print(f"Query error: {str(e)}")
+            yield f"Error generating response: {str(e)}"
+            return
+        
+        full_text = "".join(parts)
+        self.prompt_cache.put(prompt, full_text, cache_policy, config)
+        self.semantic_cache.put(prompt, full_text, cache_policy, config)
+
     def handle_complex_task(self, task):
         """Handle multi-step tasks"""
         try:
             print(f"Processing complex task: {task}")
             task = task.lower()
 
+            match = router.match(task)
+            route = match.name if match else None
+
             # Browser Search Command
-            if "search on browser" in task or "search in browser" in task:
+            if route == "browser.search_and_explain":
                 # Extract search query
-                query = task.split("browser")[-1].strip()
+                query = match.slot("query")
                 print(f"Searching in browser: '{query}'")
                 
                 # Open Chrome and wait for it to load
@@ -232,14 +417,13 @@ class AIServices:
                 
                 Focus on core concepts and key points only."""
                 
-                explanation = self.query_gemini(prompt)
+                explanation = self.query_gemini(prompt, cache_policy=topic_policy(query, "explain"))
                 return f"Searched for '{query}' in browser\n\nBrief Overview:\n{explanation}"
 
             # 1. Open and Type Commands
-            if "open" in task and "type" in task:
-                full_command = task
-                app_part = full_command[full_command.find("open")+4:full_command.find("and type")].strip()
-                text_part = full_command[full_command.find("type")+4:].strip()
+            if route == "app.open_and_type":
+                app_part = match.slot("app")
+                text_part = match.slot("text")
                 
                 self.quick.open_application(app_part)
                 time.sleep(2)
@@ -247,41 +431,39 @@ class AIServices:
                 return f"Opened {app_part} and typed: {text_part}"
 
             # 2. Search Commands
-            elif "search for" in task or "google" in task:
-                query = task.split("for")[-1].strip() if "search for" in task else task.split("google")[-1].strip()
+            elif route == "search.google":
+                query = match.slot("query")
                 self.search.perform_search(query, "google")
                 return f"Searched for: {query}"
 
             # 3. Voice Control
-            elif "change voice" in task and "say" in task:
-                voice_type = "hinglish" if "hinglish" in task else "english"
-                text_to_say = task.split("say")[-1].strip()
+            elif route == "voice.change_and_say":
+                voice_type = "hinglish" if "hinglish" in match.slot("voice") else "english"
+                text_to_say = match.slot("text")
                 self.tts_service.change_voice(voice_type)
                 self.tts_service.speak(text_to_say)
                 return f"Changed voice to {voice_type} and speaking"
 
             # 4. System Controls
-            elif any(x in task for x in ["volume", "screenshot"]):
-                if "volume" in task:
-                    action = "increase" if "increase" in task else "decrease"
-                    self.system.adjust_volume(action)
-                    if "play" in task:
-                        song = task.split("play")[-1].strip()
-                        self.spotify.play_music(song)
-                    return f"{action}d volume and playing music"
-                else:
-                    filepath = self.system.take_screenshot()
-                    return "Screenshot taken and saved"
+            elif route in ("volume.up", "volume.down"):
+                action = "increase" if route == "volume.up" else "decrease"
+                self.system.adjust_volume(action)
+                if "play" in task:
+                    song = task.split("play")[-1].strip()
+                    self.spotify.play_music(song)
+                return f"{action}d volume and playing music"
+            elif route == "screenshot":
+                filepath = self.system.take_screenshot()
+                return "Screenshot taken and saved"
 
             # 5. File Operations
-            elif "files" in task:
-                if "find" in task or "search" in task:
-                    query = task.split("find")[-1].strip() if "find" in task else task.split("search")[-1].strip()
-                    self.files.search_in_explorer(query)
-                    return f"Searching for files: {query}"
+            elif route == "files.search":
+                query = match.slot("query")
+                self.files.search_in_explorer(query)
+                return f"Searching for files: {query}"
 
             # 6. Camera Commands
-            elif any(x in task for x in ["picture", "photo", "capture"]):
+            elif route in ("camera.photo", "camera.see", "camera.generic"):
                 image_path = self.camera.capture_image()
                 if "analyze" in task or "describe" in task:
                     analysis = self.analyze_image(image_path)
@@ -289,25 +471,20 @@ class AIServices:
                 return "Picture taken and saved"
 
             # 7. Browser Actions
-            elif "browser" in task or any(x in task for x in ["chrome", "firefox"]):
-                browser_name = "chrome" if "chrome" in task else "firefox"
+            elif route == "browser.go_to":
+                browser_name = "firefox" if "firefox" in task else "chrome"
                 self.quick.open_application(browser_name)
-                if "go to" in task:
-                    url = task.split("go to")[-1].strip()
-                    self.browser.navigate_to(url)
-                    return f"Opened {browser_name} and navigated to {url}"
+                url = match.slot("url")
+                self.browser.navigate_to(url)
+                return f"Opened {browser_name} and navigated to {url}"
 
             # 8. Music Controls
-            elif any(x in task for x in ["play", "music", "spotify"]):
+            elif match and match.intent == "music":
                 if "spotify" in task:
                     self.quick.open_application("spotify")
                     time.sleep(2)
-                if "play" in task:
-                    song = task.split("play")[-1].strip()
-                    self.spotify.play_music(song)
-                if "volume" in task:
-                    action = "increase" if "increase" in task else "decrease"
-                    self.system.adjust_volume(action)
+                if route == "music.play":
+                    self.spotify.play_music(match.slot("query"))
                 return "Music command executed"
 
             # Default: Break into subtasks
@@ -316,15 +493,10 @@ class AIServices:
                 if not subtasks:
                     return "Could not break down the task"
                 
-                results = []
-                for subtask in subtasks.split('\n'):
-                    if not subtask.strip():
-                        continue
-                    subtask = subtask.split('.', 1)[-1].strip()
-                    response = self.query_gemini(subtask)
-                    results.append(response)
+                lines = [line.split('.', 1)[-1].strip() for line in subtasks.split('\n') if line.strip()]
                 
-                return "\n".join(results)
+                # Independent subtasks: batched when short, concurrent otherwise; order is kept
+                return "\n".join(self.answer_questions(lines))
             
         except Exception as e:
             print(f"Error handling complex task: {e}")
@@ -360,11 +532,9 @@ class AIServices:
             Include relevant statistics and expert insights where applicable.
             """
             
-            # Set longer timeout for detailed research
-            response = self.query_gemini(prompt, timeout=30)
-            
-            if not response:
-                return "Could not generate research content"
+            # Start generating now; Word opens while the first paragraphs arrive
+            chunks = prefetch(self.query_gemini(prompt, timeout=30, cache_policy=topic_policy(topic, "research"),
+                                               stream=True))
             
             # Open Microsoft Word and prepare document
             print("Opening Microsoft Word...")
@@ -384,12 +554,16 @@ class AIServices:
             self.quick.simulate_typing(header, delay=0.02)
             time.sleep(0.3)
             
-            # Type main content in chunks for better reliability
-            chunks = response.split('\n\n')
-            for chunk in chunks:
-                self.quick.simulate_typing(chunk + '\n\n', delay=0.01)
+            # Type each paragraph as soon as it has been generated
+            typed = 0
+            for paragraph in stream_paragraphs(chunks):
+                self.quick.simulate_typing(paragraph + '\n\n', delay=0.01)
+                typed += 1
                 time.sleep(0.2)
             
+            if not typed:
+                return "Could not generate research content"
+            
             print("✅ Detailed research completed and typed!")
             return f"Completed comprehensive research on '{topic}'"
             
@@ -726,9 +900,10 @@ Current Market Prices:
     def cleanup(self):
         """Clean up resources properly"""
         try:
-            # Clean up Spotify
-            if hasattr(self, 'spotify'):
-                self.spotify.cleanup()
+            # Clean up Spotify (only if it was ever created)
+            spotify = services.peek("spotify")
+            if spotify:
+                spotify.cleanup()
                 
             # Other cleanup code...
             
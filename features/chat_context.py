@@ -0,0 +1,129 @@
+import threading
+from collections import deque
+
+
+def estimate_tokens(text):
+    """Rough Gemini token count (about four characters per token)"""
+    return (len(text or "") + 3) // 4
+
+
+def summary_prompt(previous, turns):
+    """Prompt folding evicted turns into the running summary"""
+    lines = [f"User: {user}\nAssistant: {model}" for user, model in turns]
+    return (
+        "Update the summary of this conversation between a user and their voice assistant, Vani. "
+        "Keep names, facts, preferences and open requests; drop small talk. "
+        "Reply with the updated summary only, in under 150 words.\n\n"
+        f"Current summary:\n{previous or '(none)'}\n\n"
+        "New exchanges:\n" + "\n\n".join(lines)
+    )
+
+
+class ChatContext:
+    """Rolling chat history kept within a token budget
+
+    The chat is rebuilt from: the system prompt plus a running summary of
+    older turns, followed by the last `keep_turns` turns verbatim. Turns
+    pushed out (by count or by the budget) are folded into the summary on a
+    background thread by summarize(prompt); until that finishes they stay in
+    the history verbatim, so nothing is lost while it runs.
+    """
+
+    def __init__(self, summarize, system_prompt="", budget=2000, keep_turns=6, summary_tokens=300):
+        self.summarize = summarize
+        self.system_prompt = system_prompt
+        self.budget = budget
+        self.keep_turns = keep_turns
+        self.summary_tokens = summary_tokens
+        self.summary = ""
+        self.turns = deque()  # (user, model) in order
+        self.pending = []  # evicted turns not yet in the summary
+        self.worker = None
+        self.summarizing = False
+        self.lock = threading.Lock()
+        self.counters = {"turns": 0, "summaries": 0, "summary_errors": 0, "dropped": 0}
+        self.sizes = deque(maxlen=50)  # history tokens sent with recent requests
+
+    @staticmethod
+    def _tokens(turns):
+        return sum(estimate_tokens(user) + estimate_tokens(model) for user, model in turns)
+
+    def add_turn(self, user, model):
+        with self.lock:
+            self.counters["turns"] += 1
+            self.turns.append((user, model))
+            limit = self.budget - min(self.summary_tokens, estimate_tokens(self.summary))
+            while len(self.turns) > self.keep_turns or (len(self.turns) > 1 and self._tokens(self.turns) > limit):
+                self.pending.append(self.turns.popleft())
+            # If summaries keep failing, the oldest unsummarized turns go
+            while self.pending and self._tokens(self.pending) > self.budget:
+                self.pending.pop(0)
+                self.counters["dropped"] += 1
+        self._start_summary()
+
+    def _start_summary(self):
+        with self.lock:
+            if not self.pending or self.summarizing:
+                return
+            self.summarizing = True
+            self.worker = threading.Thread(target=self._summarize, name="chat-summary", daemon=True)
+            self.worker.start()
+
+    def _summarize(self):
+        while True:
+            with self.lock:
+                if not self.pending:
+                    self.summarizing = False
+                    return
+                batch, previous = list(self.pending), self.summary
+            try:
+                summary = (self.summarize(summary_prompt(previous, batch)) or "").strip()
+            except Exception as e:
+                print(f"Chat summary error: {e}")
+                summary = ""
+            with self.lock:
+                if not summary:
+                    self.counters["summary_errors"] += 1
+                    self.summarizing = False  # retried after the next turn
+                    return
+                self.summary = summary[:self.summary_tokens * 4]
+                folded = {id(turn) for turn in batch}
+                self.pending = [turn for turn in self.pending if id(turn) not in folded]
+                self.counters["summaries"] += 1
+
+    def wait(self, timeout=None):
+        """Block until a running summary refresh finishes"""
+        worker = self.worker
+        if worker:
+            worker.join(timeout)
+
+    def history(self):
+        """Chat history entries for GenerativeModel.start_chat"""
+        with self.lock:
+            intro = self.system_prompt
+            if self.summary:
+                intro += f"\n\nSummary of our conversation so far:\n{self.summary}"
+            turns = self.pending + list(self.turns)
+        entries = []
+        if intro.strip():
+            entries += [{"role": "user", "parts": [intro.strip()]}, {"role": "model", "parts": ["Understood."]}]
+        for user, model in turns:
+            entries += [{"role": "user", "parts": [user]}, {"role": "model", "parts": [model]}]
+        self.sizes.append(sum(estimate_tokens(entry["parts"][0]) for entry in entries))
+        return entries
+
+    def clear(self):
+        with self.lock:
+            self.summary = ""
+            self.turns.clear()
+            self.pending = []
+
+    def stats(self):
+        with self.lock:
+            return dict(
+                self.counters,
+                verbatim_turns=len(self.turns) + len(self.pending),
+                summary_tokens=estimate_tokens(self.summary),
+                max_history_tokens=max(self.sizes, default=0),
+                avg_history_tokens=round(sum(self.sizes) / len(self.sizes)) if self.sizes else 0
+            )
@@ -1,38 +1,34 @@
 import os
-from typing import Dict, List, Optional, Tuple
-from browser_control import BrowserControl
-from spotify_control import SpotifyControl
-from system_control import SystemControl
-from quick_actions import QuickActions
-from camera_control import CameraControl
-from ai_services import AIServices
+from typing import Callable, Dict, List, Optional, Tuple
+from service_registry import services
+from intent_router import router, RouteMatch
 
 class CommandHandler:
     def __init__(self):
-        # Initialize all services
-        self.browser = BrowserControl()
-        self.spotify = SpotifyControl()
-        self.system = SystemControl()
-        self.quick = QuickActions()
-        self.camera = CameraControl()
-        self.ai_services = AIServices()
-        
+        # Controls are shared through the service registry and created on first use
         # Set up command history directory
         self.history_dir = os.path.join(os.path.dirname(__file__), 'data', 'command_history')
         os.makedirs(self.history_dir, exist_ok=True)
         
-        # Command patterns with typing command added
-        self.command_patterns: Dict[str, List[str]] = {
-            'play': ['play', 'start music', 'start playing'],
-            'stop': ['stop', 'pause', 'end'],
-            'volume': ['volume up', 'volume down', 'increase volume', 'decrease volume'],
-            'search': ['search', 'look up', 'find'],
-            'open': ['open', 'launch', 'start'],
-            'close': ['close', 'exit', 'quit'],
-            'camera': ['take photo', 'what do you see', 'capture'],
-            'research': ['research', 'study', 'investigate'],
-            'compare': ['compare prices', 'compare flights'],
-            'type': ['type', 'write']
+        # What this handler does with each route from the shared routing table
+        self.route_handlers: Dict[str, Callable[[RouteMatch], Optional[str]]] = {
+            'music.play': lambda m: self.spotify.play_music(m.slot('query')),
+            'music.play_youtube': lambda m: self.browser.play_youtube(m.slot('query')),
+            'music.pause': lambda m: self._stop_all(),
+            'stop': lambda m: self._stop_all(),
+            'volume.up': lambda m: self.system.increase_volume(),
+            'volume.down': lambda m: self.system.decrease_volume(),
+            'search.youtube': lambda m: self.browser.search_youtube(m.slot('query')),
+            'search.google': lambda m: self.browser.search_google(m.slot('query')),
+            'app.open': lambda m: self.quick.open_application(m.slot('app')),
+            'app.start': lambda m: self.quick.open_application(m.slot('app')),
+            'app.close': lambda m: self.quick.close_application(m.slot('app')),
+            'camera.see': lambda m: self.camera.analyze_view(),
+            'camera.photo': lambda m: self.camera.take_photo(),
+            'research': lambda m: self.ai_services.handle_research_task(m.slot('topic')),
+            'flight': lambda m: self.ai_services.handle_flight_comparison(m.text),
+            'price': lambda m: self.ai_services.handle_price_comparison(m.slot('product')),
+            'type': lambda m: self.quick.type_text(m.slot('text')),
         }
         
         # Command history with timestamps
@@ -41,6 +37,30 @@ class CommandHandler:
         self.history_file = os.path.join(self.history_dir, 'history.txt')
         self._load_history()
 
+    @property
+    def browser(self):
+        return services.get("browser")
+
+    @property
+    def spotify(self):
+        return services.get("spotify")
+
+    @property
+    def system(self):
+        return services.get("system")
+
+    @property
+    def quick(self):
+        return services.get("quick")
+
+    @property
+    def camera(self):
+        return services.get("camera")
+
+    @property
+    def ai_services(self):
+        return services.get("ai_services")
+
     def _load_history(self) -> None:
         """Load command history from file"""
         try:
@@ -70,15 +90,9 @@ class CommandHandler:
             # Add to history
             self.add_to_history(text)
             
-            # Check for type command first
-            if text.startswith('type '):
-                content = text[5:].strip()  # Remove 'type ' from the start
-                return self.quick.type_text(content)
-            
-            # Check each command pattern
-            for cmd_type, patterns in self.command_patterns.items():
-                if any(pattern in text for pattern in patterns):
-                    return self.route_command(cmd_type, text)
+            match = router.match(text)
+            if match and match.name in self.route_handlers:
+                return self.route_command(match)
                     
             return None
             
@@ -86,74 +100,18 @@ class CommandHandler:
             print(f"Command execution error: {e}")
             return f"Error executing command: {str(e)}"
 
-    def route_command(self, cmd_type: str, text: str) -> Optional[str]:
+    def route_command(self, match: RouteMatch) -> Optional[str]:
         """Route command to appropriate handler"""
         try:
-            if cmd_type == 'play':
-                if 'youtube' in text:
-                    query = text.replace('play', '').replace('on youtube', '').strip()
-                    from browser_control import browser
-                    return browser.play_youtube(query)
-                else:
-                    query = text.replace('play', '').strip()
-                    from spotify_control import spotify
-                    return spotify.play_music(query)
-                    
-            elif cmd_type == 'stop':
-                from ollama_integration import handle_stop_command
-                return handle_stop_command()
-                
-            elif cmd_type == 'volume':
-                from system_control import system
-                if any(word in text for word in ['up', 'increase']):
-                    return system.increase_volume()
-                return system.decrease_volume()
-                
-            elif cmd_type == 'search':
-                from browser_control import browser
-                if 'youtube' in text:
-                    query = text.replace('search', '').replace('on youtube', '').strip()
-                    return browser.search_youtube(query)
-                query = text.replace('search', '').replace('on google', '').strip()
-                return browser.search_google(query)
-                
-            elif cmd_type == 'open':
-                from quick_actions import quick
-                app = text.replace('open', '').strip()
-                return quick.open_application(app)
-                
-            elif cmd_type == 'close':
-                from quick_actions import quick
-                app = text.replace('close', '').strip()
-                return quick.close_application(app)
-                
-            elif cmd_type == 'camera':
-                from camera_control import camera
-                if 'what do you see' in text:
-                    return camera.analyze_view()
-                return camera.take_photo()
-                
-            elif cmd_type == 'research':
-                from ai_services import ai_services
-                topic = text.replace('research', '').strip()
-                return ai_services.handle_research_task(topic)
-                
-            elif cmd_type == 'compare':
-                from ai_services import ai_services
-                if 'flight' in text:
-                    return ai_services.handle_flight_comparison(text)
-                return ai_services.handle_price_comparison(text)
-                
-            elif cmd_type == 'type':
-                content = text.replace('type', '', 1).strip()  # Remove first occurrence of 'type'
-                return self.quick.type_text(content)
-                
-            return None
-            
+            return self.route_handlers[match.name](match)
         except Exception as e:
             print(f"Command routing error: {e}")
             return f"Error routing command: {str(e)}"
 
+    def _stop_all(self):
+        from ollama_integration import handle_stop_command
+        return handle_stop_command()
+
     def add_to_history(self, command: str) -> None:
         """Add command to history with timestamp and save"""
         import time
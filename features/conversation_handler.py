@@ -2,10 +2,15 @@ import google.generativeai as genai
 import os
 import time
 from dotenv import load_dotenv
-from conversation_manager import ConversationManager
 from subprocess_handler import SubprocessHandler
-from ai_services import AIServices
-from command_handler import CommandHandler
+from service_registry import services
+from text_stream import prefetch, split_sentences, stream_paragraphs, stream_sentences
+from llm_client import llm_client, LLMCancelled
+from chat_context import ChatContext
+from speculative_prefetch import SpeculativePrefetcher
+
+# Chat sends change the session history, so they are never hedged or retried
+CHAT_DEADLINE = 20
 import pyautogui
 import PIL.Image
 import keyboard
@@ -17,12 +22,11 @@ class ConversationHandler:
             load_dotenv()
             
             # Initialize services first
-            self.ai_services = ai_services or AIServices()
+            self.ai_services = ai_services or services.get("ai_services")
             
-            # Initialize managers and handlers
-            self.conversation_manager = ConversationManager(self.ai_services)
+            # Initialize managers and handlers (command handler is shared via the registry)
+            self.conversation_manager = services.get("conversation_manager")
             self.subprocess_handler = SubprocessHandler(self.ai_services, self)
-            self.command_handler = CommandHandler()
             
             # Set AI personality
             self.personality = """You are Vani, a friendly and helpful AI assistant.
@@ -30,14 +34,34 @@ class ConversationHandler:
             Keep answers concise but engaging.
             Remember context from our conversation."""
             
+            # Chat history is rebuilt from a token-budgeted context before each send;
+            # the personality is part of it, so no priming round-trip is needed.
+            # Created before Gemini so the context can be set even when Gemini is down.
+            self.chat = None
+            self.context = ChatContext(self._summarize, system_prompt=self.personality)
+            
             # Try to initialize Gemini with retry
             self.initialize_gemini()
             
+            # Optional: answer likely follow-ups in the background while replies are spoken
+            self.prefetcher = None
+            self.speculated_turn = None
+            if os.getenv('SPECULATIVE_PREFETCH', '0') == '1' and self.chat:
+                self.prefetcher = SpeculativePrefetcher(
+                    self._speculative_reply,
+                    can_run=lambda: llm_client.limiter.available() >= 2  # leave quota for real requests
+                )
+            
         except Exception as e:
             print(f"Error initializing conversation handler: {e}")
             # Continue without Gemini if it fails
             self.model = None
             self.chat = None
+            self.prefetcher = None
+
+    @property
+    def command_handler(self):
+        return services.get("command_handler")
 
     def initialize_gemini(self, max_retries=3):
         """Initialize Gemini API with retry logic"""
@@ -59,9 +83,7 @@ class ConversationHandler:
                     'stop_sequences': ["."]
                 }
                 
-                # Initialize chat
-                self.chat = self.model.start_chat(history=[])
-                self.chat.send_message(self.personality)
+                self.chat = self.model.start_chat(history=self.context.history())
                 return True
                 
             except Exception as e:
@@ -71,8 +93,77 @@ class ConversationHandler:
         print("Failed to initialize Gemini after all retries")
         return False
 
-    def process_user_input(self, text: str) -> str:
-        """Process user input - both commands and conversation"""
+    def _summarize(self, prompt):
+        """Summary of older turns for the chat context (runs in the background)"""
+        return llm_client.call(self.model.generate_content, prompt, name="gemini.summary",
+                               deadline=30, retries=1).text
+
+    def _rebuild_chat(self):
+        """Fresh chat session holding only the budgeted context"""
+        self.chat = self.model.start_chat(history=self.context.history())
+        return self.chat
+
+    def _send(self, text, deadline=CHAT_DEADLINE, **kwargs):
+        """chat.send_message under a deadline, cancellable by the stop command"""
+        chat = self._rebuild_chat()
+        response = llm_client.call(chat.send_message, text, name="gemini.chat",
+                                   deadline=deadline, hedge=False, retries=0, **kwargs)
+        self.context.add_turn(text, response.text)
+        return response
+
+    def _send_streaming(self, text, deadline=CHAT_DEADLINE, **kwargs):
+        """Streamed chat.send_message; deadline covers the request, not the whole reply
+
+        The turn is added to the context once the whole reply has arrived.
+        """
+        chat = self._rebuild_chat()
+        parts = []
+        for chunk in llm_client.stream(chat.send_message, text, name="gemini.chat",
+                                       deadline=deadline, retries=0, stream=True, **kwargs):
+            parts.append(getattr(chunk, 'text', ''))
+            yield chunk
+        self.context.add_turn(text, "".join(parts))
+
+    def _speculative_reply(self, prompt):
+        """Reply prompt would get next, without adding it to the context"""
+        chat = self.model.start_chat(history=self.context.history())
+        return llm_client.call(chat.send_message, prompt, name="gemini.speculative", deadline=CHAT_DEADLINE,
+                               hedge=False, retries=0, generation_config=self.generation_config).text
+
+    def _speculate(self, reply):
+        """Prefetch likely follow-ups to reply while it is being spoken"""
+        if self.prefetcher and reply:
+            self.speculated_turn = self.context.counters["turns"]
+            self.prefetcher.speculate(reply, self.conversation_manager.context.get('current_topic'))
+
+    def _prefetched_reply(self, text, on_sentence=None):
+        """Prefetched reply to text if it was predicted, added to the context like a real one"""
+        if not self.prefetcher or self.context.counters["turns"] != self.speculated_turn:
+            return None  # no prediction, or the conversation moved on since
+        reply = self.prefetcher.take(text)
+        if not reply:
+            return None
+        self.context.add_turn(text, reply)
+        if on_sentence:
+            for sentence in split_sentences(reply):
+                on_sentence(sentence)
+        return reply
+
+    @staticmethod
+    def _chunk_texts(response):
+        """Text of each chunk of a streamed Gemini response"""
+        for chunk in response:
+            text = getattr(chunk, 'text', '')
+            if text:
+                yield text
+
+    def process_user_input(self, text: str, on_sentence=None) -> str:
+        """Process user input - both commands and conversation
+
+        With on_sentence, a Gemini chat reply is streamed and each sentence is
+        passed on (e.g. to TTS) as soon as it is complete; the full reply is
+        still returned.
+        """
         try:
             # Handle "what do you see" command first
             if "what do you see" in text.lower():
@@ -111,9 +202,9 @@ class ConversationHandler:
                 Make it detailed and engaging."""
                 
                 try:
-                    # Get content first
+                    # Stream the essay; Word opens and typing starts while it generates
                     print("Generating content...")
-                    response = self.chat.send_message(prompt).text
+                    response = prefetch(self._chunk_texts(self._send_streaming(prompt)))
                     
                     # Create and type in document
                     if self.create_word_document(topic, response):
@@ -150,11 +241,32 @@ class ConversationHandler:
             # Try Gemini if available
             if self.chat:
                 try:
-                    response = self.chat.send_message(
+                    response = self._prefetched_reply(text, on_sentence)
+                    if response:
+                        self._speculate(response)
+                        return response
+                    
+                    if on_sentence:
+                        stream = self._send_streaming(
+                            text,
+                            generation_config=self.generation_config
+                        )
+                        sentences = []
+                        for sentence in stream_sentences(self._chunk_texts(stream)):
+                            on_sentence(sentence)
+                            sentences.append(sentence)
+                        response = " ".join(sentences)
+                        self._speculate(response)
+                        return response
+                    
+                    response = self._send(
                         text,
                         generation_config=self.generation_config
                     ).text
+                    self._speculate(response)
                     return response
+                except LLMCancelled:
+                    return "Cancelled."
                 except Exception as e:
                     print(f"Gemini error: {e}")
             
@@ -172,7 +284,7 @@ class ConversationHandler:
             text = text.strip()
             
             # Get response from Gemini
-            response = self.chat.send_message(text)
+            response = self._send(text)
             
             return response.text
             
@@ -200,7 +312,7 @@ class ConversationHandler:
                 try:
                     # Get content first - don't speak it
                     print("Generating content...")
-                    response = self.chat.send_message(prompt).text
+                    response = self._send(prompt, deadline=60).text
                     
                     # Open Word and create new document
                     print("Opening Microsoft Word...")
@@ -289,7 +401,7 @@ class ConversationHandler:
     def get_response(self, user_input):
         """Get AI response with sentiment-aware context"""
         try:
-            response = self.chat.send_message(
+            response = self._send(
                 user_input,
                 generation_config=self.generation_config
             )
@@ -308,10 +420,8 @@ class ConversationHandler:
         4. Occasionally use emojis for warmth
         """
         
-        try:
-            self.chat.send_message(context, generation_config=self.generation_config)
-        except Exception as e:
-            print(f"Context setup error: {e}")
+        # Becomes the start of every rebuilt chat instead of a message of its own
+        self.context.system_prompt = context
 
     def analyze_image(self, image_path):
         """Analyze image using Gemini Vision"""
@@ -330,8 +440,11 @@ class ConversationHandler:
             Keep the description natural and clear."""
             
             # Use gemini-1.5-flash-vision model specifically for vision tasks
-            response = self.vision_model.generate_content(
+            response = llm_client.call(
+                self.vision_model.generate_content,
                 [prompt, image],
+                name="gemini.vision",
+                deadline=20,
                 generation_config={
                     'temperature': 0.7,
                     'top_p': 0.9,
@@ -357,7 +470,11 @@ class ConversationHandler:
             return "I had trouble analyzing that image. Please try again."
 
     def create_word_document(self, topic, content):
-        """Create and type content in Word document"""
+        """Create and type content in Word document
+
+        content is the full text or an iterable of streamed text chunks; chunks
+        are typed paragraph by paragraph as they complete.
+        """
         try:
             print("Opening Microsoft Word...")
             # Use the quick actions to open Word
@@ -385,7 +502,7 @@ class ConversationHandler:
             
             # Type content in paragraphs
             print("Writing content...")
-            paragraphs = content.split('\n\n')
+            paragraphs = content.split('\n\n') if isinstance(content, str) else stream_paragraphs(content)
             for paragraph in paragraphs:
                 if paragraph.strip():
                     self.ai_services.quick.type_text(paragraph.strip() + '\n\n')
@@ -2,6 +2,68 @@ import time
 from collections import deque
 import json
 import os
+from intent_router import router
+
+# Response templates for natural conversation
+RESPONSE_TEMPLATES = {
+    'greetings': [
+        "Hey there! What's on your mind?",
+        "Hi! What can I help you with today?",
+        "Hey! What's up?"
+    ],
+    'farewells': [
+        "Catch you later! Don't be a stranger!",
+        "Take care! I'll be here when you need me!",
+        "See ya! Come back anytime!"
+    ],
+    'thanks': [
+        "No worries at all!",
+        "Anytime! That's what I'm here for!",
+        "You got it! Need anything else?"
+    ],
+    'music': [
+        "Let's get some tunes going! {action}",
+        "Good choice! {action}",
+        "Coming right up! {action}"
+    ],
+    'research': [
+        "I'm on it! Let me dig into that for you! {action}",
+        "Let's find out more about that! {action}",
+        "I'll check that out real quick! {action}"
+    ],
+    'camera': [
+        "Say cheese! {action}",
+        "Let's capture this moment! {action}",
+        "Ready when you are! {action}"
+    ],
+    'emotions': {
+        'happy': "That's great to hear! You're making me smile too!",
+        'sad': "Hey, we all have those days. Wanna talk about it?",
+        'tired': "Need a break? We could play some chill music!",
+        'excited': "Your energy is contagious! Tell me more!",
+        'bored': "Let's fix that! Want to try something fun?"
+    },
+    'casual_chat': [
+        "Just hanging out, ready to help! What's new?",
+        "All good here! What's on your mind?",
+        "Ready to make your day easier! What do you need?"
+    ],
+    'encouragement': [
+        "You've totally got this! Need a hand?",
+        "Baby steps! What should we tackle first?",
+        "Everyone starts somewhere! Let's figure this out together!"
+    ]
+}
+
+
+def template_phrases():
+    """Every fixed response (templates without placeholders), for TTS warm-up"""
+    phrases = []
+    for templates in RESPONSE_TEMPLATES.values():
+        values = templates.values() if isinstance(templates, dict) else templates
+        phrases.extend(phrase for phrase in values if "{" not in phrase)
+    return phrases
+
 
 class ConversationManager:
     def __init__(self, ai_services):
@@ -18,15 +80,7 @@ class ConversationManager:
             }
         }
         
-        # Intent patterns
-        self.intents = {
-            'music': ['play', 'pause', 'song', 'track', 'spotify'],
-            'research': ['research', 'find', 'search', 'look up'],
-            'camera': ['photo', 'picture', 'record', 'capture'],
-            'price': ['price', 'cost', 'compare', 'cheaper'],
-            'flight': ['flight', 'travel', 'trip', 'book'],
-            'help': ['help', 'how to', 'what can', 'explain']
-        }
+        # Intents come from the shared routing table (see intent_router.ROUTES)
         
         # Load conversation memory if exists
         self.memory_file = 'conversation_memory.json'
@@ -51,55 +105,7 @@ class ConversationManager:
         }
         
         # Response templates for natural conversation
-        self.response_templates = {
-            'greetings': [
-                "Hey there! What's on your mind?",
-                "Hi! What can I help you with today?",
-                "Hey! What's up?"
-            ],
-            'farewells': [
-                "Catch you later! Don't be a stranger!",
-                "Take care! I'll be here when you need me!",
-                "See ya! Come back anytime!"
-            ],
-            'thanks': [
-                "No worries at all!",
-                "Anytime! That's what I'm here for!",
-                "You got it! Need anything else?"
-            ],
-            'music': [
-                "Let's get some tunes going! {action}",
-                "Good choice! {action}",
-                "Coming right up! {action}"
-            ],
-            'research': [
-                "I'm on it! Let me dig into that for you! {action}",
-                "Let's find out more about that! {action}",
-                "I'll check that out real quick! {action}"
-            ],
-            'camera': [
-                "Say cheese! {action}",
-                "Let's capture this moment! {action}",
-                "Ready when you are! {action}"
-            ],
-            'emotions': {
-                'happy': "That's great to hear! You're making me smile too!",
-                'sad': "Hey, we all have those days. Wanna talk about it?",
-                'tired': "Need a break? We could play some chill music!",
-                'excited': "Your energy is contagious! Tell me more!",
-                'bored': "Let's fix that! Want to try something fun?"
-            },
-            'casual_chat': [
-                "Just hanging out, ready to help! What's new?",
-                "All good here! What's on your mind?",
-                "Ready to make your day easier! What do you need?"
-            ],
-            'encouragement': [
-                "You've totally got this! Need a hand?",
-                "Baby steps! What should we tackle first?",
-                "Everyone starts somewhere! Let's figure this out together!"
-            ]
-        }
+        self.response_templates = RESPONSE_TEMPLATES
 
     def process_input(self, user_input):
         """Process user input with context awareness"""
@@ -134,12 +140,9 @@ class ConversationManager:
 
     def detect_intent(self, text):
         """Detect user intent from input"""
-        text = text.lower()
-        
-        # Check against intent patterns
-        for intent, patterns in self.intents.items():
-            if any(pattern in text for pattern in patterns):
-                return intent
+        match = router.match(text)
+        if match and match.intent:
+            return match.intent
                 
         # Check context for ongoing conversation
         if self.context['current_topic']:
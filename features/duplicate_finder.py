@@ -0,0 +1,200 @@
+import concurrent.futures
+import hashlib
+import os
+import sqlite3
+import threading
+import time
+from collections import defaultdict
+
+from file_index import CACHE_DIR
+
+DEFAULT_DB_PATH = os.path.join(CACHE_DIR, "file_hashes.sqlite3")
+
+EDGE_BYTES = 64 * 1024  # read from each end of a file for the partial hash
+CHUNK_BYTES = 1024 * 1024
+
+
+class HashCache:
+    """Partial and full file hashes, valid while a file's size and mtime are unchanged"""
+
+    def __init__(self, db_path=DEFAULT_DB_PATH):
+        if db_path != ":memory:":
+            os.makedirs(os.path.dirname(db_path), exist_ok=True)
+        self.lock = threading.Lock()
+        self.db = sqlite3.connect(db_path, check_same_thread=False)
+        self.db.execute("PRAGMA journal_mode=WAL")
+        self.db.execute("PRAGMA synchronous=NORMAL")
+        self.db.execute(
+            "CREATE TABLE IF NOT EXISTS hashes ("
+            "path TEXT PRIMARY KEY, size INTEGER NOT NULL, mtime REAL NOT NULL, partial TEXT, full TEXT)"
+        )
+        self.db.commit()
+
+    def get(self, path, size, mtime):
+        """(partial, full) for the file as it is now, either may be None"""
+        with self.lock:
+            row = self.db.execute("SELECT size, mtime, partial, full FROM hashes WHERE path = ?", (path,)).fetchone()
+        if row and row[0] == size and row[1] == mtime:
+            return row[2], row[3]
+        return None, None
+
+    def put(self, rows):
+        """Store (path, size, mtime, partial, full) rows; a None hash keeps the stored one"""
+        with self.lock:
+            self.db.executemany(
+                "INSERT INTO hashes (path, size, mtime, partial, full) VALUES (?, ?, ?, ?, ?) "
+                "ON CONFLICT(path) DO UPDATE SET "
+                "partial = coalesce(excluded.partial, CASE WHEN size = excluded.size AND mtime = excluded.mtime "
+                "THEN partial END), "
+                "full = coalesce(excluded.full, CASE WHEN size = excluded.size AND mtime = excluded.mtime "
+                "THEN full END), "
+                "size = excluded.size, mtime = excluded.mtime",
+                rows,
+            )
+            self.db.commit()
+
+    def count(self):
+        with self.lock:
+            return self.db.execute("SELECT COUNT(*) FROM hashes").fetchone()[0]
+
+    def close(self):
+        with self.lock:
+            self.db.close()
+
+
+def partial_hash(path, size):
+    """Hash of the first and last EDGE_BYTES; the whole file when it is no longer than both"""
+    digest = hashlib.blake2b(digest_size=16)
+    with open(path, "rb") as f:
+        digest.update(f.read(EDGE_BYTES))
+        if size > 2 * EDGE_BYTES:
+            f.seek(-EDGE_BYTES, os.SEEK_END)
+        digest.update(f.read(EDGE_BYTES))
+    return digest.hexdigest()
+
+
+def full_hash(path):
+    digest = hashlib.blake2b(digest_size=16)
+    buffer = bytearray(CHUNK_BYTES)
+    view = memoryview(buffer)
+    with open(path, "rb", buffering=0) as f:
+        while True:
+            read = f.readinto(buffer)
+            if not read:
+                break
+            digest.update(view[:read])
+    return digest.hexdigest()
+
+
+class DuplicateFinder:
+    """Finds files with identical content in stages, reading as little as possible
+
+    Files are grouped by size; only sizes shared by two or more files are
+    read. Those get a partial hash of their first and last 64 KB, and only
+    files still sharing a partial hash are hashed in full (BLAKE2b, streamed
+    in 1 MB chunks). Files no longer than 128 KB are read whole by the
+    partial hash, so they skip the last stage. Hashing runs on a thread
+    pool, and hashes are cached by (path, size, mtime), so a re-run only
+    reads files that are new or changed. Sizes and mtimes come from a fresh
+    stat, never from the caller's listing, so a stale catalog cannot bring
+    back the hash of an older version of a file.
+    """
+
+    def __init__(self, cache=None, workers=8):
+        self.cache = cache or HashCache()
+        self.workers = workers
+        self.counters = {"runs": 0, "files": 0, "partial_hashed": 0, "full_hashed": 0, "cache_hits": 0,
+                         "bytes_read": 0, "errors": 0, "groups": 0}
+        self.last_run_s = None
+
+    def _live(self, pool, paths):
+        """(path, size, mtime) from a fresh stat of each path; vanished files are dropped"""
+        def stat(path):
+            try:
+                result = os.stat(path)
+            except OSError:
+                return None
+            return path, result.st_size, result.st_mtime
+
+        files = []
+        for path, row in zip(paths, pool.map(stat, paths)):
+            if row is None:
+                self.counters["errors"] += 1
+            else:
+                files.append(row)
+        return files
+
+    def _hash_all(self, pool, files, kind):
+        """{path: hash} for (path, size, mtime) files, from the cache or by reading them"""
+        hashes, misses = {}, []
+        for path, size, mtime in files:
+            cached = self.cache.get(path, size, mtime)
+            # Small files' partial hash covers the whole file
+            value = cached[0] if kind == "partial" else cached[1] or (
+                cached[0] if size <= 2 * EDGE_BYTES else None)
+            if value:
+                hashes[path] = value
+                self.counters["cache_hits"] += 1
+            else:
+                misses.append((path, size, mtime))
+
+        work = (lambda f: partial_hash(f[0], f[1])) if kind == "partial" else (lambda f: full_hash(f[0]))
+        futures = {pool.submit(work, file): file for file in misses}
+        rows = []
+        for future in concurrent.futures.as_completed(futures):
+            path, size, mtime = futures[future]
+            try:
+                value = future.result()
+            except OSError:
+                self.counters["errors"] += 1  # vanished or unreadable
+                continue
+            hashes[path] = value
+            self.counters[f"{kind}_hashed"] += 1
+            self.counters["bytes_read"] += min(size, 2 * EDGE_BYTES) if kind == "partial" else size
+            rows.append((path, size, mtime, value, None) if kind == "partial" else (path, size, mtime, None, value))
+        if rows:
+            self.cache.put(rows)
+        return hashes
+
+    def find(self, files):
+        """Groups of identical files, each sorted oldest first, from (path, size, mtime) rows
+
+        Only the paths are taken from the rows; every file is stat-ed again.
+        Empty files are ignored.
+        """
+        started = time.perf_counter()
+        self.counters["runs"] += 1
+        groups = []
+        with concurrent.futures.ThreadPoolExecutor(self.workers, thread_name_prefix="dup-hash") as pool:
+            by_size = defaultdict(list)
+            for path, size, mtime in self._live(pool, [row[0] for row in files]):
+                if size > 0:
+                    by_size[size].append((path, size, mtime))
+                    self.counters["files"] += 1
+
+            candidates = [file for group in by_size.values() if len(group) > 1 for file in group]
+            partial = self._hash_all(pool, candidates, "partial")
+            by_partial = defaultdict(list)
+            for file in candidates:
+                if file[0] in partial:
+                    by_partial[(file[1], partial[file[0]])].append(file)
+
+            shared = [group for group in by_partial.values() if len(group) > 1]
+            for group in shared:
+                if group[0][1] <= 2 * EDGE_BYTES:
+                    groups.append(group)  # the partial hash already read them whole
+            large = [file for group in shared if group[0][1] > 2 * EDGE_BYTES for file in group]
+            full = self._hash_all(pool, large, "full")
+            by_full = defaultdict(list)
+            for file in large:
+                if file[0] in full:
+                    by_full[(file[1], full[file[0]])].append(file)
+            groups.extend(group for group in by_full.values() if len(group) > 1)
+
+        self.counters["groups"] += len(groups)
+        self.last_run_s = round(time.perf_counter() - started, 3)
+        return sorted(([path for path, _, _ in sorted(group, key=lambda f: (f[2], f[0]))] for group in groups),
+                      key=lambda group: group[0])
+
+    def stats(self):
+        return dict(self.counters, last_run_s=self.last_run_s)
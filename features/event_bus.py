@@ -0,0 +1,108 @@
+import threading
+import time
+from collections import deque, namedtuple
+
+# Topics published by the assistant
+WAKE_WORD = "wake_word"          # payload: True, or the command spoken with the wake word
+COMMAND = "command"              # payload: command text to run as a voice turn
+QUIT = "quit"
+
+Event = namedtuple("Event", "topic payload at")
+
+
+class Mailbox:
+    """Events for one consumer, in order; get() blocks until one arrives"""
+
+    def __init__(self, topics):
+        self.topics = set(topics)
+        self.events = deque()
+        self.ready = threading.Condition()
+        self.closed = False
+
+    def put(self, event):
+        with self.ready:
+            self.events.append(event)
+            self.ready.notify()
+
+    def get(self, timeout=None):
+        """Next event, or None once timeout passes (or the mailbox is closed)"""
+        with self.ready:
+            if not self.ready.wait_for(lambda: self.events or self.closed, timeout):
+                return None
+            return self.events.popleft() if self.events else None
+
+    def poll(self, topic=None):
+        """Next event (of topic, if given) without waiting, or None"""
+        with self.ready:
+            for event in self.events:
+                if topic is None or event.topic == topic:
+                    self.events.remove(event)
+                    return event
+        return None
+
+    def drain(self, topic=None):
+        """Drop waiting events (of topic, if given); returns how many"""
+        with self.ready:
+            kept = deque(event for event in self.events if topic is not None and event.topic != topic)
+            dropped = len(self.events) - len(kept)
+            self.events = kept
+        return dropped
+
+    def close(self):
+        with self.ready:
+            self.closed = True
+            self.ready.notify_all()
+
+
+class EventBus:
+    """Publish/subscribe between threads, so consumers wait instead of polling
+
+    subscribe() returns a Mailbox the consumer blocks on; on() registers a
+    callback run on the publishing thread, for reactions that must not wait
+    for the consumer (e.g. cancelling a reply when the wake word is heard).
+    """
+
+    def __init__(self):
+        self.mailboxes = []
+        self.callbacks = {}  # topic -> [callback(event)]
+        self.lock = threading.Lock()
+        self.counters = {}  # topic -> events published
+
+    def subscribe(self, *topics):
+        mailbox = Mailbox(topics)
+        with self.lock:
+            self.mailboxes.append(mailbox)
+        return mailbox
+
+    def unsubscribe(self, mailbox):
+        with self.lock:
+            if mailbox in self.mailboxes:
+                self.mailboxes.remove(mailbox)
+        mailbox.close()
+
+    def on(self, topic, callback):
+        with self.lock:
+            self.callbacks.setdefault(topic, []).append(callback)
+
+    def publish(self, topic, payload=None):
+        event = Event(topic, payload, time.monotonic())
+        with self.lock:
+            self.counters[topic] = self.counters.get(topic, 0) + 1
+            mailboxes = [mailbox for mailbox in self.mailboxes if topic in mailbox.topics]
+            callbacks = list(self.callbacks.get(topic, ()))
+        for callback in callbacks:
+            try:
+                callback(event)
+            except Exception as e:
+                print(f"Event handler error ({topic}): {e}")
+        for mailbox in mailboxes:
+            mailbox.put(event)
+        return event
+
+    def stats(self):
+        with self.lock:
+            return {"published": dict(self.counters), "subscribers": len(self.mailboxes)}
+
+
+# Shared by every producer and consumer in the process
+bus = EventBus()
@@ -0,0 +1,128 @@
+import concurrent.futures
+import fnmatch
+import os
+import queue
+import threading
+
+# Directory names never worth searching: tool caches, dependency trees and VCS data
+DEFAULT_EXCLUDES = (
+    "node_modules", ".git", ".hg", ".svn", "__pycache__", ".cache", ".venv", "venv", ".tox", ".mypy_cache",
+    ".pytest_cache", ".gradle", ".m2", ".npm", ".cargo", "site-packages", "AppData", "$RECYCLE.BIN",
+    "System Volume Information", ".Trash*", "*.egg-info",
+)
+
+
+def excludes_from_env():
+    """Default excludes plus any from FILE_SEARCH_EXCLUDE (comma-separated globs)"""
+    extra = [glob.strip() for glob in os.getenv("FILE_SEARCH_EXCLUDE", "").split(",") if glob.strip()]
+    return DEFAULT_EXCLUDES + tuple(extra)
+
+
+class FileCrawler:
+    """Walks several roots at once on a thread pool, streaming files as they are found
+
+    Each directory is one os.scandir task; subdirectories are queued as tasks
+    as soon as their parent is listed, so shallow files come first. Directory
+    names matching an exclude glob (case-insensitive) are not entered, and
+    directories deeper than max_depth below a root are not listed. Closing
+    the generator, or reaching `limit` files, stops the walk.
+    """
+
+    def __init__(self, excludes=None, max_depth=None, workers=8):
+        self.excludes = tuple(glob.lower() for glob in (excludes_from_env() if excludes is None else excludes))
+        self.max_depth = max_depth
+        self.workers = workers
+        self.lock = threading.Lock()
+        self.counters = {"walks": 0, "dirs": 0, "files": 0, "excluded": 0, "stopped_early": 0}
+
+    def excluded(self, name):
+        name = name.lower()
+        return any(fnmatch.fnmatchcase(name, glob) for glob in self.excludes)
+
+    def excluded_path(self, path):
+        """True if path is, or lies inside, an excluded directory"""
+        return any(self.excluded(part) for part in path.replace("\\", "/").split("/") if part)
+
+    @staticmethod
+    def distinct_roots(roots):
+        """Existing roots, without any that lie inside another"""
+        roots = sorted({os.path.abspath(root) for root in roots if root and os.path.isdir(root)})
+        distinct = []
+        for root in roots:
+            if not any(root.startswith(parent.rstrip("\\/") + os.sep) for parent in distinct):
+                distinct.append(root)
+        return distinct
+
+    def _scan(self, directory, match, stop):
+        """Matching files (path, name, size, mtime) and subdirectories of one directory"""
+        files, subdirs = [], []
+        if stop.is_set():
+            return files, subdirs
+        excluded = 0
+        try:
+            with os.scandir(directory) as entries:
+                for entry in entries:
+                    try:
+                        if entry.is_dir(follow_symlinks=False):
+                            if self.excluded(entry.name):
+                                excluded += 1
+                            else:
+                                subdirs.append(entry.path)
+                        elif entry.is_file() and (match is None or match(entry.name)):
+                            stat = entry.stat()
+                            files.append((entry.path, entry.name, stat.st_size, stat.st_mtime))
+                    except OSError:
+                        continue
+        except OSError:
+            pass  # unreadable or vanished directory
+        with self.lock:
+            self.counters["dirs"] += 1
+            self.counters["excluded"] += excluded
+        return files, subdirs
+
+    def walk(self, roots, match=None, limit=None):
+        """Yield (path, name, size, mtime) for files whose name passes match(name)"""
+        stop = threading.Event()
+        done = queue.Queue()
+        pool = concurrent.futures.ThreadPoolExecutor(self.workers, thread_name_prefix="file-crawl")
+        pending = 0
+        found = 0
+
+        def submit(directory, depth):
+            nonlocal pending
+            pending += 1
+            future = pool.submit(self._scan, directory, match, stop)
+            future.add_done_callback(lambda f: done.put((f, depth)))
+
+        with self.lock:
+            self.counters["walks"] += 1
+        try:
+            for root in self.distinct_roots(roots):
+                submit(root, 0)
+            while pending:
+                future, depth = done.get()
+                pending -= 1
+                try:
+                    files, subdirs = future.result()
+                except Exception as e:
+                    print(f"File crawl error: {e}")
+                    continue
+                if self.max_depth is None or depth < self.max_depth:
+                    for subdir in subdirs:
+                        submit(subdir, depth + 1)
+                for file in files:
+                    found += 1
+                    with self.lock:
+                        self.counters["files"] += 1
+                    yield file
+                    if limit and found >= limit:
+                        with self.lock:
+                            self.counters["stopped_early"] += 1
+                        return
+        finally:
+            stop.set()
+            pool.shutdown(wait=False, cancel_futures=True)
+
+    def stats(self):
+        with self.lock:
+            return dict(self.counters)
@@ -0,0 +1,358 @@
+import os
+import sqlite3
+import threading
+import time
+from collections import deque
+
+# Same location as the LLM cache (repository root .cache)
+CACHE_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), ".cache")
+DEFAULT_DB_PATH = os.path.join(CACHE_DIR, "file_index.sqlite3")
+
+BATCH_SIZE = 1000
+
+
+def prefix_range(directory):
+    """Bounds (low, high) of every path below directory, for a range scan on the path index"""
+    directory = directory.rstrip("\\/") + os.sep
+    return directory, directory[:-1] + chr(ord(os.sep) + 1)
+
+
+def _like(term):
+    return "%" + term.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_") + "%"
+
+
+class FileIndex:
+    """Persistent index of file paths, sizes and modification times
+
+    Filenames are searched through an SQLite FTS5 trigram index, so any
+    substring of three or more characters is an index lookup; shorter
+    keywords are filtered with LIKE. crawl() fills the index from a
+    background os.scandir walk, reusing each DirEntry's stat and skipping
+    directories whose name exclude(name) rejects. The index
+    answers queries below a root once that root has been crawled, including
+    on later runs, while a new crawl refreshes it.
+
+    Each directory's mtime is stored too. A directory whose mtime is
+    unchanged has had no entries added, removed or renamed, so a recrawl
+    only stats it and moves on to its known subdirectories. Editing a file
+    in place leaves its directory's mtime alone, so such changes come from
+    update()/remove()/move() (see file_watcher) or from a crawl with
+    stat_files=True, which also stats the known files of skipped directories.
+    """
+
+    def __init__(self, db_path=DEFAULT_DB_PATH, exclude=None):
+        self.db_path = db_path
+        self.exclude = exclude or (lambda name: False)  # directory names not to enter
+        self.lock = threading.RLock()
+        self.crawling = set()
+        self.pending = 0  # rows written since the last commit
+        self.counters = {"crawls": 0, "crawled_files": 0, "dirs_scanned": 0, "dirs_skipped": 0,
+                         "files_restated": 0, "updates": 0, "queries": 0}
+        self.query_ms = deque(maxlen=200)
+        self.db, self.fts = self._open_db(db_path)
+
+    @staticmethod
+    def _open_db(path):
+        if path != ":memory:":
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+        db = sqlite3.connect(path, check_same_thread=False)
+        db.execute("PRAGMA journal_mode=WAL")
+        db.execute("PRAGMA synchronous=NORMAL")
+        db.execute(
+            "CREATE TABLE IF NOT EXISTS files ("
+            "id INTEGER PRIMARY KEY, path TEXT UNIQUE NOT NULL, name TEXT NOT NULL, "
+            "size INTEGER NOT NULL, mtime REAL NOT NULL, crawl INTEGER NOT NULL)"
+        )
+        db.execute("CREATE TABLE IF NOT EXISTS roots (path TEXT PRIMARY KEY, crawled_at REAL NOT NULL)")
+        db.execute("CREATE TABLE IF NOT EXISTS dirs (path TEXT PRIMARY KEY, parent TEXT, mtime REAL NOT NULL)")
+        db.execute("CREATE INDEX IF NOT EXISTS dirs_parent ON dirs (parent)")
+        try:
+            db.execute("CREATE VIRTUAL TABLE IF NOT EXISTS names USING fts5("
+                       "name, content='files', content_rowid='id', tokenize='trigram')")
+            db.executescript("""
+                CREATE TRIGGER IF NOT EXISTS files_ai AFTER INSERT ON files BEGIN
+                    INSERT INTO names(rowid, name) VALUES (new.id, new.name);
+                END;
+                CREATE TRIGGER IF NOT EXISTS files_ad AFTER DELETE ON files BEGIN
+                    INSERT INTO names(names, rowid, name) VALUES ('delete', old.id, old.name);
+                END;
+                CREATE TRIGGER IF NOT EXISTS files_au AFTER UPDATE OF name ON files BEGIN
+                    INSERT INTO names(names, rowid, name) VALUES ('delete', old.id, old.name);
+                    INSERT INTO names(rowid, name) VALUES (new.id, new.name);
+                END;
+            """)
+            fts = True
+        except sqlite3.Error as e:
+            # SQLite before 3.34 has no trigram tokenizer
+            print(f"File index full-text search unavailable ({e}), using LIKE")
+            fts = False
+        db.commit()
+        return db, fts
+
+    # Crawling
+    def crawl(self, root, background=True, stat_files=False):
+        """(Re)index every file below root; returns the thread when run in the background
+
+        stat_files=True also catches files edited in place in unchanged directories.
+        """
+        root = os.path.abspath(root)
+        if not background:
+            self._crawl(root, stat_files)
+            return None
+        thread = threading.Thread(target=self._crawl, args=(root, stat_files), name="file-index-crawl",
+                                  daemon=True)
+        thread.start()
+        return thread
+
+    def _crawl(self, root, stat_files=False):
+        with self.lock:
+            if root in self.crawling:
+                return
+            self.crawling.add(root)
+        try:
+            self._refresh(root, stat_files)
+            with self.lock:
+                self.db.execute("INSERT OR REPLACE INTO roots VALUES (?, ?)", (root, time.time()))
+                self.db.commit()
+                self.counters["crawls"] += 1
+        except Exception as e:
+            print(f"File index crawl error: {e}")
+        finally:
+            with self.lock:
+                self.crawling.discard(root)
+
+    def _refresh(self, root, stat_files=False):
+        """Rescan the directories below root whose mtime changed (and, with stat_files, restat the rest)"""
+        crawl_id = time.time_ns()
+        stack = [root]
+        while stack:
+            directory = stack.pop()
+            try:
+                mtime = os.stat(directory).st_mtime
+            except OSError:
+                self._remove_tree(directory)
+                continue
+            with self.lock:
+                row = self.db.execute("SELECT mtime FROM dirs WHERE path = ?", (directory,)).fetchone()
+                if row and row[0] == mtime:
+                    self.counters["dirs_skipped"] += 1
+                    stack.extend(r[0] for r in self.db.execute("SELECT path FROM dirs WHERE parent = ?",
+                                                                (directory,)))
+                    if stat_files:
+                        self._restat(directory, crawl_id)
+                    continue
+            # Stat before listing: a change made meanwhile leaves a newer mtime for next time
+            files, subdirs = self._list(directory)
+            self._sync_dir(directory, mtime, files, subdirs, crawl_id)
+            stack.extend(subdirs)
+        with self.lock:
+            self.db.commit()
+            self.pending = 0
+
+    def _restat(self, directory, crawl_id):
+        """Update the size and mtime of files in directory that were edited in place"""
+        changed, gone = [], []
+        for path, name, size, mtime in self.files_in(directory, recursive=False):
+            try:
+                stat = os.stat(path)
+            except OSError:
+                gone.append((path,))
+                continue
+            if (stat.st_size, stat.st_mtime) != (size, mtime):
+                changed.append((path, name, stat.st_size, stat.st_mtime, crawl_id))
+        if changed or gone:
+            with self.lock:
+                self._upsert(changed)
+                self.db.executemany("DELETE FROM files WHERE path = ?", gone)
+                self.counters["files_restated"] += len(changed)
+                self.pending += len(changed) + len(gone)
+
+    def _list(self, directory):
+        """Files (path, name, size, mtime) and subdirectory paths directly in directory"""
+        files, subdirs = [], []
+        try:
+            with os.scandir(directory) as entries:
+                for entry in entries:
+                    try:
+                        if entry.is_dir(follow_symlinks=False):
+                            if not self.exclude(entry.name):
+                                subdirs.append(entry.path)
+                        elif entry.is_file():
+                            stat = entry.stat()
+                            files.append((entry.path, entry.name, stat.st_size, stat.st_mtime))
+                    except OSError:
+                        continue
+        except OSError:
+            pass  # unreadable or vanished directory
+        return files, subdirs
+
+    def _sync_dir(self, directory, mtime, files, subdirs, crawl_id):
+        """Make the catalog's view of one directory match a fresh listing"""
+        with self.lock:
+            known_files = {r[0] for r in self.files_in(directory, recursive=False)}
+            known_dirs = {r[0] for r in self.db.execute("SELECT path FROM dirs WHERE parent = ?", (directory,))}
+            self._upsert([file + (crawl_id,) for file in files])
+            gone = known_files - {file[0] for file in files}
+            self.db.executemany("DELETE FROM files WHERE path = ?", [(path,) for path in gone])
+            for path in known_dirs - set(subdirs):
+                self._remove_tree(path)
+            self.db.execute("INSERT OR REPLACE INTO dirs VALUES (?, ?, ?)",
+                            (directory, os.path.dirname(directory), mtime))
+            self.counters["dirs_scanned"] += 1
+            self.counters["crawled_files"] += len(files)
+            self.pending += len(files) + len(gone) + 1
+            if self.pending >= BATCH_SIZE:
+                self.db.commit()
+                self.pending = 0
+
+    def _upsert(self, rows):
+        self.db.executemany(
+            "INSERT INTO files (path, name, size, mtime, crawl) VALUES (?, ?, ?, ?, ?) "
+            "ON CONFLICT(path) DO UPDATE SET size = excluded.size, mtime = excluded.mtime, "
+            "crawl = excluded.crawl",
+            rows
+        )
+
+    def _remove_tree(self, path):
+        low, high = prefix_range(path)
+        with self.lock:
+            self.db.execute("DELETE FROM files WHERE path = ? OR (path >= ? AND path < ?)", (path, low, high))
+            self.db.execute("DELETE FROM dirs WHERE path = ? OR (path >= ? AND path < ?)", (path, low, high))
+
+    # Incremental changes
+    def update(self, path):
+        """Apply a created or modified path; a new directory is crawled"""
+        path = os.path.abspath(path)
+        try:
+            if os.path.isdir(path) and not os.path.islink(path):
+                self._refresh(path)
+                return
+            stat = os.stat(path)
+        except OSError:
+            self.remove(path)
+            return
+        with self.lock:
+            self._upsert([(path, os.path.basename(path), stat.st_size, stat.st_mtime, time.time_ns())])
+            self.db.commit()
+            self.counters["updates"] += 1
+
+    def remove(self, path):
+        """Apply a deleted file or directory"""
+        with self.lock:
+            self._remove_tree(os.path.abspath(path))
+            self.db.commit()
+            self.counters["updates"] += 1
+
+    def move(self, src, dest):
+        self.remove(src)
+        self.update(dest)
+
+    # Queries
+    def covers(self, location):
+        """True if location lies within a root that has been crawled completely"""
+        location = os.path.abspath(location)
+        with self.lock:
+            roots = [row[0] for row in self.db.execute("SELECT path FROM roots")]
+        return any(location == root or location.startswith(root.rstrip("\\/") + os.sep) for root in roots)
+
+    def search(self, keywords, location=None, limit=None):
+        """(path, name, size, mtime) of files whose name contains every keyword"""
+        started = time.perf_counter()
+        keywords = [keyword.lower() for keyword in keywords if keyword]
+        indexed = [k for k in keywords if len(k) >= 3] if self.fts else []
+        where, args = [], []
+        if indexed:
+            sql = "SELECT f.path, f.name, f.size, f.mtime FROM names JOIN files f ON f.id = names.rowid"
+            where.append("names MATCH ?")
+            args.append(" AND ".join('"' + k.replace('"', '""') + '"' for k in indexed))
+        else:
+            sql = "SELECT f.path, f.name, f.size, f.mtime FROM files f"
+        for keyword in keywords:
+            if keyword not in indexed:
+                where.append("f.name LIKE ? ESCAPE '\\'")
+                args.append(_like(keyword))
+        if location:
+            low, high = prefix_range(os.path.abspath(location))
+            where.append("f.path >= ? AND f.path < ?")
+            args += [low, high]
+        if where:
+            sql += " WHERE " + " AND ".join(where)
+        sql += " ORDER BY f.path"
+        if limit:
+            sql += f" LIMIT {int(limit)}"
+
+        with self.lock:
+            rows = self.db.execute(sql, args).fetchall()
+            self.counters["queries"] += 1
+            self.query_ms.append((time.perf_counter() - started) * 1000)
+        return rows
+
+    def candidates(self, groups, location=None, limit=2000, enough=1):
+        """Files whose names share trigrams with the query, best first, for fuzzy ranking
+
+        groups holds the trigrams of each query word. Names sharing a trigram
+        with every word are tried first; when fewer than `enough` do, names
+        sharing any trigram are added, so one misheard word does not hide the file.
+        """
+        started = time.perf_counter()
+        quote = lambda gram: '"' + gram.replace('"', '""') + '"'
+        rows = self._candidates(" AND ".join("(" + " OR ".join(map(quote, grams)) + ")" for grams in groups),
+                                [gram for grams in groups for gram in grams], location, limit)
+        if self.fts and len(rows) < enough and len(groups) > 1:
+            seen = {row[0] for row in rows}
+            rows += [row for row in self._candidates(
+                " OR ".join(quote(gram) for grams in groups for gram in grams),
+                [gram for grams in groups for gram in grams], location, limit)
+                if row[0] not in seen][:limit - len(rows)]
+        with self.lock:
+            self.counters["queries"] += 1
+            self.query_ms.append((time.perf_counter() - started) * 1000)
+        return rows
+
+    def _candidates(self, expression, grams, location, limit):
+        if self.fts:
+            sql = "SELECT f.path, f.name, f.size, f.mtime FROM names JOIN files f ON f.id = names.rowid " \
+                  "WHERE names MATCH ?"
+            args = [expression]
+        else:
+            # Without the trigram index, any shared trigram admits a name
+            sql = "SELECT f.path, f.name, f.size, f.mtime FROM files f WHERE (" + \
+                  " OR ".join("f.name LIKE ? ESCAPE '\\'" for _ in grams) + ")"
+            args = [_like(gram) for gram in grams]
+        if location:
+            low, high = prefix_range(os.path.abspath(location))
+            sql += " AND f.path >= ? AND f.path < ?"
+            args += [low, high]
+        sql += (" ORDER BY names.rank" if self.fts else "") + " LIMIT ?"
+        args.append(int(limit))
+        with self.lock:
+            return self.db.execute(sql, args).fetchall()
+
+    def files_in(self, directory, recursive=True):
+        """(path, name, size, mtime) of the catalogued files in (or below) directory"""
+        low, high = prefix_range(os.path.abspath(directory))
+        sql = "SELECT path, name, size, mtime FROM files WHERE path >= ? AND path < ?"
+        args = [low, high]
+        if not recursive:
+            sql += " AND instr(substr(path, ?), ?) = 0"
+            args += [len(low) + 1, os.sep]
+        with self.lock:
+            return self.db.execute(sql + " ORDER BY path", args).fetchall()
+
+    def count(self):
+        with self.lock:
+            return self.db.execute("SELECT COUNT(*) FROM files").fetchone()[0]
+
+    def stats(self):
+        with self.lock:
+            return dict(
+                self.counters,
+                avg_query_ms=round(sum(self.query_ms) / len(self.query_ms), 2) if self.query_ms else 0.0,
+                files=self.count(),
+                fts=self.fts,
+                crawling=len(self.crawling)
+            )
+
+    def close(self):
+        with self.lock:
+            self.db.close()
@@ -0,0 +1,226 @@
+import os
+import re
+import time
+from collections import Counter
+
+from text_normalize import normalize_tokens, words_to_numbers
+
+# Words in a spoken query that say nothing about the file's name
+_QUERY_NOISE = {"the", "a", "an", "my", "of", "for", "file", "files", "named", "called", "find", "search"}
+
+# Spoken file kinds, matched against the extension
+KIND_WORDS = {
+    "spreadsheet": {"xlsx", "xls", "csv", "ods"},
+    "document": {"docx", "doc", "pdf", "txt", "odt", "rtf"},
+    "doc": {"docx", "doc"},
+    "presentation": {"pptx", "ppt", "odp"},
+    "slides": {"pptx", "ppt", "odp"},
+    "photo": {"jpg", "jpeg", "png", "heic", "gif"},
+    "picture": {"jpg", "jpeg", "png", "heic", "gif"},
+    "image": {"jpg", "jpeg", "png", "heic", "gif", "bmp", "svg"},
+    "video": {"mp4", "mkv", "avi", "mov"},
+    "song": {"mp3", "wav", "flac", "m4a"},
+    "music": {"mp3", "wav", "flac", "m4a"},
+    "archive": {"zip", "rar", "7z"},
+}
+
+_SPLIT = re.compile(r"[^0-9a-z]+")
+# camelCase and letter/digit boundaries: "Budget2024Final" -> "Budget 2024 Final"
+_BOUNDARY = re.compile(r"(?<=[a-z])(?=[A-Z])|(?<=[A-Za-z])(?=[0-9])|(?<=[0-9])(?=[A-Za-z])")
+
+RECENCY_HALF_LIFE_DAYS = 30
+
+
+def query_tokens(query):
+    """Tokens of a spoken query: normalized, numbers as digits, spoken years joined
+
+    "budget spreadsheet twenty twenty four" -> ["budget", "spreadsheet", "2024"]
+    """
+    tokens = []
+    for token in normalize_tokens(query):
+        if token in _QUERY_NOISE:
+            continue
+        # "twenty twenty four" normalizes to 20 24, "nineteen ninety nine" to 19 99
+        if tokens and len(token) == 2 and token.isdigit() and tokens[-1].isdigit() and 10 <= int(tokens[-1]) <= 20 \
+                and len(tokens[-1]) == 2:
+            tokens[-1] += token
+            continue
+        tokens.append(token)
+    return tokens
+
+
+def name_tokens(name):
+    """Tokens of a filename: "Budget2024_final-v2.xlsx" -> budget 2024 final v 2 xlsx"""
+    stem, ext = os.path.splitext(name)
+    if not stem:  # dotfiles: ".bashrc"
+        stem, ext = ext, ""
+    tokens = words_to_numbers([token for token in _SPLIT.split(_BOUNDARY.sub(" ", stem).lower()) if token])
+    if ext:
+        tokens.append(ext[1:].lower())
+    return tokens
+
+
+def trigrams(tokens):
+    grams = set()
+    for token in tokens:
+        padded = f" {token} "
+        grams.update(padded[i:i + 3] for i in range(len(padded) - 2))
+    return grams
+
+
+def edit_distance(a, b, limit):
+    """Edit distance counting a swap of neighbouring letters as one edit,
+    or limit + 1 as soon as it must exceed limit"""
+    if abs(len(a) - len(b)) > limit:
+        return limit + 1
+    before, previous = None, list(range(len(b) + 1))
+    for i, char_a in enumerate(a, 1):
+        current = [i]
+        for j, char_b in enumerate(b, 1):
+            cost = min(previous[j] + 1, current[j - 1] + 1, previous[j - 1] + (char_a != char_b))
+            if i > 1 and j > 1 and char_a == b[j - 2] and a[i - 2] == char_b:
+                cost = min(cost, before[j - 2] + 1)
+            current.append(cost)
+        if min(current) > limit:
+            return limit + 1
+        before, previous = previous, current
+    return previous[-1]
+
+
+def token_similarity(query, name):
+    """0..1 similarity of a query token to a filename token"""
+    if query == name:
+        return 1.0
+    if query.isdigit() or name.isdigit():
+        # Numbers must match exactly, except a trailing part: "24" for "2024"
+        return 0.8 if name.isdigit() and len(query) >= 2 and name.endswith(query) else 0.0
+    if len(query) >= 2 and name.startswith(query):
+        return 0.9
+    if len(query) >= 3 and query in name:
+        return 0.8
+    limit = 0 if len(query) < 4 else 1 if len(query) < 8 else 2
+    distance = edit_distance(query, name, limit)
+    if distance > limit:
+        return 0.0
+    return 1.0 - distance / max(len(query), len(name))
+
+
+class FileRanker:
+    """Scores candidate files against a spoken query
+
+    The text score mixes the best token match for every query token (exact,
+    prefix, substring or within a small edit distance; kind words such as
+    "spreadsheet" match the extension) with trigram overlap of the whole
+    name. Recently modified files and files opened from earlier searches
+    get a small boost; neither can lift a file whose text score is below
+    min_score.
+    """
+
+    def __init__(self, min_score=0.5, strong_score=0.8, text_weight=0.75, recency_weight=0.1, usage_weight=0.15):
+        self.min_score = min_score
+        self.strong_score = strong_score  # a name this close is worth stopping a crawl for
+        self.text_weight = text_weight
+        self.recency_weight = recency_weight
+        self.usage_weight = usage_weight
+        self.opens = Counter()  # path -> times opened from search results
+
+    def load_history(self, history):
+        """Count opened files in FileManager.search_history"""
+        for entry in history.values():
+            if isinstance(entry, dict) and entry.get("opened"):
+                self.opens[entry["opened"]] += 1
+
+    def record_open(self, path):
+        self.opens[path] += 1
+
+    def _scorer(self, tokens):
+        """text_score(name) for a query; token similarities are shared across names"""
+        query_grams = trigrams(tokens)
+        similarities = {}  # (query token, name token) -> similarity
+
+        def best(query_token, names, ext):
+            if query_token in KIND_WORDS and ext in KIND_WORDS[query_token]:
+                return 1.0
+            scores = []
+            for name_token in names:
+                key = (query_token, name_token)
+                if key not in similarities:
+                    similarities[key] = token_similarity(query_token, name_token)
+                scores.append(similarities[key])
+            return max(scores, default=0.0)
+
+        def text_score(name):
+            names = name_tokens(name)
+            ext = os.path.splitext(name)[1][1:].lower()
+            token_score = sum(best(token, names, ext) for token in tokens) / len(tokens)
+            name_grams = trigrams(names)
+            overlap = 2 * len(query_grams & name_grams) / (len(query_grams) + len(name_grams)) if name_grams else 0.0
+            return 0.75 * token_score + 0.25 * overlap
+
+        return text_score
+
+    def matcher(self, query):
+        """Predicate on a filename: would rank() keep it? (no stat needed)"""
+        tokens = query_tokens(query) if isinstance(query, str) else list(query)
+        if not tokens:
+            return lambda name: False
+        text_score = self._scorer(tokens)
+        return lambda name: text_score(name) >= self.min_score
+
+    def collect(self, query, rows, enough, max_rows=None, budget_s=None):
+        """Rows taken from an iterable (e.g. a crawl) until `enough` of them score
+        strong_score or better, max_rows have been taken, or budget_s has passed
+
+        A crawl in breadth-first order finds weak matches near the roots before
+        the best ones further down, so the pool is ranked afterwards.
+        """
+        tokens = query_tokens(query) if isinstance(query, str) else list(query)
+        if not tokens:
+            return []
+        text_score = self._scorer(tokens)
+        deadline = time.monotonic() + budget_s if budget_s else None
+        pool, strong = [], 0
+        for row in rows:
+            pool.append(row)
+            if text_score(row[1]) >= self.strong_score:
+                strong += 1
+            if strong >= enough or (max_rows and len(pool) >= max_rows) or (
+                    deadline and time.monotonic() >= deadline):
+                break
+        return pool
+
+    def rank(self, query, candidates, limit=10, now=None):
+        """Best (score, candidate) pairs, highest first
+
+        candidates are (path, name, size, mtime) rows; query is text or
+        query_tokens() output.
+        """
+        tokens = query_tokens(query) if isinstance(query, str) else list(query)
+        if not tokens:
+            return []
+        text_score = self._scorer(tokens)
+        now = now or time.time()
+
+        ranked = []
+        for candidate in candidates:
+            path, name, size, mtime = candidate
+            text = text_score(name)
+            if text < self.min_score:
+                continue
+            age_days = max(0.0, now - (mtime or 0)) / 86400
+            recency = 0.5 ** (age_days / RECENCY_HALF_LIFE_DAYS)
+            usage = 1 - 0.5 ** self.opens.get(path, 0)
+            score = self.text_weight * text + self.recency_weight * recency + self.usage_weight * usage
+            ranked.append((round(score, 4), candidate))
+        ranked.sort(key=lambda item: (-item[0], item[1][0]))
+        return ranked[:limit]
+
+
+def candidate_grams(tokens):
+    """Trigrams of each query token worth looking up, one list per token
+
+    Kind words are matched on the extension instead, and tokens shorter
+    than three characters have no trigrams.
+    """
+    return [sorted({token[i:i + 3] for i in range(len(token) - 2)})
+            for token in tokens if token not in KIND_WORDS and len(token) >= 3]
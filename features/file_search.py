@@ -1,3 +1,4 @@
+import contextlib
 import os
 import shutil
 from datetime import datetime
@@ -5,6 +6,15 @@ import json
 from pathlib import Path
 import pyautogui
 import time
+from file_index import FileIndex
+from file_watcher import CatalogWatcher
+from file_ranker import FileRanker, KIND_WORDS, candidate_grams, query_tokens
+from file_crawler import FileCrawler
+from duplicate_finder import DuplicateFinder
+
+# Uncovered searches crawl until enough strong matches turn up, within these bounds
+CRAWL_POOL = 500
+CRAWL_BUDGET_S = 3.0
 
 class FileManager:
     def __init__(self):
@@ -13,13 +23,26 @@ class FileManager:
         self.downloads = os.path.join(self.home, "Downloads")
         self.documents = os.path.join(self.home, "Documents")
         self.pictures = os.path.join(self.home, "Pictures")
+        self.desktop = os.path.join(self.home, "Desktop")
+        
+        # Searched when no location is given and the catalog is not ready
+        self.search_roots = [self.documents, self.downloads, self.desktop, self.pictures]
+        self.crawler = FileCrawler()
         
         # Search history
         self.history_file = "data/search_history.json"
         self.search_history = self.load_history()
+        self.ranker = FileRanker()
+        self.ranker.load_history(self.search_history)
         
         self.last_search_results = []  # Store last search results
         
+        # Path catalog; earlier runs answer queries while the watcher brings it up to date
+        self.index = FileIndex(exclude=self.crawler.excluded)
+        self.watcher = CatalogWatcher(self.index, [self.home], exclude=self.crawler.excluded_path)
+        self.watcher.start()
+        self.duplicates = DuplicateFinder()
+        
         print("File management system initialized!")
 
     def load_history(self):
@@ -41,15 +64,13 @@ class FileManager:
         except Exception as e:
             print(f"Error saving history: {str(e)}")
 
-    def search_files(self, query, location=None):
-        """Search for files using keywords"""
+    def search_files(self, query, location=None, limit=20):
+        """Search for files by name; spoken queries match fuzzily and come back ranked"""
         try:
+            roots = [location] if location else self.search_roots
             if not location:
                 location = self.home
             
-            results = []
-            keywords = query.lower().split()  # Split query into keywords
-            
             # Record search
             self.search_history[datetime.now().strftime("%Y-%m-%d %H:%M:%S")] = {
                 'query': query,
@@ -57,24 +78,34 @@ class FileManager:
             }
             self.save_history()
             
-            # Walk through directory
-            for root, dirs, files in os.walk(location):
-                for file in files:
-                    file_lower = file.lower()
-                    # Check if ALL keywords are in the filename
-                    if all(keyword in file_lower for keyword in keywords):
-                        full_path = os.path.join(root, file)
-                        results.append({
-                            'name': file,
-                            'path': full_path,
-                            'size': os.path.getsize(full_path),
-                            'modified': datetime.fromtimestamp(os.path.getmtime(full_path)).strftime("%Y-%m-%d %H:%M:%S")
-                        })
+            tokens = query_tokens(query)
+            grams = candidate_grams(tokens)
+            if self.index.covers(location):
+                if grams:
+                    candidates = self.index.candidates(grams, location)
+                else:  # only short words and file kinds
+                    keywords = [token for token in tokens if token not in KIND_WORDS]
+                    candidates = self.index.search(keywords, location, limit=5000)
+            else:
+                # Not indexed yet: crawl the roots in parallel until enough strong matches are found
+                with contextlib.closing(self.crawler.walk(roots, match=self.ranker.matcher(tokens))) as walk:
+                    candidates = self.ranker.collect(tokens, walk, limit, max_rows=CRAWL_POOL,
+                                                     budget_s=CRAWL_BUDGET_S)
             
-            return results
+            return [dict(self._result(*candidate), score=score)
+                    for score, candidate in self.ranker.rank(tokens, candidates, limit)]
         except Exception as e:
             return f"Error searching files: {str(e)}"
 
+    @staticmethod
+    def _result(path, name, size, mtime):
+        return {
+            'name': name,
+            'path': path,
+            'size': size,
+            'modified': datetime.fromtimestamp(mtime).strftime("%Y-%m-%d %H:%M:%S")
+        }
+
     def organize_downloads(self):
         """Organize downloads folder by file type"""
         try:
@@ -90,71 +121,70 @@ class FileManager:
                 'Archives': ['.zip', '.rar', '.7z']
             }
             
+            if self.index.covers(self.downloads):
+                filenames = [name for _, name, _, _ in self.index.files_in(self.downloads, recursive=False)]
+            else:
+                filenames = [name for name in os.listdir(self.downloads)
+                             if os.path.isfile(os.path.join(self.downloads, name))]
+            
             moved_files = 0
-            for filename in os.listdir(self.downloads):
+            for filename in filenames:
                 file_path = os.path.join(self.downloads, filename)
-                if os.path.isfile(file_path):
-                    ext = os.path.splitext(filename)[1].lower()
-                    
-                    # Find category
-                    for category, extensions in categories.items():
-                        if ext in extensions:
-                            # Create category folder
-                            category_path = os.path.join(self.downloads, category)
-                            os.makedirs(category_path, exist_ok=True)
-                            
-                            # Move file
-                            shutil.move(file_path, os.path.join(category_path, filename))
-                            moved_files += 1
+                ext = os.path.splitext(filename)[1].lower()
+                
+                # Find category
+                for category, extensions in categories.items():
+                    if ext in extensions:
+                        # Create category folder
+                        category_path = os.path.join(self.downloads, category)
+                        os.makedirs(category_path, exist_ok=True)
+                        
+                        # Move file, keeping the catalog in step
+                        target = os.path.join(category_path, filename)
+                        try:
+                            shutil.move(file_path, target)
+                        except FileNotFoundError:
+                            self.index.remove(file_path)  # gone since it was catalogued
                             break
+                        self.index.move(file_path, target)
+                        moved_files += 1
+                        break
             
             return f"Organized {moved_files} files in Downloads folder"
         except Exception as e:
             return f"Error organizing downloads: {str(e)}"
 
     def find_duplicates(self, directory=None):
-        """Find duplicate files in directory"""
+        """Find duplicate files in directory; the oldest copy of each is the original"""
         try:
             if not directory:
                 directory = self.downloads
             
-            # Store file sizes and hashes
-            files_by_size = {}
             duplicates = []
-            
-            for root, dirs, files in os.walk(directory):
-                for filename in files:
-                    filepath = os.path.join(root, filename)
-                    filesize = os.path.getsize(filepath)
-                    
-                    if filesize in files_by_size:
-                        # Potential duplicate found
-                        for existing in files_by_size[filesize]:
-                            if self._compare_files(filepath, existing):
-                                duplicates.append({
-                                    'original': existing,
-                                    'duplicate': filepath
-                                })
-                    else:
-                        files_by_size[filesize] = [filepath]
+            for group in self.duplicates.find(self._sized_files(directory)):
+                for filepath in group[1:]:
+                    duplicates.append({
+                        'original': group[0],
+                        'duplicate': filepath
+                    })
             
             return duplicates
         except Exception as e:
             return f"Error finding duplicates: {str(e)}"
 
-    def _compare_files(self, file1, file2):
-        """Compare two files for equality"""
-        try:
-            with open(file1, 'rb') as f1, open(file2, 'rb') as f2:
-                while True:
-                    chunk1 = f1.read(8192)
-                    chunk2 = f2.read(8192)
-                    if chunk1 != chunk2:
-                        return False
-                    if not chunk1:
-                        return True
-        except:
-            return False 
+    def _sized_files(self, directory):
+        """(path, size, mtime) of every file below directory, from the catalog when it covers it"""
+        if self.index.covers(directory):
+            return [(path, size, mtime) for path, _, size, mtime in self.index.files_in(directory)]
+        files = []
+        for root, dirs, filenames in os.walk(directory):
+            for filename in filenames:
+                try:
+                    stat = os.stat(os.path.join(root, filename))
+                except OSError:
+                    continue
+                files.append((os.path.join(root, filename), stat.st_size, stat.st_mtime))
+        return files
 
     def open_file_explorer(self):
         """Open File Explorer and offer search"""
@@ -179,8 +209,8 @@ class FileManager:
             pyautogui.write(query)
             time.sleep(1)
             
-            # Get search results using keyword matching
-            results = self.search_files(query)
+            # Get search results using keyword matching; only five are read out
+            results = self.search_files(query, limit=5)
             self.last_search_results = results  # Store results for later use
             
             if results:
@@ -225,6 +255,11 @@ class FileManager:
             
             file_path = self.last_search_results[number-1]['path']
             os.startfile(file_path)
+            
+            # Files opened from results rank higher next time
+            self.ranker.record_open(file_path)
+            self.search_history[datetime.now().strftime("%Y-%m-%d %H:%M:%S")] = {'opened': file_path}
+            self.save_history()
             return f"Opened {os.path.basename(file_path)}"
         except Exception as e:
             return f"Error opening file: {str(e)}" 
\ No newline at end of file
@@ -0,0 +1,136 @@
+import os
+import threading
+import time
+from collections import deque
+
+try:
+    from watchdog.observers import Observer
+    from watchdog.events import FileSystemEventHandler
+except ImportError:
+    Observer = None
+    FileSystemEventHandler = object
+
+
+def is_available():
+    """True when filesystem events can be watched (watchdog is installed)"""
+    return Observer is not None
+
+
+class _Handler(FileSystemEventHandler):
+    def __init__(self, watcher):
+        self.watcher = watcher
+
+    def on_any_event(self, event):
+        self.watcher.apply(event.event_type, event.src_path, getattr(event, "dest_path", None),
+                           event.is_directory)
+
+
+class CatalogWatcher:
+    """Keeps a FileIndex in step with the disk
+
+    With watchdog (inotify, FSEvents or ReadDirectoryChangesW) each create,
+    delete, move or modify is applied to the catalog as it happens, and the
+    roots are rescanned every `verify_interval` seconds in case events were
+    dropped. Without it, or when the roots cannot be watched, the roots are
+    rescanned every `poll_interval` seconds. Rescans only list directories
+    whose mtime changed, but stat every catalogued file, since editing a
+    file in place leaves its directory's mtime alone.
+    """
+
+    def __init__(self, index, roots, poll_interval=60.0, verify_interval=1800.0, use_events=True, exclude=None):
+        self.index = index
+        self.exclude = exclude or (lambda path: False)  # paths inside excluded directories
+        self.roots = [os.path.abspath(root) for root in roots]
+        self.poll_interval = poll_interval
+        self.verify_interval = verify_interval
+        self.use_events = use_events and is_available()
+        self.observer = None
+        self.mode = None  # "events" or "polling" once started
+        self.stopped = threading.Event()
+        self.synced = threading.Event()  # set after the first full pass
+        self.rescan_started = None  # time.time() of the last completed rescan's start
+        self.lags = deque(maxlen=200)  # seconds from a file's mtime to its event being applied
+        # The catalog's own database lives here; its writes must not feed back as events
+        self.ignore = os.path.dirname(os.path.abspath(index.db_path)) + os.sep
+        self.counters = {"events": 0, "ignored": 0, "rescans": 0}
+
+    def start(self):
+        threading.Thread(target=self._run, name="file-watcher", daemon=True).start()
+
+    def stop(self):
+        self.stopped.set()
+        if self.observer:
+            self.observer.stop()
+
+    def _watch(self):
+        """Start the observer before the first rescan, so nothing changes unseen in between"""
+        if not self.use_events:
+            return False
+        try:
+            self.observer = Observer()
+            for root in self.roots:
+                self.observer.schedule(_Handler(self), root, recursive=True)
+            self.observer.start()
+            return True
+        except Exception as e:
+            # e.g. the inotify watch limit is too low for the tree
+            print(f"File watcher unavailable ({e}), polling instead")
+            self.observer = None
+            return False
+
+    def _run(self):
+        self.mode = "events" if self._watch() else "polling"
+        interval = self.verify_interval if self.mode == "events" else self.poll_interval
+        while True:
+            self.rescan()
+            self.synced.set()
+            if self.stopped.wait(interval):
+                return
+
+    def rescan(self):
+        started = time.time()
+        for root in self.roots:
+            self.index.crawl(root, background=False, stat_files=True)
+        self.rescan_started = started
+        self.counters["rescans"] += 1
+
+    def apply(self, kind, path, dest=None, is_directory=False):
+        """Apply one filesystem event to the catalog"""
+        if kind == "moved" and self.exclude(dest) and not self.exclude(path):
+            kind, dest = "deleted", None  # moved out of sight
+        if path.startswith(self.ignore) or (dest or "").startswith(self.ignore) or \
+                self.exclude(dest or path):
+            self.counters["ignored"] += 1
+            return
+        try:
+            if kind == "moved":
+                self.index.move(path, dest)
+                path = dest
+            elif kind == "deleted":
+                self.index.remove(path)
+            elif kind in ("created", "modified", "closed"):
+                if is_directory and kind != "created":
+                    return  # entry changes arrive as their own events
+                self.index.update(path)
+            else:
+                return
+            self.counters["events"] += 1
+            if not is_directory and kind != "deleted":
+                try:
+                    self.lags.append(max(0.0, time.time() - os.stat(path).st_mtime))
+                except OSError:
+                    pass
+        except Exception as e:
+            print(f"File watcher error ({kind} {path}): {e}")
+
+    def staleness(self):
+        """Roughly how many seconds the catalog may lag the disk"""
+        if self.rescan_started is None:
+            return None
+        if self.mode == "events" and self.observer and self.observer.is_alive():
+            ordered = sorted(self.lags)
+            return round(ordered[int(len(ordered) * 0.95)] if ordered else 0.0, 3)
+        return round(time.time() - self.rescan_started, 1)
+
+    def stats(self):
+        return dict(self.counters, mode=self.mode, staleness_s=self.staleness())
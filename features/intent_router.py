@@ -0,0 +1,404 @@
+import itertools
+import re
+import time
+from collections import deque
+from typing import Dict, List, Optional
+
+
+def _expand_template(template: str) -> List[str]:
+    """Expand `(a|b)` alternatives and `[optional]` words into plain templates"""
+    tokens = re.split(r"(\([^)]*\)|\[[^\]]*\])", template)
+    choices = []
+    for token in tokens:
+        if token.startswith("("):
+            choices.append(token[1:-1].split("|"))
+        elif token.startswith("["):
+            choices.append([token[1:-1], ""])
+        else:
+            choices.append([token])
+    return [re.sub(r"\s+", " ", "".join(combo)).strip() for combo in itertools.product(*choices)]
+
+
+class Route:
+    """One routing table entry: a name, phrase templates and a priority
+
+    Templates are literal phrases with `{slot}` placeholders, e.g.
+    "play {query} on youtube". `intent` is the coarse category used by the
+    conversation manager; `anchor=True` requires the phrase to start the utterance.
+    `complete=True` marks short commands that are safe to act on from a partial
+    speech result once they cover the whole utterance.
+    """
+
+    def __init__(self, name, patterns, priority=0, intent=None, anchor=False, complete=False):
+        self.name = name
+        self.patterns = [p for template in patterns for p in _expand_template(template)]
+        self.priority = priority
+        self.intent = intent
+        self.anchor = anchor
+        self.complete = complete
+
+    def __repr__(self):
+        return f"Route({self.name!r}, priority={self.priority})"
+
+
+class RouteMatch:
+    """Result of routing an utterance: the route, its slots and where it matched"""
+
+    def __init__(self, route, pattern, slots, start, end, text=""):
+        self.route = route
+        self.text = text
+        self.pattern = pattern
+        self.slots = slots
+        self.start = start
+        self.end = end
+
+    @property
+    def name(self):
+        return self.route.name
+
+    @property
+    def intent(self):
+        return self.route.intent
+
+    def slot(self, name, default=""):
+        return self.slots.get(name) or default
+
+    def __repr__(self):
+        return f"RouteMatch({self.name!r}, slots={self.slots})"
+
+
+class _Pattern:
+    """A compiled template: literal fragments with slot names between them"""
+
+    def __init__(self, route, template, fragment_ids):
+        self.route = route
+        self.template = template
+        self.fragment_ids = fragment_ids
+        self.slot_names = []  # (position, name); position i = before fragment i
+        self.literal_length = 0
+
+
+class AhoCorasick:
+    """Multi-pattern substring matcher; finds every keyword in one pass over the text"""
+
+    def __init__(self, keywords):
+        self.goto = [{}]
+        self.fail = [0]
+        self.output = [[]]
+        for index, keyword in enumerate(keywords):
+            self._add(keyword, index)
+        self._build()
+        self.keywords = list(keywords)
+
+    def _add(self, keyword, index):
+        node = 0
+        for char in keyword:
+            nxt = self.goto[node].get(char)
+            if nxt is None:
+                nxt = len(self.goto)
+                self.goto[node][char] = nxt
+                self.goto.append({})
+                self.fail.append(0)
+                self.output.append([])
+            node = nxt
+        self.output[node].append(index)
+
+    def _build(self):
+        queue = deque(self.goto[0].values())
+        while queue:
+            node = queue.popleft()
+            for char, child in self.goto[node].items():
+                queue.append(child)
+                state = self.fail[node]
+                while state and char not in self.goto[state]:
+                    state = self.fail[state]
+                self.fail[child] = self.goto[state].get(char, 0)
+                self.output[child] = self.output[child] + self.output[self.fail[child]]
+
+    def iter_matches(self, text):
+        """Yield (keyword index, start, end) for every occurrence"""
+        node = 0
+        for position, char in enumerate(text):
+            while node and char not in self.goto[node]:
+                node = self.fail[node]
+            node = self.goto[node].get(char, 0)
+            for index in self.output[node]:
+                end = position + 1
+                yield index, end - len(self.keywords[index]), end
+
+
+def _is_boundary(text, start, end):
+    """Keywords only count as whole words ("hi" must not match "this")"""
+    before_ok = start == 0 or not text[start - 1].isalnum()
+    after_ok = end == len(text) or not text[end].isalnum()
+    return before_ok and after_ok
+
+
+class IntentRouter:
+    """Compiles a routing table into one Aho-Corasick automaton
+
+    `match(text)` scans the utterance once, then resolves the highest-priority
+    route whose literal fragments all occur in order, returning the slots
+    (text between fragments) alongside it.
+    """
+
+    def __init__(self, routes):
+        self.routes = list(routes)
+        self._routes_by_name = {route.name: route for route in self.routes}
+        fragments: Dict[str, int] = {}
+        self._patterns: List[_Pattern] = []
+        self._patterns_by_first_fragment: Dict[int, List[_Pattern]] = {}
+
+        for route in self.routes:
+            for template in route.patterns:
+                pattern = self._compile(route, template, fragments)
+                self._patterns.append(pattern)
+                self._patterns_by_first_fragment.setdefault(pattern.fragment_ids[0], []).append(pattern)
+
+        self._fragments = [None] * len(fragments)
+        for fragment, index in fragments.items():
+            self._fragments[index] = fragment
+        self._matcher = AhoCorasick(self._fragments)
+
+    @staticmethod
+    def _compile(route, template, fragments):
+        parts = re.split(r"\{(\w+)\}", template)
+        literals = parts[0::2]
+        slot_names = parts[1::2]
+
+        fragment_ids = []
+        slots = []
+        pending_slot = None
+        for i, literal in enumerate(literals):
+            literal = literal.strip()
+            if literal:
+                if pending_slot is not None:
+                    slots.append((len(fragment_ids), pending_slot))
+                    pending_slot = None
+                fragment_ids.append(fragments.setdefault(literal, len(fragments)))
+            if i < len(slot_names):
+                pending_slot = slot_names[i]
+        if not fragment_ids:
+            raise ValueError(f"Route template needs at least one literal word: {template!r}")
+        if pending_slot is not None:
+            slots.append((len(fragment_ids), pending_slot))
+
+        pattern = _Pattern(route, template, fragment_ids)
+        pattern.slot_names = slots
+        pattern.literal_length = sum(len(literal.strip()) for literal in literals)
+        return pattern
+
+    def get(self, name) -> Optional[Route]:
+        return self._routes_by_name.get(name)
+
+    def _scan(self, text):
+        hits: Dict[int, List] = {}
+        for index, start, end in self._matcher.iter_matches(text):
+            if _is_boundary(text, start, end):
+                hits.setdefault(index, []).append((start, end))
+        return hits
+
+    def _resolve(self, pattern, text, hits):
+        spans = []
+        position = 0
+        for order, fragment_id in enumerate(pattern.fragment_ids):
+            candidates = hits.get(fragment_id)
+            if not candidates:
+                return None
+            span = next((s for s in candidates if s[0] >= position), None)
+            if span is None:
+                return None
+            if order == 0 and pattern.route.anchor and span[0] != 0:
+                return None
+            spans.append(span)
+            position = span[1]
+
+        slots = {}
+        for slot_position, name in pattern.slot_names:
+            start = spans[slot_position - 1][1] if slot_position > 0 else 0
+            end = spans[slot_position][0] if slot_position < len(spans) else len(text)
+            slots[name] = text[start:end].strip(" ,.?!")
+        return RouteMatch(pattern.route, pattern.template, slots, spans[0][0], spans[-1][1], text)
+
+    def match_all(self, text: str) -> List[RouteMatch]:
+        """Every matching route, best first (priority, then earliest, then most specific)"""
+        text = text.lower().strip()
+        hits = self._scan(text)
+        matches = []
+        seen_routes = set()
+        candidates = []
+        for fragment_id in hits:
+            candidates.extend(self._patterns_by_first_fragment.get(fragment_id, ()))
+        candidates.sort(key=lambda p: (-p.route.priority, -p.literal_length))
+
+        for pattern in candidates:
+            if pattern.route.name in seen_routes:
+                continue
+            match = self._resolve(pattern, text, hits)
+            if match:
+                seen_routes.add(pattern.route.name)
+                matches.append((pattern, match))
+
+        matches.sort(key=lambda pm: (-pm[0].route.priority, pm[1].start, -pm[0].literal_length))
+        return [match for _, match in matches]
+
+    def match(self, text: str) -> Optional[RouteMatch]:
+        """Best route for the utterance, or None when nothing matches"""
+        if not text:
+            return None
+        matches = self.match_all(text)
+        return matches[0] if matches else None
+
+    def match_complete(self, text: str) -> Optional[RouteMatch]:
+        """Match only when a `complete` route spans the entire utterance
+
+        Used to start routing on a partial recognition result: "next song" can
+        run before the endpoint, "next week's weather" cannot.
+        """
+        match = self.match(text.strip()) if text else None
+        if match and match.route.complete and match.start == 0 and match.end == len(text.strip()):
+            return match
+        return None
+
+    def dispatch(self, text, handlers, default=None):
+        """Call handlers[route name](match) for the best route, or default(text)
+
+        Only the best route is considered, so a phrase resolves to the same route
+        on every path; a path that has no handler for it falls back to its default.
+        """
+        match = self.match(text)
+        handler = handlers.get(match.name) if match else None
+        if handler:
+            return handler(match)
+        return default(text) if default else None
+
+
+# Conjunctions that join several commands in one utterance, tried in order
+COMMAND_SPLITTERS = [" and then ", " then ", " and ", ", "]
+
+
+def split_commands(query):
+    """Parts of a compound command: "open chrome and play jazz" -> ["open chrome", "play jazz"]"""
+    for splitter in COMMAND_SPLITTERS:
+        if splitter in query.lower():
+            return [part.strip() for part in query.lower().split(splitter) if part.strip()] or [query]
+    return [query]
+
+
+def run_commands(commands, execute, answer_all, pause=0.0):
+    """Responses to each command, in order
+
+    execute(command) returns None for a command no route handles; those are
+    collected and answered together by answer_all(list of commands), so the
+    questions in one utterance cost a single model call.
+    """
+    responses = []
+    for command in commands:
+        response = execute(command)
+        responses.append(response)
+        if response is not None and pause:
+            time.sleep(pause)  # let one action settle before the next
+    unrouted = [i for i, response in enumerate(responses) if response is None]
+    if unrouted:
+        for i, answer in zip(unrouted, answer_all([commands[i] for i in unrouted])):
+            responses[i] = answer
+    return responses
+
+
+# Single routing table shared by every command path. Higher priority wins when
+# several routes match; within a priority the earliest match wins.
+ROUTES = [
+    # Only questions about the assistant itself; "help me write an essay" is a request, not a help query
+    Route("help", ["what can you do", "what can you help with"], priority=100, intent="help", complete=True),
+
+    # Specific stops beat the generic stop keyword
+    Route("camera.record_stop", ["stop recording"], priority=97, intent="camera", complete=True),
+    Route("music.pause", ["pause", "(stop|pause) (music|song|the music|the song)"], priority=95, intent="music", complete=True),
+    Route("stop", ["stop", "halt", "quiet", "silence", "shut up", "stop speaking", "be quiet"], priority=90, complete=True),
+
+    Route("camera.see", ["what do you see"], priority=88, intent="camera", complete=True),
+    Route("camera.record_start", ["start recording"], priority=87, intent="camera", complete=True),
+    Route("screenshot", ["[take] [a] screenshot", "capture [the] screen"], priority=86, complete=True),
+
+    Route("voice.change_and_say", ["change voice to {voice} and say {text}"], priority=85),
+    Route("voice.change", ["change voice to {voice}", "change [the] voice {voice}"], priority=84),
+    Route("wake_word.set", ["(change|set) wake word to {word}"], priority=84),
+
+    Route("document.essay", [
+        "write [me] (an|a) (essay|report|assignment) (on|about) {topic}",
+        "(create|make) (an|a) (essay|report|assignment) (on|about) {topic}",
+    ], priority=83, intent="research"),
+
+    Route("music.play_youtube", ["play {query} on youtube", "play {query} youtube"], priority=82, intent="music"),
+    Route("browser.search_and_explain", ["search (on|in) browser {query}"], priority=81, intent="research"),
+    Route("app.open_and_type", ["open {app} and type {text}"], priority=80),
+    Route("browser.go_to", ["open (chrome|firefox|browser) and go to {url}", "go to {url}"], priority=79),
+
+    Route("music.play", ["play {query} on spotify", "play {query}"], priority=78, intent="music"),
+    Route("volume.up", [
+        "volume up", "(increase|raise) [the] volume", "turn (up the volume|the volume up)",
+    ], priority=77),
+    Route("volume.down", [
+        "volume down", "(decrease|reduce|lower) [the] volume", "turn (down the volume|the volume down)",
+    ], priority=77),
+
+    Route("flight", [
+        "(flights|flight) from {origin} to {destination}",
+        "(compare|search|find|search for|book) (flights|flight)",
+    ], priority=76, intent="flight"),
+    Route("price", [
+        "compare (prices|price) (of|for) {product}", "compare prices {product}", "price check [for] {product}",
+    ], priority=76, intent="price"),
+    Route("stock", [
+        "stock (price|prices) of {stock}", "stock (price|prices|market)", "check stock", "stocks",
+    ], priority=75, intent="price"),
+
+    Route("files.search", [
+        "search files [for] {query}", "(find|search for) (file|files) [named] {query}",
+    ], priority=74),
+    Route("files.explorer", ["[open] file explorer", "open files"], priority=73),
+    Route("files.open", ["files"], priority=30),
+
+    Route("search.youtube", [
+        "search {query} on youtube", "search (youtube|on youtube) [for] {query}",
+    ], priority=72, intent="research"),
+    Route("search.google", [
+        "search {query} on google", "search google [for] {query}", "search for {query}",
+        "search {query}", "google {query}", "look up {query}",
+    ], priority=70, intent="research"),
+    Route("research", ["research {topic}", "(study|investigate) {topic}"], priority=68, intent="research"),
+
+    Route("camera.photo", [
+        "take [a] (photo|picture)", "capture [an] image", "capture",
+    ], priority=66, intent="camera"),
+
+    Route("app.close", ["close {app}", "exit {app}", "quit {app}"], priority=64),
+    Route("app.open", ["open {app}", "launch {app}"], priority=63),
+    Route("app.start", ["start {app}"], priority=62, anchor=True),
+
+    Route("type", ["type {text}", "write {text}"], priority=60),
+
+    Route("music.next", ["next", "next (track|song)", "skip [this] (track|song)"], priority=58, intent="music", complete=True),
+    Route("music.previous", ["previous", "previous (track|song)", "go back", "back"], priority=57, intent="music", complete=True),
+
+    Route("shortcut.copy", ["copy"], priority=50),
+    Route("shortcut.paste", ["paste"], priority=50),
+    Route("shortcut.cut", ["cut"], priority=50),
+    Route("shortcut.select_all", ["select all"], priority=50),
+    Route("shortcut.save", ["save"], priority=50),
+    Route("shortcut.undo", ["undo"], priority=50),
+
+    # Broad category words, only used when nothing more specific matched
+    Route("music.generic", ["spotify", "music", "song", "track"], priority=20, intent="music"),
+    Route("camera.generic", ["photo", "picture", "record"], priority=20, intent="camera"),
+    Route("price.generic", ["price", "cost", "cheaper"], priority=20, intent="price"),
+    Route("flight.generic", ["flight", "travel", "trip"], priority=20, intent="flight"),
+    Route("help.generic", ["how to", "explain", "what can"], priority=15, intent="help"),
+    Route("research.generic", ["find"], priority=15, intent="research"),
+
+    Route("smalltalk.joke", ["joke", "tell me a joke"], priority=12),
+    Route("smalltalk.thanks", ["thank you", "thanks"], priority=12),
+    Route("smalltalk.greeting", ["hi", "hello", "hey"], priority=10),
+]
+
+router = IntentRouter(ROUTES)
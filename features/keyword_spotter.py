@@ -0,0 +1,109 @@
+import json
+import os
+import time
+import threading
+
+try:
+    from vosk import Model, KaldiRecognizer, SetLogLevel
+    SetLogLevel(-1)  # Kaldi logs every decoder step otherwise
+except ImportError:
+    Model = None
+    KaldiRecognizer = None
+
+# Bundled small English model (models/ at the repository root)
+DEFAULT_MODEL_PATH = os.path.join(
+    os.path.dirname(os.path.dirname(os.path.abspath(__file__))),
+    "models", "vosk-model-small-en-us-0.15"
+)
+
+_models = {}
+_models_lock = threading.Lock()
+
+
+def load_model(model_path=DEFAULT_MODEL_PATH):
+    """Load a Vosk model once per process (loading takes ~1s and ~50MB)"""
+    if Model is None:
+        raise RuntimeError("vosk is not installed")
+    with _models_lock:
+        if model_path not in _models:
+            if not os.path.isdir(model_path):
+                raise RuntimeError(f"Vosk model not found at {model_path}")
+            _models[model_path] = Model(model_path)
+        return _models[model_path]
+
+
+def is_available(model_path=DEFAULT_MODEL_PATH):
+    """True when offline recognition can be used"""
+    return Model is not None and os.path.isdir(model_path)
+
+
+class KeywordSpotter:
+    """Streaming offline keyword spotter on the bundled Vosk model
+
+    The recognizer grammar only contains the keyword plus "[unk]", so decoding
+    is cheap and nothing leaves the machine. Feed it raw 16-bit mono PCM chunks;
+    partial results are checked on every chunk, so detection fires as soon as
+    the decoder has seen the word rather than after a trailing silence.
+    """
+
+    def __init__(self, keyword, model_path=DEFAULT_MODEL_PATH, sample_rate=16000):
+        self.sample_rate = sample_rate
+        self.model = load_model(model_path)
+        self.keyword = None
+        self.recognizer = None
+
+        # Resource accounting
+        self.chunks = 0
+        self.audio_seconds = 0.0
+        self.cpu_seconds = 0.0
+        self.max_chunk_ms = 0.0
+        self.detections = 0
+
+        self.set_keyword(keyword)
+
+    def set_keyword(self, keyword):
+        """Switch to a new keyword; rebuilds the grammar-limited recognizer"""
+        keyword = keyword.lower().strip()
+        missing = [word for word in keyword.split() if self.model.find_word(word) == -1]
+        if missing:
+            raise ValueError(f"Wake word not in model vocabulary: {', '.join(missing)}")
+        self.keyword = keyword
+        self.recognizer = KaldiRecognizer(self.model, self.sample_rate, json.dumps([keyword, "[unk]"]))
+
+    def reset(self):
+        """Forget buffered audio (e.g. after the stream was paused)"""
+        self.recognizer.Reset()
+
+    def process(self, chunk):
+        """Feed one chunk of PCM audio; returns True when the keyword is heard"""
+        cpu_start = time.process_time()
+        wall_start = time.perf_counter()
+
+        if self.recognizer.AcceptWaveform(chunk):
+            text = json.loads(self.recognizer.Result()).get("text", "")
+        else:
+            text = json.loads(self.recognizer.PartialResult()).get("partial", "")
+
+        self.cpu_seconds += time.process_time() - cpu_start
+        self.max_chunk_ms = max(self.max_chunk_ms, (time.perf_counter() - wall_start) * 1000)
+        self.chunks += 1
+        self.audio_seconds += len(chunk) / 2 / self.sample_rate
+
+        if self.keyword in text:
+            self.detections += 1
+            self.recognizer.Reset()  # Don't fire twice on the same utterance
+            return True
+        return False
+
+    def stats(self):
+        """CPU use relative to audio processed (real-time factor) and chunk latency"""
+        return {
+            "keyword": self.keyword,
+            "chunks": self.chunks,
+            "audio_seconds": round(self.audio_seconds, 2),
+            "cpu_seconds": round(self.cpu_seconds, 3),
+            "real_time_factor": round(self.cpu_seconds / self.audio_seconds, 4) if self.audio_seconds else 0.0,
+            "avg_chunk_ms": round(self.cpu_seconds * 1000 / self.chunks, 2) if self.chunks else 0.0,
+            "max_chunk_ms": round(self.max_chunk_ms, 2),
+            "detections": self.detections
+        }
@@ -0,0 +1,121 @@
+import concurrent.futures
+import json
+import re
+import threading
+
+_FENCE = re.compile(r"^```(?:json)?\s*|\s*```$")
+
+
+def build_batch_prompt(questions):
+    """One prompt asking for a JSON array with one answer per question"""
+    numbered = "\n".join(f"{i}. {question}" for i, question in enumerate(questions, 1))
+    return (
+        f"Answer each of the following {len(questions)} questions briefly, in one or two sentences.\n"
+        f"Reply with only a JSON array of {len(questions)} strings, the answers in the same order.\n\n"
+        f"{numbered}"
+    )
+
+
+def parse_batch_answers(text, count):
+    """Answers from a batch reply; ValueError unless it holds exactly count of them"""
+    text = _FENCE.sub("", (text or "").strip())
+    start, end = text.find("["), text.rfind("]")
+    if start < 0 or end < start:
+        raise ValueError("No JSON array in batch reply")
+    answers = json.loads(text[start:end + 1])
+    if not isinstance(answers, list) or len(answers) != count:
+        raise ValueError(f"Expected {count} answers, got {len(answers) if isinstance(answers, list) else 'none'}")
+    return [answer if isinstance(answer, str) else json.dumps(answer) for answer in answers]
+
+
+class LLMBatcher:
+    """Answers short questions submitted within `window` seconds with one request
+
+    send(prompt) returns the model's reply to a batch prompt; ask(question)
+    answers a single question and is used for batches of one, and for every
+    question of a batch whose reply cannot be parsed. Errors raised by send
+    are passed to every caller of that batch.
+    """
+
+    def __init__(self, send, ask, window=0.05, max_batch=8, max_chars=200):
+        self.send = send
+        self.ask_one = ask
+        self.window = window
+        self.max_batch = max_batch
+        self.max_chars = max_chars
+        self.pending = []  # (question, future)
+        self.timer = None
+        self.lock = threading.Lock()
+        self.counters = {"questions": 0, "batches": 0, "singles": 0, "fallbacks": 0, "requests_saved": 0}
+
+    def batchable(self, question):
+        return len(question) <= self.max_chars
+
+    def submit(self, question):
+        """Future for the answer to question"""
+        future = concurrent.futures.Future()
+        with self.lock:
+            self.counters["questions"] += 1
+            self.pending.append((question, future))
+            if len(self.pending) >= self.max_batch:
+                self._start_flush()
+            elif self.timer is None:
+                self.timer = threading.Timer(self.window, self._on_timer)
+                self.timer.daemon = True
+                self.timer.start()
+        return future
+
+    def ask(self, question, timeout=None):
+        return self.submit(question).result(timeout)
+
+    def ask_many(self, questions, timeout=None):
+        """Answers in question order; all questions go out in the same window"""
+        futures = [self.submit(question) for question in questions]
+        return [future.result(timeout) for future in futures]
+
+    def _on_timer(self):
+        with self.lock:
+            self._start_flush()
+
+    def _start_flush(self):
+        """Hand the pending batch to a flush thread (caller holds the lock)"""
+        if self.timer is not None:
+            self.timer.cancel()
+            self.timer = None
+        batch, self.pending = self.pending, []
+        if batch:
+            threading.Thread(target=self._flush, args=(batch,), name="llm-batch", daemon=True).start()
+
+    def _flush(self, batch):
+        if len(batch) == 1:
+            self.counters["singles"] += 1
+            self._answer_each(batch)
+            return
+
+        questions = [question for question, _ in batch]
+        try:
+            answers = parse_batch_answers(self.send(build_batch_prompt(questions)), len(batch))
+        except ValueError as e:
+            print(f"Batch reply unusable ({e}), asking individually")
+            self.counters["fallbacks"] += 1
+            self._answer_each(batch)
+            return
+        except Exception as e:
+            for _, future in batch:
+                future.set_exception(e)
+            return
+
+        self.counters["batches"] += 1
+        self.counters["requests_saved"] += len(batch) - 1
+        for (_, future), answer in zip(batch, answers):
+            future.set_result(answer)
+
+    def _answer_each(self, batch):
+        for question, future in batch:
+            try:
+                future.set_result(self.ask_one(question))
+            except Exception as e:
+                future.set_exception(e)
+
+    def stats(self):
+        return dict(self.counters)
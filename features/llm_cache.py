@@ -0,0 +1,249 @@
+import hashlib
+import json
+import os
+import re
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+
+# Same location as config.CACHE_DIR (repository root .cache)
+CACHE_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), ".cache")
+DEFAULT_DB_PATH = os.path.join(CACHE_DIR, "llm_cache.sqlite3")
+
+HOUR = 3600
+DAY = 24 * HOUR
+
+
+class CachePolicy:
+    """How long answers from one call site stay valid; ttl=0 disables caching
+
+    check_prompt=False is for call sites that wrap the user's words in a
+    fixed template: the template's own wording says nothing about freshness,
+    so they pick the policy from the user's topic with topic_policy().
+    """
+
+    def __init__(self, name, ttl, persist=True, check_prompt=True):
+        self.name = name
+        self.ttl = ttl
+        self.persist = persist
+        self.check_prompt = check_prompt
+
+    def __str__(self):
+        return self.name
+
+    @property
+    def cacheable(self):
+        return self.ttl > 0
+
+
+POLICIES = {
+    "default": CachePolicy("default", ttl=HOUR),
+    "query": CachePolicy("query", ttl=6 * HOUR),
+    "explain": CachePolicy("explain", ttl=DAY, check_prompt=False),
+    "research": CachePolicy("research", ttl=7 * DAY, check_prompt=False),
+    "never": CachePolicy("never", ttl=0, persist=False),
+}
+
+# Answers to these change from minute to minute and are never cached
+_TIME_SENSITIVE = re.compile(
+    r"\b(today|tonight|tomorrow|yesterday|now|currently|latest|news|headlines|weather|forecast|"
+    r"this (week|month|year)|what time is it|what day is it|what('s| is) the date|"
+    r"current (events|news|weather|time|date|price|prices|score|president|prime minister)|"
+    r"(live|final) scores?|stock (price|prices|market)|exchange rates?|price of)\b",
+    re.IGNORECASE
+)
+
+
+def is_time_sensitive(prompt):
+    return bool(_TIME_SENSITIVE.search(prompt or ""))
+
+
+def resolve_policy(prompt, policy="default"):
+    """Policy for a call, downgraded to 'never' for time-sensitive prompts"""
+    if isinstance(policy, str):
+        policy = POLICIES.get(policy, POLICIES["default"])
+    if policy.cacheable and policy.check_prompt and is_time_sensitive(prompt):
+        return POLICIES["never"]
+    return policy
+
+
+def topic_policy(topic, policy):
+    """Policy for a templated prompt, judged on the user's topic alone
+
+    A time-sensitive topic gets an uncached policy that keeps the name, so
+    the call is still treated as e.g. long-form research.
+    """
+    if is_time_sensitive(topic):
+        return CachePolicy(policy, ttl=0, persist=False)
+    return policy
+
+
+class LLMCache:
+    """Two-tier LRU + TTL cache for model responses
+
+    The memory tier is an OrderedDict bounded by both entry count and total
+    bytes (key + UTF-8 value). With a db_path, entries whose policy allows it
+    are also written to SQLite so answers survive restarts; disk hits are
+    promoted back into memory.
+    """
+
+    def __init__(self, max_bytes=4 * 1024 * 1024, max_entries=500, db_path=None):
+        self.max_bytes = max_bytes
+        self.max_entries = max_entries
+        self.entries = OrderedDict()  # key -> (value, expires_at, size)
+        self.bytes = 0
+        self.lock = threading.RLock()
+        self.db = self._open_db(db_path) if db_path else None
+        self.counters = {
+            "hits": 0,
+            "memory_hits": 0,
+            "disk_hits": 0,
+            "misses": 0,
+            "bypassed": 0,
+            "expired": 0,
+            "evictions": 0,
+        }
+
+    @staticmethod
+    def _open_db(path):
+        try:
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            db = sqlite3.connect(path, check_same_thread=False)
+            db.execute("PRAGMA journal_mode=WAL")
+            db.execute(
+                "CREATE TABLE IF NOT EXISTS responses ("
+                "key TEXT PRIMARY KEY, value TEXT NOT NULL, expires_at REAL NOT NULL)"
+            )
+            db.commit()
+            return db
+        except sqlite3.Error as e:
+            print(f"LLM cache persistence disabled: {e}")
+            return None
+
+    @staticmethod
+    def make_key(prompt, config=None, model=""):
+        """Stable key from the prompt text and the generation settings"""
+        normalized = " ".join((prompt or "").lower().split())
+        raw = json.dumps([model, normalized, config or {}], sort_keys=True, default=str)
+        return hashlib.sha256(raw.encode("utf-8")).hexdigest()
+
+    def get(self, prompt, policy="default", config=None, model=""):
+        """Cached response or None; counts a bypass for uncacheable prompts"""
+        policy = resolve_policy(prompt, policy)
+        with self.lock:
+            if not policy.cacheable:
+                self.counters["bypassed"] += 1
+                return None
+            key = self.make_key(prompt, config, model)
+            now = time.time()
+
+            entry = self.entries.get(key)
+            if entry:
+                value, expires_at, _ = entry
+                if expires_at > now:
+                    self.entries.move_to_end(key)
+                    self.counters["hits"] += 1
+                    self.counters["memory_hits"] += 1
+                    return value
+                self._remove(key)
+                self.counters["expired"] += 1
+
+            value = self._db_get(key, now)
+            if value is not None:
+                self.counters["hits"] += 1
+                self.counters["disk_hits"] += 1
+                return value
+
+            self.counters["misses"] += 1
+            return None
+
+    def put(self, prompt, value, policy="default", config=None, model=""):
+        policy = resolve_policy(prompt, policy)
+        if not policy.cacheable or not value:
+            return
+        key = self.make_key(prompt, config, model)
+        expires_at = time.time() + policy.ttl
+        with self.lock:
+            self._store(key, value, expires_at)
+            if self.db and policy.persist:
+                try:
+                    self.db.execute(
+                        "INSERT OR REPLACE INTO responses (key, value, expires_at) VALUES (?, ?, ?)",
+                        (key, value, expires_at)
+                    )
+                    self.db.commit()
+                except sqlite3.Error as e:
+                    print(f"LLM cache write error: {e}")
+
+    def _db_get(self, key, now):
+        if not self.db:
+            return None
+        try:
+            row = self.db.execute(
+                "SELECT value, expires_at FROM responses WHERE key = ?", (key,)
+            ).fetchone()
+        except sqlite3.Error:
+            return None
+        if not row:
+            return None
+        value, expires_at = row
+        if expires_at <= now:
+            self.counters["expired"] += 1
+            return None
+        self._store(key, value, expires_at)  # Promote to memory
+        return value
+
+    def _store(self, key, value, expires_at):
+        if key in self.entries:
+            self._remove(key)
+        size = len(key) + len(value.encode("utf-8"))
+        self.entries[key] = (value, expires_at, size)
+        self.bytes += size
+        self._evict(self.max_bytes, self.max_entries)
+
+    def _remove(self, key):
+        _, _, size = self.entries.pop(key)
+        self.bytes -= size
+
+    def _evict(self, max_bytes, max_entries):
+        while self.entries and (self.bytes > max_bytes or len(self.entries) > max_entries):
+            key = next(iter(self.entries))
+            self._remove(key)
+            self.counters["evictions"] += 1
+
+    def trim(self, max_bytes=None):
+        """Drop expired entries, then LRU entries down to max_bytes (default: the bound)"""
+        now = time.time()
+        with self.lock:
+            for key in [k for k, (_, expires_at, _) in self.entries.items() if expires_at <= now]:
+                self._remove(key)
+                self.counters["expired"] += 1
+            self._evict(self.max_bytes if max_bytes is None else max_bytes, self.max_entries)
+            if self.db:
+                try:
+                    self.db.execute("DELETE FROM responses WHERE expires_at <= ?", (now,))
+                    self.db.commit()
+                except sqlite3.Error as e:
+                    print(f"LLM cache trim error: {e}")
+
+    def clear(self):
+        with self.lock:
+            self.entries.clear()
+            self.bytes = 0
+            if self.db:
+                self.db.execute("DELETE FROM responses")
+                self.db.commit()
+
+    def __len__(self):
+        return len(self.entries)
+
+    def stats(self):
+        with self.lock:
+            lookups = self.counters["hits"] + self.counters["misses"]
+            return dict(
+                self.counters,
+                entries=len(self.entries),
+                bytes=self.bytes,
+                hit_rate=round(self.counters["hits"] / lookups, 3) if lookups else 0.0
+            )
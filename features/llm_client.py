@@ -0,0 +1,249 @@
+import asyncio
+import concurrent.futures
+import functools
+import os
+import random
+import threading
+import time
+from collections import defaultdict, deque
+
+_END = object()
+
+
+class LLMError(Exception):
+    """Base class for client-side LLM call failures"""
+
+
+class LLMTimeout(LLMError):
+    """The call did not finish before its deadline"""
+
+
+class LLMCancelled(LLMError):
+    """The call was cancelled (stop command or wake word)"""
+
+
+class RateLimiter:
+    """Token bucket shared by every request the client sends (hedges and retries included)
+
+    Only used from the client's event loop thread, so it needs no lock.
+    """
+
+    def __init__(self, per_minute=60, burst=5):
+        self.rate = per_minute / 60.0
+        self.capacity = burst
+        self.tokens = float(burst)
+        self.updated = time.monotonic()
+        self.waits = 0
+
+    def _refill(self):
+        now = time.monotonic()
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+
+    def available(self):
+        self._refill()
+        return self.tokens
+
+    async def acquire(self):
+        self._refill()
+        while self.tokens < 1:
+            self.waits += 1
+            await asyncio.sleep((1 - self.tokens) / self.rate)
+            self._refill()
+        self.tokens -= 1
+
+
+class LLMClient:
+    """Runs blocking model SDK calls under an asyncio event loop thread
+
+    Every call gets a deadline and exponential-backoff retries. Idempotent
+    calls are hedged: if the first request is slower than the recent p95 for
+    that call name, a duplicate is sent and whichever finishes first wins.
+    cancel_all() abandons every in-flight call; callers get LLMCancelled.
+    """
+
+    def __init__(self, max_workers=8, hedge_default=2.0, hedge_min=0.5, min_samples=10,
+                 backoff=0.5, max_backoff=4.0, requests_per_minute=None):
+        self.max_workers = max_workers
+        # Without an explicit rate, GEMINI_RPM is read on first use: the shared
+        # client is created at import, before .env has been loaded
+        self.requests_per_minute = requests_per_minute
+        self.limiter = RateLimiter(requests_per_minute or 60)
+        self.hedge_default = hedge_default
+        self.hedge_min = hedge_min
+        self.min_samples = min_samples
+        self.backoff = backoff
+        self.max_backoff = max_backoff
+
+        self.loop = None
+        self.executor = None
+        self._start_lock = threading.Lock()
+        self.pending = set()
+        self.pending_lock = threading.Lock()
+        self.latencies = defaultdict(lambda: deque(maxlen=100))
+
+        self.counters = {
+            "calls": 0, "retries": 0, "hedges": 0, "hedge_wins": 0,
+            "timeouts": 0, "cancelled": 0, "errors": 0,
+        }
+
+    def _ensure_started(self):
+        """Start the loop thread and worker pool on first use"""
+        with self._start_lock:
+            if self.loop is None:
+                if self.requests_per_minute is None:
+                    self.limiter.rate = float(os.getenv("GEMINI_RPM", "60")) / 60.0
+                self.executor = concurrent.futures.ThreadPoolExecutor(self.max_workers, thread_name_prefix="llm")
+                self.loop = asyncio.new_event_loop()
+                threading.Thread(target=self.loop.run_forever, name="llm-client", daemon=True).start()
+
+    def hedge_delay(self, name):
+        """p95 latency of recent successful calls with this name"""
+        samples = sorted(self.latencies[name])
+        if len(samples) < self.min_samples:
+            return self.hedge_default
+        return max(self.hedge_min, samples[int(0.95 * (len(samples) - 1))])
+
+    @staticmethod
+    def _retryable(error):
+        if isinstance(error, (LLMError, ValueError, TypeError, AttributeError)):
+            return False
+        code = getattr(error, "code", None)  # google.api_core errors carry the HTTP status
+        code = getattr(code, "value", code)
+        if isinstance(code, int) and 400 <= code < 500 and code != 429:
+            return False
+        return True
+
+    async def _attempt(self, name, job, hedge, rate_limit):
+        loop = asyncio.get_running_loop()
+        if rate_limit:
+            await self.limiter.acquire()
+        started = time.perf_counter()
+        primary = loop.run_in_executor(self.executor, job)
+        tasks = {primary}
+        if hedge:
+            done, _ = await asyncio.wait(tasks, timeout=self.hedge_delay(name))
+            # Hedge only with spare quota; a duplicate must not push other calls into 429s
+            if not done and (not rate_limit or self.limiter.available() >= 1):
+                if rate_limit:
+                    await self.limiter.acquire()
+                self.counters["hedges"] += 1
+                tasks.add(loop.run_in_executor(self.executor, job))
+
+        error = None
+        try:
+            while tasks:
+                done, tasks = await asyncio.wait(tasks, return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    if task.exception() is None:
+                        if task is not primary:
+                            self.counters["hedge_wins"] += 1
+                        self.latencies[name].append(time.perf_counter() - started)
+                        return task.result()
+                    error = task.exception()
+            raise error
+        finally:
+            for task in tasks:
+                task.cancel()  # The SDK call may still finish in its thread; its result is dropped
+
+    async def _call(self, name, job, deadline, hedge, retries, rate_limit):
+        async def attempts():
+            delay = self.backoff
+            for attempt in range(retries + 1):
+                try:
+                    return await self._attempt(name, job, hedge, rate_limit)
+                except Exception as e:
+                    if attempt == retries or not self._retryable(e):
+                        raise
+                    self.counters["retries"] += 1
+                    await asyncio.sleep(min(delay, self.max_backoff) * random.uniform(0.8, 1.2))
+                    delay *= 2
+
+        try:
+            return await asyncio.wait_for(attempts(), deadline)
+        except asyncio.TimeoutError:
+            self.counters["timeouts"] += 1
+            raise LLMTimeout(f"{name} call exceeded its {deadline:g}s deadline")
+
+    def call(self, fn, *args, name="gemini", deadline=30.0, hedge=True, retries=2, rate_limit=True, **kwargs):
+        """Run fn(*args, **kwargs) with a deadline, retries and optional hedging
+
+        Use hedge=False (and usually retries=0) for calls with side effects,
+        such as chat sends, which must not run twice. rate_limit=False skips
+        the Gemini request quota (local models, reading further stream chunks).
+        """
+        self._ensure_started()
+        self.counters["calls"] += 1
+        job = functools.partial(fn, *args, **kwargs)
+        future = asyncio.run_coroutine_threadsafe(self._call(name, job, deadline, hedge, retries, rate_limit),
+                                                  self.loop)
+        with self.pending_lock:
+            self.pending.add(future)
+        try:
+            return self._wait(future)
+        except LLMError:
+            raise
+        except Exception:
+            self.counters["errors"] += 1
+            raise
+        finally:
+            with self.pending_lock:
+                self.pending.discard(future)
+
+    def _wait(self, future):
+        try:
+            return future.result()
+        except concurrent.futures.CancelledError:
+            self.counters["cancelled"] += 1
+            raise LLMCancelled("Request cancelled")
+
+    def stream(self, fn, *args, name="gemini", deadline=30.0, idle_timeout=15.0, retries=1, rate_limit=True,
+               **kwargs):
+        """Yield items of a streaming call; deadline covers the request, idle_timeout each chunk"""
+        iterator = iter(self.call(fn, *args, name=name, deadline=deadline, hedge=False, retries=retries,
+                                  rate_limit=rate_limit, **kwargs))
+        while True:
+            item = self.call(next, iterator, _END, name=f"{name}.chunk", deadline=idle_timeout,
+                             hedge=False, retries=0, rate_limit=False)
+            if item is _END:
+                return
+            yield item
+
+    def map(self, fn, items, max_workers=4, on_error=None):
+        """fn(item) for every item on a bounded pool, results in input order
+
+        Every request still passes the shared rate limiter. A failing item does
+        not affect the others: its slot holds on_error(item, error), or the
+        exception itself when no on_error is given.
+        """
+        items = list(items)
+        if not items:
+            return []
+
+        def run(item):
+            try:
+                return fn(item)
+            except Exception as e:
+                return on_error(item, e) if on_error else e
+
+        # Own pool: fn blocks on call(), which needs the SDK pool to stay free
+        with concurrent.futures.ThreadPoolExecutor(min(max_workers, len(items)),
+                                                   thread_name_prefix="llm-map") as pool:
+            return list(pool.map(run, items))
+
+    def cancel_all(self):
+        """Cancel every in-flight call; returns how many were cancelled"""
+        with self.pending_lock:
+            futures = list(self.pending)
+        return sum(1 for future in futures if future.cancel())
+
+    def stats(self):
+        return dict(
+            self.counters,
+            rate_limited=self.limiter.waits,
+            p95={name: round(self.hedge_delay(name), 2) for name in list(self.latencies)}
+        )
+
+
+# Shared by every Gemini call site
+llm_client = LLMClient()
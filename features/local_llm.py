@@ -0,0 +1,187 @@
+import json
+import os
+import re
+import threading
+import time
+
+import requests
+from requests.adapters import HTTPAdapter
+
+
+# Prompts asking for long-form output always go to Gemini
+_LONG_FORM = re.compile(
+    r"\b(essay|article|report|research|in detail|step by step|write|draft|summari[sz]e|compare|plan)\b", re.I)
+
+
+class LocalLLMError(Exception):
+    """The local model is unreachable, too slow or returned an error"""
+
+
+def ollama_options(config):
+    """Map Gemini generation settings onto Ollama's options"""
+    config = config or {}
+    mapping = {"temperature": "temperature", "top_k": "top_k", "top_p": "top_p",
+               "max_output_tokens": "num_predict", "stop_sequences": "stop"}
+    return {ollama: config[gemini] for gemini, ollama in mapping.items() if gemini in config}
+
+
+class OllamaClient:
+    """Client for a local Ollama server over one pooled keep-alive HTTP session
+
+    read_timeout is the longest wait for the next streamed token, so a model
+    that is still loading or overloaded counts as slow and fails fast. After
+    a connection failure the server is considered down for `retry_after`
+    seconds and calls fail immediately instead of probing it again.
+    """
+
+    def __init__(self, base_url=None, model=None, connect_timeout=0.5,
+                 read_timeout=5.0, retry_after=30.0, pool_size=4):
+        # Read here rather than at import, after the caller has loaded .env.
+        # OLLAMA_URL is opt-in: unset means no local tier, so installs without Ollama never probe localhost
+        if base_url is None:
+            base_url = os.getenv("OLLAMA_URL", "")
+        self.base_url = base_url.rstrip("/")
+        self.model = model or os.getenv("OLLAMA_MODEL", "mistral")
+        self.connect_timeout = connect_timeout
+        self.read_timeout = read_timeout
+        self.retry_after = retry_after
+        self.down_until = 0.0
+        self.lock = threading.Lock()
+        self.counters = {"requests": 0, "errors": 0, "skipped_down": 0}
+
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=pool_size, max_retries=0)
+        self.session.mount("http://", adapter)
+        self.session.mount("https://", adapter)
+
+    @property
+    def generate_url(self):
+        return f"{self.base_url}/api/generate"
+
+    def available(self):
+        return bool(self.base_url) and time.monotonic() >= self.down_until
+
+    def _mark_down(self):
+        with self.lock:
+            self.counters["errors"] += 1
+            self.down_until = time.monotonic() + self.retry_after
+
+    def stream(self, prompt, options=None, deadline=20.0):
+        """Yield response text chunks from the NDJSON stream"""
+        if not self.available():
+            self.counters["skipped_down"] += 1
+            raise LocalLLMError("Local model unavailable")
+        self.counters["requests"] += 1
+        payload = {"model": self.model, "prompt": prompt, "stream": True, "options": options or {}}
+        started = time.monotonic()
+        try:
+            with self.session.post(self.generate_url, json=payload, stream=True,
+                                   timeout=(self.connect_timeout, self.read_timeout)) as response:
+                if response.status_code != 200:
+                    raise LocalLLMError(f"Ollama returned HTTP {response.status_code}")
+                for line in response.iter_lines():
+                    if not line:
+                        continue
+                    message = json.loads(line)
+                    if message.get("error"):
+                        raise LocalLLMError(message["error"])
+                    if message.get("response"):
+                        yield message["response"]
+                    if message.get("done"):
+                        return
+                    if time.monotonic() - started > deadline:
+                        raise LocalLLMError(f"Local model exceeded its {deadline:g}s deadline")
+        except requests.ConnectionError as e:
+            self._mark_down()
+            raise LocalLLMError(f"Cannot reach Ollama at {self.base_url}: {e}")
+        except (requests.Timeout, ValueError) as e:
+            self.counters["errors"] += 1
+            raise LocalLLMError(f"Local model failed: {e}")
+
+    def generate(self, prompt, options=None, deadline=20.0):
+        return "".join(self.stream(prompt, options, deadline)).strip()
+
+    def stats(self):
+        return dict(self.counters, model=self.model, available=self.available())
+
+
+class ModelRouter:
+    """Sends short factual or chit-chat prompts to the local model, the rest to Gemini
+
+    Either side falls back to the other when it fails or is too slow. Remote
+    calls are passed in as zero-argument callables that raise on failure.
+    Cancellation errors (cancel_errors) are re-raised, never retried elsewhere.
+    Local calls are made through call(fn, *args).
+    """
+
+    def __init__(self, local, max_local_words=30, local_deadline=8.0, cancel_errors=(), call=None):
+        self.local = local
+        self.call = call or (lambda fn, *args: fn(*args))  # e.g. run under the shared LLM client
+        self.max_local_words = max_local_words
+        self.local_deadline = local_deadline
+        self.cancel_errors = cancel_errors
+        self.counters = {"local": 0, "remote": 0, "local_fallbacks": 0, "remote_fallbacks": 0}
+
+    def prefers_local(self, prompt, long_form=False):
+        if long_form or not self.local.available():
+            return False
+        return len(prompt.split()) <= self.max_local_words and not _LONG_FORM.search(prompt)
+
+    def generate(self, prompt, remote, long_form=False, options=None):
+        if self.prefers_local(prompt, long_form):
+            try:
+                text = self.call(self.local.generate, prompt, options, self.local_deadline)
+                if text:
+                    self.counters["local"] += 1
+                    return text
+            except self.cancel_errors:
+                raise
+            except Exception as e:
+                print(f"Local model fallback: {e}")
+            self.counters["local_fallbacks"] += 1
+            return self._remote(remote)
+
+        try:
+            return self._remote(remote)
+        except self.cancel_errors:
+            raise
+        except Exception as e:
+            if not self.local.available():
+                raise
+            print(f"Gemini unavailable ({e}), answering locally")
+            self.counters["remote_fallbacks"] += 1
+            return self.call(self.local.generate, prompt, options, self.local_deadline * 2)
+
+    def _remote(self, remote):
+        self.counters["remote"] += 1
+        return remote()
+
+    def stream(self, prompt, remote_stream, long_form=False, options=None):
+        """Yield chunks; falls back only while nothing has been yielded yet"""
+        sources = [("local", lambda: self.local.stream(prompt, options, self.local_deadline)), ("remote", remote_stream)]
+        if not self.prefers_local(prompt, long_form):
+            sources.reverse()
+            if not self.local.available():
+                sources.pop()
+
+        for position, (side, source) in enumerate(sources):
+            last = position == len(sources) - 1
+            yielded = False
+            try:
+                for chunk in source():
+                    yielded = True
+                    yield chunk
+                if yielded or last:
+                    self.counters[side] += 1
+                    return
+                print(f"{side.capitalize()} model returned nothing, falling back")
+            except self.cancel_errors:
+                raise
+            except Exception as e:
+                if yielded or last:
+                    raise
+                print(f"{side.capitalize()} model fallback: {e}")
+            self.counters[f"{side}_fallbacks"] += 1
+
+    def stats(self):
+        return dict(self.counters, local_model=self.local.stats())
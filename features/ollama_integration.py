@@ -1,12 +1,16 @@
 # Standard library imports
 import sys
+
+# Must run before the other imports so --profile-startup can time them
+from startup_profiler import profiler_from_argv
+startup_profiler = profiler_from_argv(sys.argv)
+
 import os
 import shutil
 import logging
 import keyboard
 import time
 import threading
-from queue import Queue, Empty
 import speech_recognition as sr
 import atexit
 import urllib3
@@ -40,126 +44,129 @@ logging.basicConfig(
 )
 logger = logging.getLogger(__name__)
 
-# Local imports - using relative imports
-from voice_recognition import VoiceRecognition
-from tts_service import TTSService
-from wake_word_detection import WakeWordDetection
-from spotify_control import SpotifyControl
-from system_control import SystemControl
-from quick_actions import QuickActions
-from browser_control import BrowserControl
-from file_search import FileManager
-from ai_services import AIServices
-from camera_control import CameraControl
-from search_control import SearchControl
-from notification_service import NotificationService
-from conversation_handler import ConversationHandler
-from conversation_manager import ConversationManager
-
-# Initialize components
+# Local imports - services are created lazily through the registry
+from service_registry import services, CRITICAL_SERVICES, deferred
+from intent_router import router, run_commands, split_commands
+from llm_client import llm_client
+from single_flight import single_flight
+from voice_pipeline import VoicePipeline
+from event_bus import bus, WAKE_WORD, COMMAND, QUIT
+
+# Service handles. Each one is built on first use and shared process-wide, so
+# importing this module no longer constructs Spotify, Selenium, OpenCV or Gemini.
 print("Initializing components...")
-spotify = SpotifyControl()
-system = SystemControl()
-quick = QuickActions()
-browser = BrowserControl()
-files = FileManager()
+spotify = services.lazy("spotify")
+system = services.lazy("system")
+quick = services.lazy("quick")
+browser = services.lazy("browser")
+files = services.lazy("files")
 
-# Initialize TTS engine with specific settings
-tts_service = TTSService()
-speech_queue = Queue()
-is_speaking = False
-stop_speaking = False
+# TTS engine
+tts_service = services.lazy("tts")
 
-# Initialize AI services first
-ai_services = AIServices()
+# AI services
+ai_services = services.lazy("ai_services")
 
-# Initialize camera
-camera = CameraControl()
+# Camera
+camera = services.lazy("camera")
 
-# Initialize search control
-search = SearchControl()
+# Search control
+search = services.lazy("search")
 
-# Initialize notification service first
-notifier = NotificationService()
+# Notification service
+notifier = services.lazy("notifier")
 
-# Initialize voice recognition
-voice = VoiceRecognition()
+# Voice recognition
+voice = services.lazy("voice")
 
-# Initialize wake word detection with notifier and TTS
-wake_word = WakeWordDetection(
-    notifier=notifier,
-    tts_service=tts_service
-)
+# Wake word detection (pulls in notifier and TTS when created)
+wake_word = services.lazy("wake_word")
+
+# Conversation handler (pulls in AI services)
+conversation = services.lazy("conversation")
 
-# Initialize conversation handler with AI services
-conversation = ConversationHandler(ai_services)
+# Conversation manager
+conversation_manager = services.lazy("conversation_manager")
 
-# Initialize conversation manager
-conversation_manager = ConversationManager(ai_services)
+# Command handlers keyed by route name. Routing itself happens once per
+# utterance in intent_router; these tables only say what each path does with
+# a route. Each handler receives the RouteMatch (route name, slots, text).
+def _voice_type(name):
+    """Map a spoken voice name to a TTSService voice type"""
+    return "hinglish" if name in ("hindi", "hinglish") else name
 
-# Command handlers dictionary - moved to top level for better organization
 COMMAND_HANDLERS = {
-    "music": {
-        "play": lambda t, spotify: spotify.play_music(t.replace("play", "").strip()) if t.replace("play", "").strip() else "Please specify what to play",
-        "pause": lambda _, spotify: spotify.pause_music(),
-        "stop music": lambda _, spotify: spotify.pause_music(),
-        "pause music": lambda _, spotify: spotify.pause_music(),
-        "stop song": lambda _, spotify: spotify.pause_music(),
-        "pause song": lambda _, spotify: spotify.pause_music(),
-        "next": lambda _, spotify: spotify.next_track(),
-        "previous": lambda _, spotify: spotify.previous_track(),
-        "back": lambda _, spotify: spotify.previous_track()
-    },
-    "system": {
-        "volume up": lambda _, system: system.increase_volume(),
-        "volume down": lambda _, system: system.decrease_volume(),
-        "increase volume": lambda _, system: system.increase_volume(),
-        "decrease volume": lambda _, system: system.decrease_volume(),
-    },
-    "shortcuts": {
-        "copy": lambda _, quick: quick.press_shortcut("copy"),
-        "paste": lambda _, quick: quick.press_shortcut("paste"),
-        "cut": lambda _, quick: quick.press_shortcut("cut"),
-        "select all": lambda _, quick: quick.press_shortcut("select_all"),
-        "save": lambda _, quick: quick.press_shortcut("save"),
-        "undo": lambda _, quick: quick.press_shortcut("undo")
-    },
-    "camera": {
-        "take picture": lambda _, camera: handle_camera_command(camera),
-        "capture image": lambda _, camera: handle_camera_command(camera),
-        "what do you see": lambda _, camera: handle_camera_command(camera)
-    },
-    "files": {
-        "open files": lambda _, files: files.open_file_explorer(),
-        "search files": lambda t, files: files.search_in_explorer(t.replace("search files", "").replace("for", "").strip()),
-        "find file": lambda t, files: files.search_in_explorer(t.replace("find file", "").replace("find", "").strip())
-    },
-    "search": {
-        "search for": lambda t, search: handle_search_command(t, search),
-        "find": lambda t, search: handle_search_command(t, search),
-        "look up": lambda t, search: handle_search_command(t, search)
-    },
-    "voice": {
-        "change voice to hindi": lambda _, __: tts_service.change_voice("hinglish"),
-        "change voice to hinglish": lambda _, __: tts_service.change_voice("hinglish"),
-        "change voice to english": lambda _, __: tts_service.change_voice("english")
-    },
-    "screenshot": {
-        "take screenshot": lambda _, system: handle_screenshot_command(system),
-        "capture screen": lambda _, system: handle_screenshot_command(system),
-        "screenshot": lambda _, system: handle_screenshot_command(system)
-    },
-    "wake_word": {
-        "change wake word to": lambda t, _: wake_word.set_wake_word(t.replace("change wake word to", "").strip()),
-        "set wake word to": lambda t, _: wake_word.set_wake_word(t.replace("set wake word to", "").strip())
-    }
+    # Music
+    "music.play": lambda m: spotify.play_music(m.slot("query")) if m.slot("query") else "Please specify what to play",
+    "music.play_youtube": lambda m: browser.play_youtube(m.slot("query")),
+    "music.pause": lambda m: spotify.pause_music(),
+    "music.next": lambda m: spotify.next_track(),
+    "music.previous": lambda m: spotify.previous_track(),
+    # System
+    "volume.up": lambda m: system.increase_volume(),
+    "volume.down": lambda m: system.decrease_volume(),
+    "screenshot": lambda m: handle_screenshot_command(system),
+    # Keyboard shortcuts
+    "shortcut.copy": lambda m: quick.press_shortcut("copy"),
+    "shortcut.paste": lambda m: quick.press_shortcut("paste"),
+    "shortcut.cut": lambda m: quick.press_shortcut("cut"),
+    "shortcut.select_all": lambda m: quick.press_shortcut("select_all"),
+    "shortcut.save": lambda m: quick.press_shortcut("save"),
+    "shortcut.undo": lambda m: quick.press_shortcut("undo"),
+    # Camera
+    "camera.photo": lambda m: handle_camera_command(camera),
+    "camera.see": lambda m: handle_camera_command(camera),
+    # Files
+    "files.explorer": lambda m: handle_file_explorer_command(),
+    "files.open": lambda m: handle_file_explorer_command(),
+    "files.search": lambda m: files.search_in_explorer(m.slot("query")),
+    # Applications
+    "app.open": lambda m: handle_open_command(f"open {m.slot('app')}", quick, browser),
+    "app.start": lambda m: handle_open_command(f"open {m.slot('app')}", quick, browser),
+    "app.close": lambda m: handle_close_command(m.text, quick, browser),
+    # Search
+    "search.youtube": lambda m: browser.search_site("youtube", m.slot("query")) if m.slot("query") else "Please specify what to search on YouTube",
+    "search.google": lambda m: browser.search_site("google", m.slot("query")) if m.slot("query") else "Please specify what to search for",
+    # Typing
+    "type": lambda m: quick.type_text(m.slot("text")) if m.slot("text") else "Please specify what to type",
+    # Voice and wake word
+    "voice.change": lambda m: tts_service.change_voice(_voice_type(m.slot("voice"))),
+    "wake_word.set": lambda m: wake_word.set_wake_word(m.slot("word")),
+    # Basic conversation handling without AI interpretation
+    "smalltalk.greeting": lambda m: "Hello! How can I help you?",
+    "smalltalk.joke": lambda m: "Why don't scientists trust atoms? Because they make up everything!",
+    "smalltalk.thanks": lambda m: "You're welcome!",
+}
+
+# Routes handled directly by process_voice_input; anything else goes to the conversation handler
+VOICE_HANDLERS = {
+    "help": lambda m: speak_capabilities(),
+    "stop": lambda m: handle_stop_command() or "Stopped all activities",
+    "music.play": lambda m: spotify.play_music(m.slot("query")),
+    "music.play_youtube": lambda m: browser.play_youtube(m.slot("query")),
+    "music.pause": lambda m: spotify.pause_music(),
+    "music.next": lambda m: spotify.next_track(),
+    "music.previous": lambda m: spotify.previous_track(),
+    "volume.up": lambda m: system.increase_volume(),
+    "volume.down": lambda m: system.decrease_volume(),
+    "search.youtube": lambda m: browser.search_youtube(m.slot("query")),
+    "search.google": lambda m: browser.search_google(m.slot("query")),
+    "app.open": lambda m: quick.open_application(m.slot("app")),
+    "app.start": lambda m: quick.open_application(m.slot("app")),
+    "app.close": lambda m: quick.close_application(m.slot("app")),
+    "camera.see": lambda m: describe_camera_view(),
+    "flight": lambda m: handle_flight_route(m),
+    "price": lambda m: handle_price_route(m),
+    "research": lambda m: handle_research_route(m),
 }
 
+# Routes whose handlers speak for themselves; the voice pipeline does not speak their results
+SELF_SPEAKING_ROUTES = ("help", "stop", "camera.see")
+
+# Built in main() once the critical services exist
+voice_pipeline = None
+
 # Add to global variables
-STOP_KEYWORDS = {"stop", "halt", "quiet", "silence", "shut up", "stop speaking", "be quiet"}
-is_processing = False  # Track if assistant is processing anything
-command_queue = Queue()
-MAX_QUEUE_SIZE = 5
 COMMAND_COOLDOWN = 1.0  # seconds
 last_command_time = 0
 
@@ -168,46 +175,87 @@ def cleanup_resources():
     try:
         print("\nCleaning up resources...")
         
-        # Clean up TTS engine
-        global tts_service, spotify, system, browser
-        if tts_service:
+        # Report offline wake word CPU use for this session
+        wake = services.peek("wake_word")
+        if wake and getattr(wake, "spotter", None):
+            print(f"Wake word spotter: {wake.spotter_stats()}")
+
+        # Report LLM cache effectiveness for this session
+        ai = services.peek("ai_services")
+        if ai and hasattr(ai, "prompt_cache"):
+            print(f"LLM cache: {ai.prompt_cache.stats()}")
+            print(f"Semantic cache: {ai.semantic_cache.stats()}")
+            print(f"LLM batcher: {ai.batcher.stats()}")
+            print(f"Model router: {ai.router.stats()}")
+        conversation = services.peek("conversation")
+        if conversation and hasattr(conversation, "context"):
+            print(f"Chat context: {conversation.context.stats()}")
+            if conversation.prefetcher:
+                print(f"Speculative prefetch: {conversation.prefetcher.stats()}")
+        file_manager = services.peek("files")
+        if file_manager and hasattr(file_manager, "index"):
+            print(f"File index: {file_manager.index.stats()}")
+            print(f"File catalog watcher: {file_manager.watcher.stats()}")
+            print(f"File crawler: {file_manager.crawler.stats()}")
+            print(f"Duplicate finder: {file_manager.duplicates.stats()}")
+        print(f"LLM client: {llm_client.stats()}")
+        print(f"Single-flight: {single_flight.stats()}")
+        print(f"Event bus: {bus.stats()}")
+        if voice_pipeline:
+            print(f"Voice pipeline latency (ms): {voice_pipeline.stats()}")
+
+        # Only services that were actually created need cleaning up
+        tts = services.peek("tts")
+        if tts:
             try:
-                tts_service.stop_speaking()
-                tts_service = None
+                print(f"TTS worker: {tts.metrics()}")
+                tts.stop_speaking()
+                tts.close()
             except:
                 pass
 
         # Clean up Spotify
-        if spotify:
+        spotify_control = services.peek("spotify")
+        if spotify_control:
             try:
-                if hasattr(spotify, 'sp'):
-                    spotify.sp = None
-                spotify = None
+                if hasattr(spotify_control, 'sp'):
+                    spotify_control.sp = None
             except:
                 pass
 
         # Clean up System resources
-        if system:
+        system_control = services.peek("system")
+        if system_control:
             try:
-                if hasattr(system, 'volume'):
-                    system.volume = None
-                system = None
+                if hasattr(system_control, 'volume'):
+                    system_control.volume = None
             except:
                 pass
 
         # Clean up Browser
-        if browser:
+        browser_control = services.peek("browser")
+        if browser_control:
             try:
-                if hasattr(browser, 'driver'):
-                    browser.cleanup()
-                browser = None
+                if hasattr(browser_control, 'driver'):
+                    browser_control.cleanup()
             except:
                 pass
 
+        # Stop the capture thread and release the input device
+        microphone = services.peek("microphone")
+        if microphone:
+            try:
+                microphone.stop()
+            except:
+                pass
+
+        for name in ("tts", "spotify", "system", "browser", "microphone"):
+            services.discard(name)
+
         # Clean up cache directories
+        # (data/tts_cache is kept: it is a bounded, persistent cache)
         cache_dirs = [
             '.cache',
-            'data/tts_cache',
             'data/captured_images',
             'data/screenshots'
         ]
@@ -235,39 +283,6 @@ def cleanup_resources():
 # Register cleanup function
 atexit.register(cleanup_resources)
 
-def process_speech_queue():
-    """Process queued speech in a separate thread"""
-    try:
-        while True:
-            if not speech_queue.empty() and not stop_speaking:
-                text = speech_queue.get()
-                if text:
-                    tts_service.speak(str(text))
-            time.sleep(0.1)
-    except Exception as e:
-        print(f"Speech queue error: {e}")
-
-def speak_worker():
-    """Worker thread to handle speech queue"""
-    global is_speaking, stop_speaking
-    try:
-        while True:
-            try:
-                if not speech_queue.empty() and not stop_speaking:
-                    text = speech_queue.get_nowait()
-                    if text and str(text).strip():
-                        is_speaking = True
-                        tts_service.speak(str(text))
-                        is_speaking = False
-                        stop_speaking = False
-            except Empty:
-                pass
-            except Exception as e:
-                print(f"Speech error: {e}")
-            time.sleep(0.1)
-    except Exception as e:
-        print(f"Error in speech worker: {e}")
-
 def speak(text):
     """Speak text using TTS service"""
     if text and str(text).strip():
@@ -276,28 +291,38 @@ def speak(text):
         except Exception as e:
             print(f"Speak error: {str(e)}")
 
-def listen():
-    """Listen to user's voice input"""
-    return voice.listen()
-
-def process_voice_input(text=None):
-    """Process voice input and get response"""
-    try:
-        # Get input if not provided
-        if text is None:
-            text = listen()
-        
-        # Validate input
-        if not text or not isinstance(text, str):
-            return None
-        
-        # Clean and normalize input
-        text = text.lower().strip()
-        print(f"Processing command: '{text}'")
-        
-        # Help command
-        if "what can you do" in text:
-            capabilities = """I'm your personal assistant! Here's what I can do:
+def listen(on_partial=None):
+    """Listen to user's voice input
+
+    Short complete commands ("stop", "next song") are accepted from a stable
+    partial result instead of waiting for the end-of-speech timeout; a custom
+    on_partial must return True for those itself.
+    """
+    # The user is speaking: speculative follow-ups that have not started are dropped
+    handler = services.peek("conversation")
+    if getattr(handler, "prefetcher", None):
+        handler.prefetcher.cancel()
+    return voice.listen(on_partial=on_partial or (lambda text: router.match_complete(text) is not None))
+
+def speech_ended_at():
+    """When the last utterance ended (time.monotonic), if the recognizer knows"""
+    return getattr(getattr(voice, "streaming", None), "speech_ended_at", None)
+
+def build_voice_pipeline(on_respond=None):
+    """Voice turns as overlapping stages: listen -> route -> respond -> speak"""
+    return VoicePipeline(
+        listen=listen,
+        router=router,
+        handlers=VOICE_HANDLERS,
+        converse=deferred(conversation, "process_user_input"),  # created on the first chat turn
+        open_speech=tts_service.open_stream,
+        speech_end=speech_ended_at,
+        quiet_routes=SELF_SPEAKING_ROUTES,
+        cancel=llm_client.cancel_all,
+        on_respond=on_respond
+    )
+
+CAPABILITIES = """I'm your personal assistant! Here's what I can do:
 
 🎵 Music Control:
 - "Play [song name]" - Play on Spotify
@@ -321,135 +346,95 @@ def process_voice_input(text=None):
 - "Find best deals for [item]"
 
 Just tell me what you need!"""
-            speak(capabilities)
-            return True
+
+def speak_capabilities():
+    """Help command"""
+    speak(CAPABILITIES)
+    return True
+
+def describe_camera_view():
+    """Take a photo and describe it with Gemini"""
+    print("\n📸 Taking a photo...")
+    photo_result = camera.take_photo()
+    if "saved" in photo_result:
+        photo_path = photo_result.split("as ")[-1].strip()
+        print("🔍 Analyzing image with Gemini...")
         
-        # Stop command
-        if any(word in text for word in STOP_KEYWORDS):
-            print("\n🛑 Stopping all activities...")
-            handle_stop_command()
-            return "Stopped all activities"
+        # Add the prompt for image analysis
+        prompt = """Describe what you see in this image in 2-3 sentences. 
+        Focus on the main subjects, colors, and important details."""
         
-        # Music controls
-        try:
-            if text.startswith('play'):
-                if 'youtube' in text:
-                    query = text.replace('play', '').replace('on youtube', '').strip()
-                    return browser.play_youtube(query)
-                else:
-                    query = text.replace('play', '').strip()
-                    return spotify.play_music(query)
-                    
-            if any(cmd in text for cmd in ['pause', 'stop music', 'pause music']):
-                return spotify.pause_music()
-                
-            if 'next' in text:
-                return spotify.next_track()
-                
-            if 'previous' in text or 'back' in text:
-                return spotify.previous_track()
-        except Exception as e:
-            print(f"Music control error: {e}")
-            return f"Error controlling music: {str(e)}"
+        response = ai_services.analyze_image(photo_path, prompt)
+        print("\n👁️ Image Analysis:")
+        print("------------------")
+        print(response)
+        print("------------------\n")
+        
+        # Speak the analysis
+        speak(f"Here's what I see: {response}")
+        return True  # Return True to indicate success
+    
+    speak("I couldn't take a photo")
+    return "Camera error: Could not take photo"
 
-        # Volume controls
-        try:
-            if 'volume' in text:
-                if any(word in text for word in ['up', 'increase']):
-                    return system.increase_volume()
-                if any(word in text for word in ['down', 'decrease', 'reduce']):
-                    return system.decrease_volume()
-        except Exception as e:
-            print(f"Volume control error: {e}")
-            return f"Error adjusting volume: {str(e)}"
-            
-        # Browser & Search
-        if text.startswith('search'):
-            if 'youtube' in text:
-                query = text.replace('search', '').replace('on youtube', '').strip()
-                return browser.search_youtube(query)
-            if 'google' in text:
-                query = text.replace('search', '').replace('on google', '').strip()
-                return browser.search_google(query)
-
-        # App control
-        if text.startswith('open'):
-            app = text.replace('open', '').strip()
-            return quick.open_application(app)
-            
-        if text.startswith('close'):
-            app = text.replace('close', '').strip()
-            return quick.close_application(app)
-
-        # Camera features
-        if "what do you see" in text:
-            print("\n📸 Taking a photo...")
-            photo_result = camera.take_photo()
-            if "saved" in photo_result:
-                photo_path = photo_result.split("as ")[-1].strip()
-                print("🔍 Analyzing image with Gemini...")
-                
-                # Add the prompt for image analysis
-                prompt = """Describe what you see in this image in 2-3 sentences. 
-                Focus on the main subjects, colors, and important details."""
-                
-                response = ai_services.analyze_image(photo_path, prompt)
-                print("\n👁️ Image Analysis:")
-                print("------------------")
-                print(response)
-                print("------------------\n")
-                
-                # Speak the analysis
-                speak(f"Here's what I see: {response}")
-                return True  # Return True to indicate success
-            
-            speak("I couldn't take a photo")
-            return "Camera error: Could not take photo"
+def handle_flight_route(match):
+    """Flight search from a routed utterance"""
+    try:
+        print("\n✈️ Searching flights...")
+        return ai_services.handle_flight_comparison(match.text)
+    except Exception as e:
+        print(f"Flight search error: {e}")
+        return "Could not process flight search"
 
-        # Flight search
-        if ('flights' in text or 'flight' in text) and 'from' in text and 'to' in text:
-            try:
-                print("\n✈️ Searching flights...")
-                from_idx = text.index('from') + 4
-                to_idx = text.index('to')
-                from_city = text[from_idx:to_idx].strip()
-                to_city = text[to_idx + 2:].strip().split()[0]
-                return ai_services.handle_flight_comparison(from_city, to_city)
-            except Exception as e:
-                print(f"Flight search error: {e}")
-                return "Could not process flight search"
+def handle_price_route(match):
+    """Price comparison from a routed utterance"""
+    try:
+        print("\n💰 Comparing prices...")
+        return ai_services.handle_price_comparison(match.slot("product"))
+    except Exception as e:
+        print(f"Price comparison error: {e}")
+        return "Could not compare prices"
+
+def handle_research_route(match):
+    """Research task from a routed utterance"""
+    topic = match.slot("topic")
+    print(f"\n📚 Researching: {topic}")
+    return ai_services.handle_research_task(topic)
+
+def respond_conversationally(text):
+    """Default route: hand the utterance to the conversation handler
+
+    Chat replies are streamed; each sentence is spoken as soon as it arrives.
+    """
+    with tts_service.open_stream() as spoken:
+        response = conversation.process_user_input(text, on_sentence=spoken.say)
+    if response:
+        print(f"\nResponse: {response}")
+        return response
+    return "I'm not sure how to help with that"
 
-        # Price comparison
-        if 'compare prices' in text or 'price check' in text:
-            try:
-                print("\n💰 Comparing prices...")
-                product = text.split('for')[-1].strip() if 'for' in text else text.split('prices')[-1].strip()
-                return ai_services.handle_price_comparison(product)
-            except Exception as e:
-                print(f"Price comparison error: {e}")
-                return "Could not compare prices"
-
-        # Research
-        if text.startswith('research'):
-            topic = text.replace('research', '').strip()
-            print(f"\n📚 Researching: {topic}")
-            return ai_services.handle_research_task(topic)
-
-        # Default to conversation
-        response = conversation.process_user_input(text)
-        if response:
-            print(f"\nResponse: {response}")
-            return response
-        return "I'm not sure how to help with that"
+def process_voice_input(text=None):
+    """Process voice input and get response"""
+    try:
+        # Get input if not provided
+        if text is None:
+            text = listen()
+        
+        # Validate input
+        if not text or not isinstance(text, str):
+            return None
+        
+        # Clean and normalize input
+        text = text.lower().strip()
+        print(f"Processing command: '{text}'")
+        
+        # One pass over the utterance picks the route; unrouted input is conversation
+        return router.dispatch(text, VOICE_HANDLERS, default=respond_conversationally)
 
     except Exception as e:
         print(f"Voice input error: {e}")
         return f"Error processing command: {str(e)}"
 
-# Make sure to start the speech thread
-speech_thread = threading.Thread(target=speak_worker, daemon=True)
-speech_thread.start()
-
 def validate_command(command):
     """Validate command input"""
     if not command:
@@ -579,118 +564,51 @@ def handle_close_command(text, quick, browser):
     except Exception as e:
         return f"Error closing: {str(e)}"
 
-def execute_single_command(command):
-    """Execute a single command with interactive follow-up"""
-    try:
-        text = validate_command(command)
+def handle_file_explorer_command():
+    """Open File Explorer and walk the user through an optional search"""
+    response = files.open_file_explorer()
+    if "Would you like to search" in response:
+        speak(response)
+        search_response = listen()
         
-        # Handle closing commands first
-        if "close" in text:
-            return handle_close_command(text, quick, browser)
-            
-        # Handle screenshot commands first
-        if any(phrase in text for phrase in ["take screenshot", "capture screen", "screenshot"]):
-            print("Taking screenshot...")  # Debug print
-            return handle_screenshot_command(system)
-            
-        # Handle Spotify commands first
-        if "spotify" in text.lower() or "play" in text.lower():
-            query = text.lower()
+        if search_response and any(word in search_response.lower() for word in ["yes", "yeah", "sure", "okay"]):
+            speak("What would you like to search for?")
+            search_query = listen()
             
-            # Handle play commands
-            if "play" in query:
-                song = query.replace("play", "").replace("on spotify", "").replace("spotify", "").strip()
-                return spotify.play_music(song)
+            if search_query:
+                results = files.search_in_explorer(search_query)
+                speak(results)
                 
-            # Handle other Spotify commands
-            elif "pause" in text or "stop" in text:
-                return spotify.pause_music()
-            elif "next" in text:
-                return spotify.next_track()
-            elif "previous" in text or "back" in text:
-                return spotify.previous_track()
-            
-            return "Please specify a Spotify command"
-
-        # Handle file commands with interaction
-        if "files" in text or "file explorer" in text:
-            response = files.open_file_explorer()
-            if "Would you like to search" in response:
-                speak(response)
-                search_response = listen()
-                
-                if search_response and any(word in search_response.lower() for word in ["yes", "yeah", "sure", "okay"]):
-                    speak("What would you like to search for?")
-                    search_query = listen()
+                # Ask if user wants to open any of the found files
+                if "Found" in results:
+                    speak("Would you like to open any of these files?")
+                    open_response = listen()
                     
-                    if search_query:
-                        results = files.search_in_explorer(search_query)
-                        speak(results)
+                    if open_response and any(word in open_response.lower() for word in ["yes", "yeah", "sure", "okay"]):
+                        speak("Which file number would you like to open?")
+                        file_num = listen()
+                        if file_num and file_num.isdigit():
+                            return files.open_file_by_number(int(file_num))
                         
-                        # Ask if user wants to open any of the found files
-                        if "Found" in results:
-                            speak("Would you like to open any of these files?")
-                            open_response = listen()
-                            
-                            if open_response and any(word in open_response.lower() for word in ["yes", "yeah", "sure", "okay"]):
-                                speak("Which file number would you like to open?")
-                                file_num = listen()
-                                if file_num and file_num.isdigit():
-                                    return files.open_file_by_number(int(file_num))
-                                
-                        return results
-                    return "No search query provided"
-                return "Okay, File Explorer is ready to use"
-            return response
-
-        # Check direct commands first
-        # System commands
-        for cmd, handler in COMMAND_HANDLERS["system"].items():
-            if cmd in text:
-                return handler(text, system)
-                
-        # Keyboard shortcuts
-        for cmd, handler in COMMAND_HANDLERS["shortcuts"].items():
-            if cmd in text:
-                return handler(text, quick)
-        
-        # Music commands
-        for cmd, handler in COMMAND_HANDLERS["music"].items():
-            if cmd in text:
-                return handler(text, spotify)
-
-        # Camera commands
-        for cmd, handler in COMMAND_HANDLERS["camera"].items():
-            if cmd in text:
-                return handler(text, camera)
-
-        # Handle opening commands
-        if "open" in text:
-            return handle_open_command(text, quick, browser)
-            
-        # Handle search commands
-        if "search" in text:
-            if "youtube" in text:
-                query = text.replace("search", "").replace("on youtube", "").replace("youtube", "").strip()
-                return browser.search_site("youtube", query) if query else "Please specify what to search on YouTube"
-            query = text.replace("search", "").strip()
-            return browser.search_site("google", query) if query else "Please specify what to search for"
-        
-        # Handle typing commands
-        if any(cmd in text for cmd in ["type", "write"]):
-            content = text.replace("type", "").replace("write", "").strip()
-            return quick.type_text(content) if content else "Please specify what to type"
-
-        # Basic conversation handling without AI interpretation
-        if any(greeting in text for greeting in ["hi", "hello", "hey"]):
-            return "Hello! How can I help you?"
-        if "joke" in text:
-            return "Why don't scientists trust atoms? Because they make up everything!"
-        if "thank" in text:
-            return "You're welcome!"
+                return results
+            return "No search query provided"
+        return "Okay, File Explorer is ready to use"
+    return response
+
+def ask_gemini(text):
+    """Fallback for commands no route handles"""
+    return ai_services.query_gemini(text)
+
+def execute_single_command(command, unrouted=ask_gemini):
+    """Execute a single command with interactive follow-up
+
+    Unrouted commands go to unrouted(text); with unrouted=None they return
+    None, so the caller can answer several of them at once.
+    """
+    try:
+        text = validate_command(command)
         
-        # AI interpretation as fallback for unknown commands
-        return ai_services.query_gemini(command)
+        return router.dispatch(text, COMMAND_HANDLERS, default=unrouted)
         
     except ValueError as ve:
         return f"Invalid command: {str(ve)}"
@@ -701,31 +619,12 @@ def execute_single_command(command):
 def ask_ollama(query):
     """Handle multiple commands and AI queries"""
     try:
-        # Split into multiple commands using conjunctions
-        commands = []
-        
-        # Split by different conjunctions
-        for splitter in [" and then ", " then ", " and ", ", "]:
-            if splitter in query.lower():
-                commands = [cmd.strip() for cmd in query.lower().split(splitter) if cmd.strip()]
-                break
-        
-        # If no conjunctions found, treat as single command
-        if not commands:
-            commands = [query]
-        
-        # Execute each command in sequence
-        responses = []
-        for cmd in commands:
+        def execute(cmd):
             print(f"\nExecuting: {cmd}")
-            response = execute_single_command(cmd)
-            
-            # If command not recognized, use Gemini
-            if response is None:
-                response = ai_services.query_gemini(cmd)
-            
-            responses.append(response)
-            time.sleep(0.5)  # Small delay between commands
+            return execute_single_command(cmd, unrouted=None)
+        
+        # Commands not recognized are questions for Gemini, answered together
+        responses = run_commands(split_commands(query), execute, ai_services.answer_questions, pause=0.5)
         
         # Return combined responses
         return "\n".join(responses)
@@ -787,14 +686,20 @@ def handle_screenshot_command(system_obj):
     except Exception as e:
         return f"Screenshot error: {str(e)}"
 
+GREETING = "Hello Arsh, How is your day today?"
+
 def greet_user():
     """Greet the user when assistant starts"""
-    greeting = "Hello Arsh, How is your day today?"
-    print(f"\n {greeting}")
-    notifier.notify("AI Assistant", greeting)
-    speak(greeting)
+    print(f"\n {GREETING}")
+    notifier.notify("AI Assistant", GREETING)
+    speak(GREETING)
     time.sleep(1)
 
+def warm_up_speech():
+    """Pre-render fixed replies so they play from the TTS cache"""
+    from conversation_manager import template_phrases
+    tts_service.warm_up(["Stopped.", GREETING, CAPABILITIES] + template_phrases(), background=True)
+
 def setup_directories():
     """Ensure only required directories exist"""
     required_dirs = [
@@ -846,8 +751,10 @@ def cleanup_unused_files():
 
 def handle_stop_command():
     """Universal stop command to halt all activities"""
-    global is_processing
     try:
+        # Abandon in-flight Gemini requests; their callers return "Cancelled."
+        llm_client.cancel_all()
+        
         # Stop TTS
         if tts_service:
             tts_service.stop_speaking()
@@ -866,37 +773,44 @@ def handle_stop_command():
                 browser.stop_playback()
         except:
             pass
-            
-        # Reset processing flag
-        is_processing = False
         
         print("\n🛑 Stopping all activities...")
         
     except Exception as e:
         print(f"Error stopping activities: {str(e)}")
     finally:
-        # Always acknowledge stop command
-        speak("Stopped.")
-
-def process_command_queue():
-    """Process commands in queue"""
+        # Always acknowledge stop command, ahead of anything still queued
+        from tts_service import PRIORITY_URGENT
+        tts_service.speak("Stopped.", priority=PRIORITY_URGENT)
+
+def submit_command(text):
+    """Run a typed or scripted command as a voice turn, as if it had been spoken"""
+    if text and text.strip():
+        bus.publish(COMMAND, text.strip())
+
+def watch_wake_word(listening):
+    """Publish wake word events; blocks on microphone audio, not a timer
+
+    Runs while `listening` is set. It pauses itself after each detection so
+    the recognizer has the microphone; the main loop resumes it. Errors
+    (e.g. no microphone) back off from 1 s up to 30 s instead of retrying
+    in a tight loop.
+    """
+    failures = 0
     while True:
+        listening.wait()
         try:
-            if is_processing:
-                time.sleep(0.1)
-                continue
-            
-            try:
-                command = command_queue.get_nowait()
-                process_voice_input(command)
-            except Empty:
-                time.sleep(0.1)
-            except Exception as e:
-                print(f"Error processing command: {e}")
-                time.sleep(0.1)
+            result = wake_word.listen_for_wake_word()
         except Exception as e:
-            print(f"Queue processing error: {e}")
-            break
+            failures += 1
+            delay = min(30, 2 ** (failures - 1))
+            print(f"Wake word error: {e} (retrying in {delay}s)")
+            time.sleep(delay)
+            continue
+        failures = 0
+        if result:
+            listening.clear()
+            bus.publish(WAKE_WORD, result)
 
 def cleanup_memory():
     """Periodic memory cleanup"""
@@ -904,17 +818,19 @@ def cleanup_memory():
         import gc
         gc.collect()
         
-        # Clear conversation history if too long
-        if hasattr(conversation, 'chat') and len(conversation.chat.history) > 50:
-            conversation.reset_chat()
+        # Look at created services only; cleanup must not construct anything
+        # (chat history needs no reset: ChatContext keeps it within its token budget)
+        ai = services.peek("ai_services")
+        tts = services.peek("tts")
             
-        # Clear caches periodically
-        if hasattr(ai_services, 'prompt_cache'):
-            ai_services.prompt_cache.clear()
+        # Drop expired responses and keep the cache within its byte bound
+        if hasattr(ai, 'prompt_cache'):
+            ai.prompt_cache.trim()
+            ai.semantic_cache.trim()
             
-        # Clear audio cache
-        if hasattr(tts_service, 'audio_cache'):
-            tts_service.audio_cache.clear()
+        # Keep the audio cache within its size bound and persist use times
+        if hasattr(tts, 'audio_cache'):
+            tts.audio_cache.trim()
             
     except Exception as e:
         print(f"Memory cleanup error: {str(e)}")
@@ -962,7 +878,8 @@ def handle_query_command(command):
         # Use shorter context window
         response = ai_services.query_gemini(
             command,
-            generation_config={"max_output_tokens": 50}
+            generation_config={"max_output_tokens": 50},
+            cache_policy="query"
         )
         return response
     except Exception as e:
@@ -982,52 +899,114 @@ def handle_action_command(command):
         return f"Action error: {e}"
 
 def main():
+    # Only the microphone and wake-word path is built before the loop starts;
+    # everything else is created on first use or warmed in the background.
+    services.warm_up(CRITICAL_SERVICES)
+    services.warm_up(
+        [name for name in services.names() if name not in CRITICAL_SERVICES],
+        background=True
+    )
+    
+    warm_up_speech()
+    
     print("\nAI Assistant Ready!")
     print("Waiting for wake word...")
     
     greet_user()
     
+    # The main loop sleeps until something happens: the wake word, a
+    # submitted command or 'q'
+    events = bus.subscribe(WAKE_WORD, COMMAND, QUIT)
+    listening = threading.Event()
+    
+    def on_respond(path):
+        # A slow Gemini reply keeps the wake word listening so it can be
+        # interrupted (offline spotter only; online recognition needs the microphone)
+        if path == "llm" and getattr(wake_word, "spotter", None):
+            listening.set()
+    
+    global voice_pipeline
+    voice_pipeline = build_voice_pipeline(on_respond=on_respond)
+    bus.on(WAKE_WORD, lambda event: voice_pipeline.interrupt())
+    
+    try:
+        keyboard.add_hotkey('q', lambda: bus.publish(QUIT))
+    except Exception as e:
+        print(f"Quit hotkey unavailable ({e}); use Ctrl+C to exit")
+    
+    listening.set()
+    threading.Thread(target=watch_wake_word, args=(listening,), name="wake-word", daemon=True).start()
+    
     try:
         while True:
+            # The timeout only lets Ctrl+C through; a blocked wait would swallow it on Windows
+            event = events.get(timeout=1.0)
+            if event is None:
+                continue
+            if event.topic == QUIT:
+                print("\nShutting down...")
+                break
+            
             try:
-                # Check for wake word
-                result = wake_word.listen_for_wake_word()
-                
-                if result:
+                if event.topic == WAKE_WORD:
                     print("\n Wake word detected!")
                     
                     # Stop any ongoing speech
                     if tts_service and tts_service.is_speaking:
                         print("Stopping current speech...")
                     tts_service.stop_speaking()
-                    time.sleep(0.1)
                     
-                    if isinstance(result, str):  # Got immediate command
-                        print(f"Got command with wake word: '{result}'")
-                        response = conversation.process_user_input(result)
-                        if response:
-                            print(f" Response: {response}")
-                            speak(str(response))
+                    if isinstance(event.payload, str):  # Got immediate command
+                        print(f"Got command with wake word: '{event.payload}'")
+                        response = voice_pipeline.run_turn(event.payload)
                     else:  # Just wake word detected
-                        process_voice_input()
-                
-                # Brief pause to prevent CPU overuse
-                time.sleep(0.05)
+                        response = voice_pipeline.run_turn()
+                else:
+                    response = voice_pipeline.run_turn(event.payload)
+                if response and response is not True:
+                    print(f" Response: {response}")
+                # An interrupted reply leaves its wake word event queued: the next turn starts at once
+                voice_pipeline.consume_interrupt()
                 
             except Exception as e:
                 print(f"\n⚠️ Error in main loop: {str(e)}")
-                time.sleep(0.1)
-                
-            # Check for quit
-            if keyboard.is_pressed('q'):
-                print("\nShutting down...")
-                break
+            finally:
+                listening.set()
             
     except KeyboardInterrupt:
         print("\nReceived interrupt signal...")
     finally:
         cleanup_resources()
 
+def profile_startup():
+    """Construct every service under the profiler, write reports and enforce the budget"""
+    from startup_profiler import budget_from_argv
+    
+    print("\n⏱️ Profiling startup...")
+    services.tracer = startup_profiler.trace_service
+    try:
+        with startup_profiler.span("services.critical"):
+            services.warm_up(CRITICAL_SERVICES)
+        with startup_profiler.span("services.deferred"):
+            services.warm_up([name for name in services.names() if name not in CRITICAL_SERVICES])
+    finally:
+        services.tracer = None
+        startup_profiler.remove_import_hook()
+    
+    output_dir = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "logs")
+    report_path, trace_path = startup_profiler.write(output_dir)
+    print(startup_profiler.report(limit=25))
+    print(f"\nReport: {report_path}\nChrome trace: {trace_path}")
+    
+    total_budget, item_budget = budget_from_argv(sys.argv)
+    violations = startup_profiler.check_budget(total_budget, item_budget)
+    for violation in violations:
+        print(f"❌ Startup budget exceeded: {violation}")
+    return 1 if violations else 0
+
+if __name__ == "__main__" and startup_profiler:
+    sys.exit(profile_startup())
+
 if __name__ == "__main__":
     try:
         # Clean up unnecessary files first
@@ -1049,7 +1028,6 @@ if __name__ == "__main__":
         signal.signal(signal.SIGINT, signal_handler)
         
         # Start the main program
-        threading.Thread(target=speak_worker, daemon=True).start()
         main()
         
     except KeyboardInterrupt:
@@ -0,0 +1,148 @@
+import threading
+import time
+from collections import OrderedDict, defaultdict, deque
+
+from llm_cache import resolve_policy
+from text_normalize import normalize_tokens
+
+# Words that frame a question without changing its subject. Negations,
+# pronouns and who/when/where/why/how are left out: they change the answer.
+STOPWORDS = {
+    "a", "an", "the", "is", "are", "was", "were", "be", "of", "to", "in", "on", "at", "for", "with", "about",
+    "what", "which", "me", "tell", "can", "could", "would", "will", "you", "do", "does", "it", "that", "this",
+    "there", "some", "any", "give", "know", "let", "us", "show", "i", "want", "like", "and", "or",
+}
+
+
+def shingles(tokens):
+    """Word unigrams and bigrams; bigrams keep word order significant"""
+    grams = set(tokens)
+    grams.update(f"{a} {b}" for a, b in zip(tokens, tokens[1:]))
+    return grams
+
+
+def jaccard(a, b):
+    return len(a & b) / len(a | b) if a or b else 1.0
+
+
+def content_tokens(tokens):
+    """Tokens that carry the subject; all of them for prompts made only of stopwords"""
+    return [token for token in tokens if token not in STOPWORDS] or tokens
+
+
+class SemanticCache:
+    """Near-duplicate response cache for short spoken prompts
+
+    Prompts are normalized (contractions, fillers, number words) and reduced
+    to their content words (STOPWORDS dropped). A hit needs exactly the same
+    content words, so prompts may differ only in framing ("can you tell me
+    ..."), never in subject ("raw chicken" must not answer "raw salmon");
+    entries are indexed by that word set. The Jaccard similarity of the
+    content shingles must also reach `threshold` (bigrams keep word order),
+    and the generation settings and numbers must match. Long prompts are
+    skipped because templated prompts overlap heavily whatever the topic.
+    """
+
+    def __init__(self, threshold=0.7, max_entries=500, max_words=25):
+        self.threshold = threshold
+        self.max_entries = max_entries
+        self.max_words = max_words
+        self.entries = OrderedDict()  # id -> entry dict
+        self.by_content = defaultdict(set)  # content word set -> ids
+        self.next_id = 0
+        self.lock = threading.Lock()
+        self.counters = {"lookups": 0, "hits": 0, "misses": 0, "skipped": 0}
+        self.similarities = deque(maxlen=200)  # of recent hits, for stats()
+
+    @staticmethod
+    def _config_key(config, model):
+        return repr((model, sorted((config or {}).items())))
+
+    def _prepare(self, prompt):
+        tokens = normalize_tokens(prompt)
+        if not tokens or len(tokens) > self.max_words:
+            return None
+        content = content_tokens(tokens)
+        return frozenset(content), shingles(content), frozenset(t for t in tokens if t.isdigit())
+
+    def get(self, prompt, policy="default", config=None, model=""):
+        """Response cached for a near-duplicate prompt, or None"""
+        prepared = self._prepare(prompt)
+        if prepared is None or not resolve_policy(prompt, policy).cacheable:
+            with self.lock:
+                self.counters["skipped"] += 1
+            return None
+        content, grams, numbers = prepared
+        config_key = self._config_key(config, model)
+        now = time.time()
+
+        with self.lock:
+            self.counters["lookups"] += 1
+            best, best_score = None, 0.0
+            for entry_id in self.by_content.get(content, ()):
+                entry = self.entries[entry_id]
+                if entry["expires_at"] <= now or entry["config"] != config_key or entry["numbers"] != numbers:
+                    continue
+                score = jaccard(grams, entry["grams"])
+                if score > best_score:
+                    best, best_score = entry_id, score
+
+            if best is None or best_score < self.threshold:
+                self.counters["misses"] += 1
+                return None
+            self.entries.move_to_end(best)
+            self.counters["hits"] += 1
+            self.similarities.append(best_score)
+            return self.entries[best]["value"]
+
+    def put(self, prompt, value, policy="default", config=None, model=""):
+        policy = resolve_policy(prompt, policy)
+        prepared = self._prepare(prompt)
+        if prepared is None or not policy.cacheable or not value:
+            return
+        content, grams, numbers = prepared
+        with self.lock:
+            entry_id = self.next_id
+            self.next_id += 1
+            self.entries[entry_id] = {
+                "value": value,
+                "grams": grams,
+                "content": content,
+                "numbers": numbers,
+                "config": self._config_key(config, model),
+                "expires_at": time.time() + policy.ttl,
+            }
+            self.by_content[content].add(entry_id)
+            while len(self.entries) > self.max_entries:
+                self._remove(next(iter(self.entries)))
+
+    def _remove(self, entry_id):
+        content = self.entries.pop(entry_id)["content"]
+        ids = self.by_content[content]
+        ids.discard(entry_id)
+        if not ids:
+            del self.by_content[content]
+
+    def trim(self):
+        """Drop expired entries"""
+        now = time.time()
+        with self.lock:
+            for entry_id in [i for i, e in self.entries.items() if e["expires_at"] <= now]:
+                self._remove(entry_id)
+
+    def clear(self):
+        with self.lock:
+            self.entries.clear()
+            self.by_content.clear()
+
+    def stats(self):
+        """Hit rate of this tier alone (lookups that already missed the exact cache)"""
+        with self.lock:
+            lookups = self.counters["lookups"]
+            return dict(
+                self.counters,
+                entries=len(self.entries),
+                hit_rate=round(self.counters["hits"] / lookups, 3) if lookups else 0.0,
+                avg_similarity=round(sum(self.similarities) / len(self.similarities), 3) if self.similarities else 0.0,
+                round_trips_saved=self.counters["hits"]
+            )
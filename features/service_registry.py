@@ -0,0 +1,214 @@
+import importlib
+import threading
+import time
+from contextlib import nullcontext
+
+
+class ServiceRegistry:
+    """Creates assistant services on first use and shares one instance per process"""
+
+    def __init__(self):
+        self._factories = {}
+        self._instances = {}
+        self._timings = {}
+        self._lock = threading.Lock()
+        self._service_locks = {}
+        self._local = threading.local()
+        self.listeners = []  # Called as listener(name, seconds) after each construction
+        self.tracer = None  # Optional tracer(name) -> context manager wrapped around constructors
+
+    def register(self, name, factory):
+        """Register a factory; it is called with the registry the first time `name` is requested"""
+        with self._lock:
+            self._factories[name] = factory
+            self._service_locks.setdefault(name, threading.RLock())
+
+    def register_class(self, name, module_name, class_name, **kwargs):
+        """Register a service by module/class name so the module is only imported on first use"""
+        def factory(registry):
+            module = importlib.import_module(module_name)
+            return getattr(module, class_name)(**kwargs)
+        self.register(name, factory)
+
+    def get(self, name):
+        """Return the shared instance of a service, creating it if needed"""
+        instance = self._instances.get(name)
+        if instance is not None:
+            return instance
+
+        with self._lock:
+            if name not in self._factories:
+                raise KeyError(f"Unknown service: {name}")
+            service_lock = self._service_locks[name]
+
+        creating = getattr(self._local, "creating", None)
+        if creating is None:
+            creating = self._local.creating = []
+        if name in creating:
+            raise RuntimeError(f"Circular dependency while creating service: {' -> '.join(creating + [name])}")
+
+        # Only callers of this particular service wait; other services stay available
+        with service_lock:
+            if name in self._instances:
+                return self._instances[name]
+
+            creating.append(name)
+            start = time.perf_counter()
+            try:
+                with self.tracer(name) if self.tracer else nullcontext():
+                    instance = self._factories[name](self)
+            finally:
+                creating.pop()
+            elapsed = time.perf_counter() - start
+
+            with self._lock:
+                self._instances[name] = instance
+                self._timings[name] = elapsed
+
+        for listener in list(self.listeners):
+            try:
+                listener(name, elapsed)
+            except Exception as e:
+                print(f"Service listener error: {e}")
+        return instance
+
+    def peek(self, name):
+        """Return the instance if it was already created, without creating it"""
+        return self._instances.get(name)
+
+    def is_created(self, name):
+        return name in self._instances
+
+    def names(self):
+        return list(self._factories)
+
+    def created(self):
+        """Return (name, instance) pairs for every service created so far"""
+        with self._lock:
+            return list(self._instances.items())
+
+    def discard(self, name):
+        """Forget a created instance so the next get() builds a fresh one"""
+        with self._lock:
+            self._timings.pop(name, None)
+            return self._instances.pop(name, None)
+
+    def lazy(self, name):
+        """Return a proxy that resolves the service on first attribute access"""
+        return LazyService(self, name)
+
+    def warm_up(self, names=None, background=False):
+        """Create services ahead of time, optionally in a daemon thread"""
+        names = list(names) if names is not None else self.names()
+
+        def run():
+            for name in names:
+                try:
+                    self.get(name)
+                except Exception as e:
+                    print(f"Error warming up {name}: {e}")
+
+        if background:
+            thread = threading.Thread(target=run, name="service-warmup", daemon=True)
+            thread.start()
+            return thread
+        run()
+        return None
+
+    def startup_cost(self):
+        """Return {service name: construction seconds}, slowest first"""
+        with self._lock:
+            return dict(sorted(self._timings.items(), key=lambda item: item[1], reverse=True))
+
+    def startup_report(self):
+        """Human-readable summary of service construction costs"""
+        costs = self.startup_cost()
+        if not costs:
+            return "No services created yet"
+        lines = [f"Service startup cost ({len(costs)} created, {sum(costs.values()):.2f}s total):"]
+        for name, seconds in costs.items():
+            lines.append(f"  {name:<22} {seconds * 1000:8.1f} ms")
+        pending = [name for name in self._factories if name not in costs]
+        if pending:
+            lines.append(f"  not created: {', '.join(pending)}")
+        return "\n".join(lines)
+
+
+class LazyService:
+    """Stand-in for a registry service that is created on first attribute access"""
+
+    def __init__(self, registry, name):
+        object.__setattr__(self, "_registry", registry)
+        object.__setattr__(self, "_name", name)
+
+    def __getattr__(self, attr):
+        return getattr(self._registry.get(self._name), attr)
+
+    def __setattr__(self, attr, value):
+        setattr(self._registry.get(self._name), attr, value)
+
+    def __bool__(self):
+        # Truthiness checks must not force construction
+        return self._registry.is_created(self._name)
+
+    def __repr__(self):
+        state = "created" if self._registry.is_created(self._name) else "pending"
+        return f"<LazyService {self._name} ({state})>"
+
+
+def deferred(service, attr):
+    """Callable for service.attr that looks the attribute up on each call
+
+    Passing `lazy_service.method` along reads the attribute and so creates the
+    service on the spot; this keeps creation until the first call.
+    """
+    return lambda *args, **kwargs: getattr(service, attr)(*args, **kwargs)
+
+
+def _register_defaults(registry):
+    """Default assistant services, keyed by the names used across the features package"""
+    registry.register_class("spotify", "spotify_control", "SpotifyControl")
+    registry.register_class("system", "system_control", "SystemControl")
+    registry.register_class("quick", "quick_actions", "QuickActions")
+    registry.register_class("browser", "browser_control", "BrowserControl")
+    registry.register_class("files", "file_search", "FileManager")
+    registry.register_class("tts", "tts_service", "TTSService")
+    registry.register_class("ai_services", "ai_services", "AIServices")
+    registry.register_class("camera", "camera_control", "CameraControl")
+    registry.register_class("search", "search_control", "SearchControl")
+    registry.register_class("notifier", "notification_service", "NotificationService")
+    registry.register_class("command_handler", "command_handler", "CommandHandler")
+
+    def microphone(r):
+        from streaming_asr import AudioCapture
+        return AudioCapture.open_default()
+
+    def voice(r):
+        from voice_recognition import VoiceRecognition
+        return VoiceRecognition(capture=r.get("microphone"))
+
+    def wake_word(r):
+        from wake_word_detection import WakeWordDetection
+        return WakeWordDetection(notifier=r.get("notifier"), tts_service=r.get("tts"),
+                                 capture=r.get("microphone"))
+
+    def conversation(r):
+        from conversation_handler import ConversationHandler
+        return ConversationHandler(r.get("ai_services"))
+
+    def conversation_manager(r):
+        from conversation_manager import ConversationManager
+        return ConversationManager(r.get("ai_services"))
+
+    registry.register("microphone", microphone)
+    registry.register("voice", voice)
+    registry.register("wake_word", wake_word)
+    registry.register("conversation", conversation)
+    registry.register("conversation_manager", conversation_manager)
+
+
+# Services needed before the assistant can react to the wake word
+CRITICAL_SERVICES = ["microphone", "tts", "notifier", "wake_word"]
+
+services = ServiceRegistry()
+_register_defaults(services)
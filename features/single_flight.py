@@ -0,0 +1,62 @@
+import concurrent.futures
+import hashlib
+import json
+import threading
+
+
+def fingerprint(*parts):
+    """Stable key for a request from its defining parts"""
+    raw = json.dumps(parts, sort_keys=True, default=str)
+    return hashlib.sha256(raw.encode("utf-8")).hexdigest()
+
+
+class SingleFlight:
+    """Coalesces identical concurrent calls
+
+    The first caller for a key runs the call; callers arriving while it is
+    in flight wait for the same result (or exception) instead of repeating
+    it. Nothing is kept once the call finishes: this is not a cache.
+    """
+
+    def __init__(self):
+        self.calls = {}  # key -> Future
+        self.lock = threading.Lock()
+        self.counters = {"calls": 0, "shared": 0}
+
+    def do(self, key, fn, *args, **kwargs):
+        with self.lock:
+            self.counters["calls"] += 1
+            future = self.calls.get(key)
+            leader = future is None
+            if leader:
+                future = self.calls[key] = concurrent.futures.Future()
+            else:
+                self.counters["shared"] += 1
+
+        if not leader:
+            return future.result()
+
+        try:
+            result = fn(*args, **kwargs)
+        except BaseException as e:
+            self._finish(key)
+            future.set_exception(e)
+            raise
+        self._finish(key)
+        future.set_result(result)
+        return result
+
+    def _finish(self, key):
+        with self.lock:
+            del self.calls[key]
+
+    def in_flight(self):
+        with self.lock:
+            return len(self.calls)
+
+    def stats(self):
+        return dict(self.counters, in_flight=self.in_flight())
+
+
+# Shared by every call site so duplicates are caught across handlers and threads
+single_flight = SingleFlight()
@@ -0,0 +1,142 @@
+import queue
+import re
+import threading
+import time
+
+from chat_context import estimate_tokens
+from text_normalize import normalize_text
+
+# Ways of saying "tell me more" that the same prefetched answer serves
+_MORE = {"tell me more", "more", "go on", "continue", "keep going", "tell me more about that",
+         "tell me more about it", "what else", "and"}
+# Capitalized phrases not at the start of a sentence, e.g. "the Andes" -> "Andes"
+_ENTITY = re.compile(r"(?<![.!?]\s)(?<!^)\b([A-Z][a-z]+(?:\s+[A-Z][a-z]+)*)")
+
+
+def predict_followups(reply, topic=None, limit=3):
+    """Most likely next prompts after reply, most likely first"""
+    predictions = ["tell me more"]
+    entities = [e for e in _ENTITY.findall(reply or "") if e.lower() not in ("i", "vani")]
+    if entities:
+        predictions.append(f"what about {entities[-1].lower()}")
+    if topic and topic not in ("general", "conversation"):
+        predictions.append(f"tell me more about {topic}")
+    predictions.append("give me an example")
+    return predictions[:limit]
+
+
+def _canonical(prompt):
+    text = " ".join(word for word in normalize_text(prompt).split() if word not in ("the", "a", "an"))
+    return "tell me more" if text in _MORE else text
+
+
+class SpeculativePrefetcher:
+    """Prefetches answers to likely follow-up prompts while a reply is spoken
+
+    fetch(prompt) produces the answer the real request would get. Jobs run
+    one at a time on a background thread, only while can_run() allows it (so
+    speculation never takes quota a real request needs). Each speculate()
+    round replaces the previous one; cancel() (the user started speaking)
+    drops jobs that have not started. A finished or running answer can still
+    be claimed by take() until the next round.
+    """
+
+    def __init__(self, fetch, max_predictions=3, ttl=120.0, can_run=None):
+        self.fetch = fetch
+        self.max_predictions = max_predictions
+        self.ttl = ttl
+        self.can_run = can_run or (lambda: True)
+        self.jobs = queue.Queue()
+        self.results = {}  # canonical prompt -> {"event", "text", "round", "at"}
+        self.round = 0
+        self.lock = threading.Lock()
+        self.counters = {"predicted": 0, "fetched": 0, "hits": 0, "misses": 0,
+                         "cancelled": 0, "skipped": 0, "wasted": 0, "wasted_tokens": 0}
+        threading.Thread(target=self._work, name="speculative-prefetch", daemon=True).start()
+
+    def speculate(self, reply, topic=None):
+        """Start a new round of prefetches for the follow-ups to reply"""
+        with self.lock:
+            self._retire()
+            self.round += 1
+            current = self.round
+        for prompt in predict_followups(reply, topic, self.max_predictions):
+            with self.lock:
+                self.counters["predicted"] += 1
+                self.results[_canonical(prompt)] = {"prompt": prompt, "event": threading.Event(), "text": None,
+                                                    "round": current, "at": time.time()}
+            self.jobs.put((current, prompt))
+
+    def cancel(self):
+        """Stop this round: prefetches that have not started are dropped"""
+        with self.lock:
+            self.round += 1
+            for key in [k for k, r in self.results.items() if "started" not in r]:
+                del self.results[key]
+                self.counters["cancelled"] += 1
+
+    def _waste(self, result):
+        self.counters["wasted"] += 1
+        self.counters["wasted_tokens"] += estimate_tokens(result["prompt"]) + estimate_tokens(result["text"])
+
+    def _retire(self):
+        """Account for the previous round's unused answers (caller holds the lock)"""
+        for result in self.results.values():
+            if result["text"]:
+                self._waste(result)
+            elif "started" not in result:
+                self.counters["cancelled"] += 1
+        self.results.clear()
+
+    def _work(self):
+        while True:
+            job_round, prompt = self.jobs.get()
+            key = _canonical(prompt)
+            with self.lock:
+                result = self.results.get(key)
+                if result is None or result["round"] != job_round:
+                    continue
+                if not self.can_run():
+                    self.counters["skipped"] += 1
+                    del self.results[key]
+                    continue
+                result["started"] = time.time()
+            try:
+                text = self.fetch(prompt)
+            except Exception as e:
+                print(f"Speculative prefetch error: {e}")
+                text = None
+            with self.lock:
+                self.counters["fetched"] += 1
+                result["text"] = text
+                result["at"] = time.time()
+                # Retired while running and never claimed: nobody will use it
+                if text and self.results.get(key) is not result and not result.get("taken"):
+                    self._waste(result)
+            result["event"].set()
+
+    def take(self, prompt, timeout=20.0):
+        """Prefetched answer for prompt, or None; waits for one still running"""
+        key = _canonical(prompt)
+        with self.lock:
+            result = self.results.pop(key, None)
+            if result is None or time.time() - result["at"] > self.ttl:
+                self.counters["misses"] += 1
+                return None
+            result["taken"] = True
+        result["event"].wait(timeout)
+        with self.lock:
+            if not result["text"]:
+                self.counters["misses"] += 1
+                return None
+            self.counters["hits"] += 1
+            return result["text"]
+
+    def stats(self):
+        with self.lock:
+            taken = self.counters["hits"] + self.counters["misses"]
+            return dict(
+                self.counters,
+                hit_rate=round(self.counters["hits"] / taken, 3) if taken else 0.0,
+                precision=round(self.counters["hits"] / self.counters["fetched"], 3) if self.counters["fetched"] else 0.0
+            )
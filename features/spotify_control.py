@@ -4,6 +4,7 @@ import time
 import os
 from dotenv import load_dotenv
 import platform
+from single_flight import single_flight, fingerprint
 
 class SpotifyControl:
     def __init__(self):
@@ -56,6 +57,21 @@ class SpotifyControl:
             print(f"Device check error: {e}")
             return False
             
+    def search_tracks(self, query: str) -> dict:
+        """Track search results, widening the query until something matches"""
+        # Try exact match first
+        results = self.sp.search(q=f'"{query}"', limit=5, type='track')
+        
+        # If no exact match, try with additional search terms
+        if not results['tracks']['items']:
+            # Try with song/track keyword
+            results = self.sp.search(q=f'track:"{query}"', limit=5, type='track')
+            
+        if not results['tracks']['items']:
+            # Try broader search
+            results = self.sp.search(q=query, limit=5, type='track')
+        return results
+            
     def play_music(self, query: str) -> str:
         """Search and play music on Spotify with improved accuracy"""
         try:
@@ -66,17 +82,8 @@ class SpotifyControl:
             if not self.ensure_active_device():
                 return "Please open Spotify and start playing music first"
             
-            # Try exact match first
-            results = self.sp.search(q=f'"{query}"', limit=5, type='track')
-            
-            # If no exact match, try with additional search terms
-            if not results['tracks']['items']:
-                # Try with song/track keyword
-                results = self.sp.search(q=f'track:"{query}"', limit=5, type='track')
-                
-            if not results['tracks']['items']:
-                # Try broader search
-                results = self.sp.search(q=query, limit=5, type='track')
+            # Concurrent requests for the same song share one search
+            results = single_flight.do(fingerprint("spotify.search", query.lower().strip()), self.search_tracks, query)
             
             if results['tracks']['items']:
                 # Find best matching track
@@ -0,0 +1,214 @@
+import builtins
+import importlib
+import json
+import os
+import sys
+import threading
+import time
+from contextlib import contextmanager
+
+try:
+    import psutil
+except ImportError:
+    psutil = None
+
+
+def _current_rss():
+    """Resident set size in bytes (0 without psutil: no portable fallback gives the current RSS)"""
+    if psutil is None:
+        return 0
+    try:
+        return psutil.Process().memory_info().rss
+    except Exception:
+        return 0
+
+
+class StartupProfiler:
+    """Records wall time and RSS delta for module imports and service construction"""
+
+    def __init__(self):
+        self.records = []
+        self.origin = time.perf_counter()
+        self._local = threading.local()
+        self._lock = threading.Lock()
+        self._original_import = None
+        self._original_import_module = None
+
+    # ------------------------------------------------------------------ spans
+    @contextmanager
+    def span(self, name, kind="span"):
+        """Time a block; nested spans are subtracted from the parent's self time"""
+        stack = getattr(self._local, "stack", None)
+        if stack is None:
+            stack = self._local.stack = []
+
+        frame = {"children": 0.0}
+        stack.append(frame)
+        rss_before = _current_rss()
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            duration = time.perf_counter() - start
+            rss_delta = _current_rss() - rss_before
+            stack.pop()
+            if stack:
+                stack[-1]["children"] += duration
+
+            with self._lock:
+                self.records.append({
+                    "name": name,
+                    "kind": kind,
+                    "start": start - self.origin,
+                    "duration": duration,
+                    "self": max(duration - frame["children"], 0.0),
+                    "rss_delta": rss_delta,
+                    "depth": len(stack),
+                    "tid": threading.get_ident()
+                })
+
+    def trace_service(self, name):
+        """Tracer hook for ServiceRegistry: wraps each service constructor"""
+        return self.span(name, kind="service")
+
+    # ---------------------------------------------------------------- imports
+    def install_import_hook(self):
+        """Start timing every module imported for the first time"""
+        if self._original_import:
+            return
+        self._original_import = builtins.__import__
+        self._original_import_module = importlib.import_module
+        original_import = self._original_import
+        original_import_module = self._original_import_module
+        profiler = self
+
+        def profiled_import(name, globals=None, locals=None, fromlist=(), level=0):
+            if level or name in sys.modules:
+                return original_import(name, globals, locals, fromlist, level)
+            with profiler.span(name, kind="import"):
+                return original_import(name, globals, locals, fromlist, level)
+
+        def profiled_import_module(name, package=None):
+            if name.startswith(".") or name in sys.modules:
+                return original_import_module(name, package)
+            with profiler.span(name, kind="import"):
+                return original_import_module(name, package)
+
+        builtins.__import__ = profiled_import
+        importlib.import_module = profiled_import_module
+
+    def remove_import_hook(self):
+        if self._original_import:
+            builtins.__import__ = self._original_import
+            importlib.import_module = self._original_import_module
+            self._original_import = None
+            self._original_import_module = None
+
+    # ---------------------------------------------------------------- reports
+    def total_time(self):
+        """Wall time covered by top-level records"""
+        return sum(r["duration"] for r in self.records if r["depth"] == 0)
+
+    def sorted_records(self):
+        return sorted(self.records, key=lambda r: r["self"], reverse=True)
+
+    def report(self, limit=40):
+        """Text report, most expensive (self time) first"""
+        lines = [
+            f"Startup profile: {self.total_time():.2f}s across {len(self.records)} imports/services",
+            f"{'kind':<8} {'name':<40} {'total ms':>10} {'self ms':>10} {'rss MB':>8}",
+        ]
+        for record in self.sorted_records()[:limit]:
+            rss = f"{record['rss_delta'] / (1024 * 1024):8.1f}" if psutil else f"{'-':>8}"
+            lines.append(
+                f"{record['kind']:<8} {record['name'][:40]:<40} "
+                f"{record['duration'] * 1000:10.1f} {record['self'] * 1000:10.1f} {rss}"
+            )
+        if psutil is None:
+            lines.append("(install psutil to measure RSS)")
+        return "\n".join(lines)
+
+    def chrome_trace(self):
+        """Events in Chrome trace format (load in chrome://tracing or Perfetto)"""
+        pid = os.getpid()
+        events = []
+        for record in self.records:
+            events.append({
+                "name": record["name"],
+                "cat": record["kind"],
+                "ph": "X",
+                "ts": round(record["start"] * 1e6),
+                "dur": round(record["duration"] * 1e6),
+                "pid": pid,
+                "tid": record["tid"],
+                "args": {
+                    "self_ms": round(record["self"] * 1000, 3),
+                    "rss_delta_kb": record["rss_delta"] // 1024
+                }
+            })
+        return {"traceEvents": events, "displayTimeUnit": "ms"}
+
+    def write(self, output_dir):
+        """Write the text report and Chrome trace; returns both paths"""
+        os.makedirs(output_dir, exist_ok=True)
+        report_path = os.path.join(output_dir, "startup_profile.txt")
+        trace_path = os.path.join(output_dir, "startup_trace.json")
+        with open(report_path, "w", encoding="utf-8") as f:
+            f.write(self.report(limit=len(self.records)) + "\n")
+        with open(trace_path, "w") as f:
+            json.dump(self.chrome_trace(), f)
+        return report_path, trace_path
+
+    def check_budget(self, total_budget=None, item_budget=None):
+        """Return a list of budget violations (empty when within budget)"""
+        violations = []
+        total = self.total_time()
+        if total_budget is not None and total > total_budget:
+            violations.append(f"total startup {total:.2f}s exceeds budget {total_budget:.2f}s")
+        if item_budget is not None:
+            for record in self.sorted_records():
+                if record["self"] > item_budget:
+                    violations.append(
+                        f"{record['kind']} {record['name']} took {record['self']:.2f}s "
+                        f"(budget {item_budget:.2f}s)"
+                    )
+        return violations
+
+
+# Active profiler, set when the assistant is started with --profile-startup
+active_profiler = None
+
+
+@contextmanager
+def profile_span(name):
+    """Time a block when startup profiling is active; no-op otherwise"""
+    if active_profiler is None:
+        yield
+    else:
+        with active_profiler.span(name):
+            yield
+
+
+def profiler_from_argv(argv):
+    """Start profiling imports right away if --profile-startup was passed"""
+    global active_profiler
+    if "--profile-startup" not in argv:
+        return None
+    active_profiler = StartupProfiler()
+    active_profiler.install_import_hook()
+    return active_profiler
+
+
+def _arg_value(argv, flag, default=None):
+    if flag in argv:
+        index = argv.index(flag)
+        if index + 1 < len(argv):
+            return argv[index + 1]
+    return default
+
+
+def budget_from_argv(argv):
+    """(total, per-item) budgets in seconds from argv or VANI_STARTUP_BUDGET(_ITEM)"""
+    total = _arg_value(argv, "--startup-budget", os.getenv("VANI_STARTUP_BUDGET"))
+    item = _arg_value(argv, "--startup-item-budget", os.getenv("VANI_STARTUP_ITEM_BUDGET"))
+    return (float(total) if total else None, float(item) if item else None)
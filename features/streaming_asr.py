@@ -0,0 +1,277 @@
+import json
+import math
+import threading
+import time
+import warnings
+from array import array
+from collections import deque
+
+try:
+    with warnings.catch_warnings():
+        warnings.simplefilter("ignore", DeprecationWarning)
+        import audioop  # Fast C RMS; removed in Python 3.13
+except ImportError:
+    audioop = None
+
+import keyword_spotter
+
+
+def chunk_rms(chunk):
+    """RMS energy of a 16-bit mono PCM chunk"""
+    if not chunk:
+        return 0.0
+    if audioop:
+        return float(audioop.rms(chunk, 2))
+    samples = array("h", chunk[:len(chunk) - len(chunk) % 2])
+    return math.sqrt(sum(s * s for s in samples) / max(len(samples), 1))
+
+
+class EnergyVAD:
+    """Energy-based voice activity detector with a continuously learned noise floor
+
+    The floor is an exponential average of non-speech frames, so it is learned
+    once at startup and then tracks the room instead of being re-measured
+    before every utterance.
+    """
+
+    def __init__(self, speech_ratio=2.5, min_energy=120.0, adapt_rate=0.05, warmup_frames=8):
+        self.speech_ratio = speech_ratio
+        self.min_energy = min_energy
+        self.adapt_rate = adapt_rate
+        self.warmup_frames = warmup_frames
+        self.noise_floor = None
+        self.frames = 0
+
+    @property
+    def threshold(self):
+        if self.noise_floor is None:
+            return float("inf")
+        return max(self.noise_floor * self.speech_ratio, self.min_energy)
+
+    def observe(self, energy):
+        """Classify one frame and update the noise floor; returns True for speech"""
+        self.frames += 1
+        if self.noise_floor is None:
+            self.noise_floor = energy
+            return False
+        if self.frames <= self.warmup_frames:
+            # Learn the room quickly during warm-up
+            self.noise_floor = (self.noise_floor * (self.frames - 1) + energy) / self.frames
+            return False
+
+        is_speech = energy > self.threshold
+        if not is_speech:
+            self.noise_floor += self.adapt_rate * (energy - self.noise_floor)
+        return is_speech
+
+
+class AudioRingBuffer:
+    """Fixed-size ring of recent audio frames that several readers can follow
+
+    Every frame gets a sequence number; readers keep their own cursor and block
+    on a condition variable until newer frames arrive.
+    """
+
+    def __init__(self, capacity):
+        self.frames = deque(maxlen=capacity)
+        self.next_seq = 0
+        self.condition = threading.Condition()
+        self.closed = False
+
+    def append(self, chunk, energy, is_speech):
+        with self.condition:
+            self.frames.append((self.next_seq, chunk, energy, is_speech))
+            self.next_seq += 1
+            self.condition.notify_all()
+
+    def cursor(self, back=0):
+        """Sequence number `back` frames before the newest one"""
+        with self.condition:
+            return max(self.next_seq - back, self.next_seq - len(self.frames))
+
+    def read(self, cursor, timeout=None):
+        """Return (frames newer than cursor, new cursor); waits up to timeout for data"""
+        with self.condition:
+            if cursor >= self.next_seq and not self.closed:
+                self.condition.wait(timeout)
+            oldest = self.next_seq - len(self.frames)
+            start = max(cursor, oldest)
+            frames = [frame for frame in self.frames if frame[0] >= start]
+            return frames, self.next_seq
+
+    def close(self):
+        with self.condition:
+            self.closed = True
+            self.condition.notify_all()
+
+
+class AudioCapture:
+    """Continuously reads the microphone into a ring buffer on a daemon thread"""
+
+    def __init__(self, stream=None, sample_rate=16000, chunk_size=1024, ring_seconds=10.0, vad=None):
+        self.sample_rate = sample_rate
+        self.chunk_size = chunk_size
+        self.audio = None
+        self.stream = stream
+        self.vad = vad or EnergyVAD()
+        capacity = int(ring_seconds * sample_rate / chunk_size)
+        self.ring = AudioRingBuffer(capacity)
+        self._running = False
+        self._thread = None
+
+    @property
+    def chunk_seconds(self):
+        return self.chunk_size / self.sample_rate
+
+    @classmethod
+    def open_default(cls, sample_rate=16000, chunk_size=1024):
+        """Open the first input device with PyAudio and start capturing"""
+        import pyaudio
+        audio = pyaudio.PyAudio()
+        device_index = None
+        for i in range(audio.get_device_count()):
+            if audio.get_device_info_by_index(i)['maxInputChannels'] > 0:
+                device_index = i
+                break
+        stream = audio.open(
+            format=pyaudio.paInt16,
+            channels=1,
+            rate=sample_rate,
+            input=True,
+            frames_per_buffer=chunk_size,
+            input_device_index=device_index
+        )
+        capture = cls(stream, sample_rate=sample_rate, chunk_size=chunk_size)
+        capture.audio = audio
+        capture.start()
+        return capture
+
+    def start(self):
+        if self._running:
+            return
+        self._running = True
+        self._thread = threading.Thread(target=self._run, name="audio-capture", daemon=True)
+        self._thread.start()
+
+    def _run(self):
+        while self._running:
+            try:
+                chunk = self.stream.read(self.chunk_size, exception_on_overflow=False)
+            except Exception as e:
+                print(f"Audio capture error: {e}")
+                time.sleep(0.1)
+                continue
+            energy = chunk_rms(chunk)
+            self.ring.append(chunk, energy, self.vad.observe(energy))
+
+    def feed(self, chunk):
+        """Push a chunk without a live stream (used by tests and file playback)"""
+        energy = chunk_rms(chunk)
+        self.ring.append(chunk, energy, self.vad.observe(energy))
+
+    def stop(self):
+        self._running = False
+        self.ring.close()
+        if self._thread:
+            self._thread.join(timeout=1)
+        try:
+            if self.stream:
+                self.stream.stop_stream()
+                self.stream.close()
+            if self.audio:
+                self.audio.terminate()
+        except Exception as e:
+            print(f"Audio capture cleanup error: {e}")
+
+
+class StreamingListener:
+    """Endpointed, incremental recognition of one utterance from an AudioCapture
+
+    Speech start/end come from the capture's VAD flags; audio is decoded by a
+    full-vocabulary Vosk recognizer while the user is still talking, and every
+    new partial is offered to `on_partial`. If that callback accepts a partial
+    (it has been stable for `stable_updates` chunks), listening stops early.
+    """
+
+    def __init__(self, capture, model_path=keyword_spotter.DEFAULT_MODEL_PATH,
+                 preroll_seconds=0.3, hangover_seconds=0.6, start_frames=2, stable_updates=3):
+        self.capture = capture
+        self.model = keyword_spotter.load_model(model_path)
+        self.preroll_frames = max(1, int(preroll_seconds / capture.chunk_seconds))
+        self.hangover_frames = max(1, int(hangover_seconds / capture.chunk_seconds))
+        self.start_frames = start_frames
+        self.stable_updates = stable_updates
+        self.speech_ended_at = None  # time.monotonic() at the end of the last utterance
+
+    def _recognizer(self):
+        return keyword_spotter.KaldiRecognizer(self.model, self.capture.sample_rate)
+
+    def listen(self, timeout=5.0, phrase_time_limit=10.0, on_partial=None):
+        """Return the recognized utterance, or None if nobody spoke before timeout"""
+        recognizer = self._recognizer()
+        cursor = self.capture.ring.cursor(back=self.preroll_frames)
+        started_at = time.monotonic()
+        speech_started = None
+        speech_run = 0
+        silence_run = 0
+        last_partial = ""
+        partial_repeats = 0
+        segments = []  # Text of segments Vosk already finalized inside the utterance
+        buffered = []  # Pre-roll frames kept until speech is confirmed
+        self.speech_ended_at = None
+
+        while True:
+            frames, cursor = self.capture.ring.read(cursor, timeout=0.2)
+            if not frames and self.capture.ring.closed:
+                return None
+
+            for _, chunk, _, is_speech in frames:
+                if speech_started is None:
+                    buffered.append(chunk)
+                    buffered = buffered[-(self.preroll_frames + self.start_frames):]
+                    speech_run = speech_run + 1 if is_speech else 0
+                    if speech_run >= self.start_frames:
+                        speech_started = time.monotonic()
+                        for pending in buffered:
+                            self._accept(recognizer, pending, segments)
+                        buffered = []
+                    continue
+
+                self._accept(recognizer, chunk, segments)
+                silence_run = 0 if is_speech else silence_run + 1
+
+                partial = " ".join(segments + [json.loads(recognizer.PartialResult()).get("partial", "")]).strip()
+                if partial and partial == last_partial:
+                    partial_repeats += 1
+                else:
+                    partial_repeats = 0
+                    last_partial = partial
+                if on_partial and partial and partial_repeats == self.stable_updates - 1:
+                    if on_partial(partial):
+                        self.speech_ended_at = time.monotonic()
+                        return partial
+
+                if silence_run >= self.hangover_frames:
+                    # Speech ended when this run of silent frames began
+                    self.speech_ended_at = time.monotonic() - silence_run * self.capture.chunk_seconds
+                    return self._final(recognizer, segments)
+
+            now = time.monotonic()
+            if speech_started is None and now - started_at > timeout:
+                return None
+            if speech_started is not None and now - speech_started > phrase_time_limit:
+                self.speech_ended_at = now
+                return self._final(recognizer, segments)
+
+    @staticmethod
+    def _accept(recognizer, chunk, segments):
+        if recognizer.AcceptWaveform(chunk):
+            # Vosk found an internal endpoint; keep its text and go on until the VAD agrees
+            segment = json.loads(recognizer.Result()).get("text", "")
+            if segment:
+                segments.append(segment)
+
+    @staticmethod
+    def _final(recognizer, segments=()):
+        text = " ".join(list(segments) + [json.loads(recognizer.FinalResult()).get("text", "")]).strip()
+        return text or None
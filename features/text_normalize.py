@@ -0,0 +1,105 @@
+import re
+
+CONTRACTIONS = {
+    "what's": "what is", "where's": "where is", "who's": "who is", "how's": "how is",
+    "when's": "when is", "why's": "why is", "that's": "that is", "there's": "there is",
+    "it's": "it is", "he's": "he is", "she's": "she is", "let's": "let us",
+    "i'm": "i am", "can't": "cannot", "won't": "will not", "shan't": "shall not",
+    "ain't": "is not", "y'all": "you all",
+    # Recognizers often drop the apostrophe
+    "whats": "what is", "wheres": "where is", "whos": "who is", "hows": "how is",
+    "thats": "that is", "theres": "there is", "im": "i am", "dont": "do not",
+    "doesnt": "does not", "didnt": "did not", "cant": "cannot", "wont": "will not",
+    "isnt": "is not", "arent": "are not",
+}
+_SUFFIXES = [("n't", " not"), ("'re", " are"), ("'ve", " have"), ("'ll", " will"), ("'d", " would")]
+
+FILLERS = {"um", "umm", "uh", "uhh", "er", "erm", "hmm", "ah", "please", "basically", "actually", "just"}
+_LEADING_FILLERS = {"so", "well", "okay", "ok", "hey", "vani", "alright"}
+
+_UNITS = {
+    "zero": 0, "one": 1, "two": 2, "three": 3, "four": 4, "five": 5, "six": 6, "seven": 7,
+    "eight": 8, "nine": 9, "ten": 10, "eleven": 11, "twelve": 12, "thirteen": 13,
+    "fourteen": 14, "fifteen": 15, "sixteen": 16, "seventeen": 17, "eighteen": 18, "nineteen": 19,
+}
+_TENS = {
+    "twenty": 20, "thirty": 30, "forty": 40, "fifty": 50,
+    "sixty": 60, "seventy": 70, "eighty": 80, "ninety": 90,
+}
+_SCALES = {"hundred": 100, "thousand": 1000, "million": 10 ** 6, "billion": 10 ** 9}
+
+
+def expand_contractions(text):
+    words = []
+    for word in text.split():
+        if word in CONTRACTIONS:
+            words.append(CONTRACTIONS[word])
+            continue
+        for suffix, replacement in _SUFFIXES:
+            if word.endswith(suffix) and len(word) > len(suffix):
+                word = word[:-len(suffix)] + replacement
+                break
+        else:
+            if word.endswith("'s"):
+                word = word[:-2]  # possessive: "france's" -> "france"
+        words.append(word)
+    return " ".join(words)
+
+
+def words_to_numbers(tokens):
+    """Replace runs of number words with digits: ["twenty", "one"] -> ["21"]"""
+    result = []
+    total = current = 0
+    last = None  # kind of the previous number word: "unit", "tens" or "scale"
+
+    def flush():
+        nonlocal total, current, last
+        if last:
+            result.append(str(total + current))
+        total = current = 0
+        last = None
+
+    for i, token in enumerate(tokens):
+        if token in _UNITS:
+            # A unit continues "twenty ..." (1-9 only) or "... hundred"/"... thousand"
+            if not (last == "scale" or (last == "tens" and _UNITS[token] < 10)):
+                flush()
+            current += _UNITS[token]
+            last = "unit"
+        elif token in _TENS:
+            if last != "scale":
+                flush()
+            current += _TENS[token]
+            last = "tens"
+        elif token in _SCALES and last:
+            scale = _SCALES[token]
+            if scale == 100:
+                current = max(current, 1) * 100
+            else:
+                total += max(current, 1) * scale
+                current = 0
+            last = "scale"
+        elif token == "and" and last == "scale" and i + 1 < len(tokens) and (
+                tokens[i + 1] in _UNITS or tokens[i + 1] in _TENS):
+            continue  # "one hundred and five"
+        else:
+            flush()
+            result.append(token)
+    flush()
+    return result
+
+
+def normalize_tokens(text):
+    """Canonical tokens for recognized speech: lowercase, no punctuation,
+    contractions expanded, filler words dropped, number words as digits"""
+    text = (text or "").lower().replace("’", "'")
+    text = re.sub(r"[^\w'\s]", " ", text)
+    tokens = expand_contractions(text).replace("'", "").split()
+    while tokens and tokens[0] in _LEADING_FILLERS:
+        tokens = tokens[1:]
+    tokens = [token for token in tokens if token not in FILLERS]
+    return words_to_numbers(tokens)
+
+
+def normalize_text(text):
+    return " ".join(normalize_tokens(text))
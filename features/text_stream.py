@@ -0,0 +1,156 @@
+import queue
+import re
+import threading
+
+# A sentence ends at . ! ? (optionally followed by quotes/brackets) before whitespace,
+# or at a line break. "3.5" and "e.g.x" don't split because no whitespace follows.
+_SENTENCE_END = re.compile(r'(?:(?<=[.!?])|(?<=[.!?]["\')\]]))\s+|\n+')
+_CLAUSE_END = re.compile(r'(?<=[,;:])\s+')
+_ABBREVIATIONS = {"mr.", "mrs.", "ms.", "dr.", "prof.", "sr.", "jr.", "st.", "vs.", "etc.", "e.g.", "i.e.", "no."}
+
+
+def _ends_with_abbreviation(text):
+    words = text.rsplit(None, 1)
+    return bool(words) and words[-1].lower() in _ABBREVIATIONS
+
+
+def split_sentences(text, max_chars=220):
+    """Split text into speakable sentences
+
+    Markdown bullets and line breaks count as boundaries, common abbreviations
+    don't, and sentences longer than max_chars are broken at clause punctuation
+    so no single piece takes long to synthesize.
+    """
+    if not text:
+        return []
+
+    sentences = []
+    pending = ""
+    for piece in _SENTENCE_END.split(text):
+        piece = piece.strip().lstrip("*-• ").strip()
+        if not piece:
+            continue
+        pending = f"{pending} {piece}" if pending else piece
+        if _ends_with_abbreviation(pending):
+            continue
+        sentences.extend(_split_long(pending, max_chars))
+        pending = ""
+    if pending:
+        sentences.extend(_split_long(pending, max_chars))
+    return sentences
+
+
+def _split_long(sentence, max_chars):
+    if len(sentence) <= max_chars:
+        return [sentence]
+    parts = []
+    current = ""
+    for clause in _CLAUSE_END.split(sentence):
+        if current and len(current) + len(clause) + 1 > max_chars:
+            parts.append(current)
+            current = clause
+        else:
+            current = f"{current} {clause}" if current else clause
+    if current:
+        parts.append(current)
+    return parts
+
+
+class SentenceChunker:
+    """Turns streamed text into complete sentences as soon as each one ends"""
+
+    def __init__(self, max_chars=220):
+        self.max_chars = max_chars
+        self.buffer = ""
+
+    def feed(self, text):
+        """Add streamed text; returns the sentences completed by it"""
+        self.buffer += text or ""
+        cut = 0
+        for boundary in _SENTENCE_END.finditer(self.buffer):
+            if not _ends_with_abbreviation(self.buffer[:boundary.start()]):
+                cut = boundary.end()
+        if not cut:
+            return []
+        complete, self.buffer = self.buffer[:cut], self.buffer[cut:]
+        return split_sentences(complete, self.max_chars)
+
+    def flush(self):
+        """Whatever is left once the stream ends"""
+        rest, self.buffer = self.buffer, ""
+        return split_sentences(rest, self.max_chars)
+
+
+class ParagraphChunker:
+    """Turns streamed text into paragraphs (blank-line separated)"""
+
+    _BREAK = re.compile(r'\n\s*\n')
+
+    def __init__(self):
+        self.buffer = ""
+
+    def feed(self, text):
+        self.buffer += text or ""
+        parts = self._BREAK.split(self.buffer)
+        self.buffer = parts.pop()
+        return [part.strip() for part in parts if part.strip()]
+
+    def flush(self):
+        rest, self.buffer = self.buffer.strip(), ""
+        return [rest] if rest else []
+
+
+def _chunked(chunks, chunker):
+    for chunk in chunks:
+        yield from chunker.feed(chunk)
+    yield from chunker.flush()
+
+
+def stream_sentences(chunks):
+    """Sentences from an iterable of text chunks, yielded as they complete"""
+    return _chunked(chunks, SentenceChunker())
+
+
+def stream_paragraphs(chunks):
+    """Paragraphs from an iterable of text chunks, yielded as they complete"""
+    return _chunked(chunks, ParagraphChunker())
+
+
+_DONE = object()
+
+
+def prefetch(iterable, maxsize=0):
+    """Consume an iterable on a background thread
+
+    Pull-based streams (such as a streamed Gemini response) stop reading while
+    the consumer is busy typing or speaking; prefetching keeps them flowing.
+    Errors from the producer are re-raised in the consumer.
+    """
+    items = queue.Queue(maxsize)
+
+    def produce():
+        try:
+            for item in iterable:
+                items.put(item)
+        except Exception as e:
+            items.put(_Failure(e))
+        finally:
+            items.put(_DONE)
+
+    def consume():
+        while True:
+            item = items.get()
+            if item is _DONE:
+                return
+            if isinstance(item, _Failure):
+                raise item.error
+            yield item
+
+    # Started here rather than on first next(), so work begins immediately
+    threading.Thread(target=produce, name="stream-prefetch", daemon=True).start()
+    return consume()
+
+
+class _Failure:
+    def __init__(self, error):
+        self.error = error
@@ -0,0 +1,169 @@
+import hashlib
+import json
+import os
+import tempfile
+import threading
+import time
+
+DEFAULT_CACHE_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "data", "tts_cache")
+DEFAULT_MAX_BYTES = 50 * 1024 * 1024
+
+
+def _atomic_write(path, data):
+    """Write to a temp file in the same directory, then rename over the target"""
+    directory = os.path.dirname(path)
+    fd, tmp_path = tempfile.mkstemp(dir=directory, prefix=".tmp-")
+    try:
+        with os.fdopen(fd, "wb") as f:
+            f.write(data)
+        os.replace(tmp_path, path)
+    except Exception:
+        try:
+            os.remove(tmp_path)
+        except OSError:
+            pass
+        raise
+
+
+class TTSCache:
+    """Content-addressed store of synthesized speech
+
+    Audio is keyed by sha256(text, voice, style) and stored as <key>.mp3 next to
+    an index.json holding size and last-use time per entry. The total size is
+    bounded; least recently used entries are evicted first. Audio and index are
+    written atomically so a crash never leaves a half-written file behind.
+    """
+
+    def __init__(self, cache_dir=DEFAULT_CACHE_DIR, max_bytes=DEFAULT_MAX_BYTES):
+        self.cache_dir = cache_dir
+        self.max_bytes = max_bytes
+        self.index_path = os.path.join(cache_dir, "index.json")
+        self.lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self._dirty = False
+        os.makedirs(cache_dir, exist_ok=True)
+        self.index = self._load_index()
+
+    @staticmethod
+    def key(text, voice, style=""):
+        return hashlib.sha256(f"{voice}\0{style}\0{text}".encode("utf-8")).hexdigest()
+
+    def _load_index(self):
+        try:
+            with open(self.index_path, "r", encoding="utf-8") as f:
+                index = json.load(f)
+        except (OSError, ValueError):
+            return {}
+        # Drop entries whose audio file went missing
+        return {
+            key: entry for key, entry in index.items()
+            if isinstance(entry, dict) and os.path.exists(os.path.join(self.cache_dir, entry.get("file", "")))
+        }
+
+    def _save_index(self):
+        _atomic_write(self.index_path, json.dumps(self.index).encode("utf-8"))
+        self._dirty = False
+
+    @property
+    def total_bytes(self):
+        return sum(entry["size"] for entry in self.index.values())
+
+    def get(self, text, voice, style=""):
+        """Path of the cached audio, or None on a miss"""
+        key = self.key(text, voice, style)
+        with self.lock:
+            entry = self.index.get(key)
+            path = os.path.join(self.cache_dir, entry["file"]) if entry else None
+            if not path or not os.path.exists(path):
+                if entry:
+                    del self.index[key]
+                    self._dirty = True
+                self.misses += 1
+                return None
+            entry["last_used"] = time.time()
+            self._dirty = True  # Use times are persisted on the next put/flush
+            self.hits += 1
+            return path
+
+    def read(self, text, voice, style=""):
+        """Cached audio bytes, or None on a miss"""
+        path = self.get(text, voice, style)
+        if not path:
+            return None
+        try:
+            with open(path, "rb") as f:
+                return f.read()
+        except OSError:
+            return None
+
+    def __contains__(self, item):
+        text, voice, style = item
+        with self.lock:
+            return self.key(text, voice, style) in self.index
+
+    def put(self, text, voice, style, audio):
+        """Store audio bytes and return their path"""
+        key = self.key(text, voice, style)
+        filename = f"{key}.mp3"
+        path = os.path.join(self.cache_dir, filename)
+        _atomic_write(path, audio)
+        with self.lock:
+            self.index[key] = {
+                "file": filename,
+                "size": len(audio),
+                "last_used": time.time(),
+                "text": text[:80]
+            }
+            self._evict(keep=key)
+            self._save_index()
+        return path
+
+    def _evict(self, keep=None):
+        """Remove least recently used entries until under max_bytes"""
+        total = self.total_bytes
+        for key, entry in sorted(self.index.items(), key=lambda item: item[1]["last_used"]):
+            if total <= self.max_bytes:
+                break
+            if key == keep:
+                continue
+            try:
+                os.remove(os.path.join(self.cache_dir, entry["file"]))
+            except OSError:
+                continue  # File in use (Windows locks it); retry next time
+            total -= entry["size"]
+            del self.index[key]
+            self._dirty = True
+
+    def trim(self, max_bytes=None):
+        """Enforce the size bound (optionally a tighter one) and persist the index"""
+        with self.lock:
+            if max_bytes is not None:
+                previous, self.max_bytes = self.max_bytes, max_bytes
+                self._evict()
+                self.max_bytes = previous
+            else:
+                self._evict()
+            if self._dirty:
+                self._save_index()
+
+    def flush(self):
+        """Persist pending last-use updates"""
+        with self.lock:
+            if self._dirty:
+                self._save_index()
+
+    def clear(self):
+        """Delete every cached file"""
+        self.trim(max_bytes=0)
+
+    def stats(self):
+        with self.lock:
+            lookups = self.hits + self.misses
+            return {
+                "entries": len(self.index),
+                "bytes": self.total_bytes,
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": round(self.hits / lookups, 3) if lookups else 0.0
+            }
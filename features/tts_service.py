@@ -1,9 +1,67 @@
 import asyncio
-import os
+import io
+import queue
 from edge_tts import Communicate
 import pygame
 import time
 import threading
+from collections import deque
+from tts_cache import TTSCache
+from text_stream import split_sentences
+
+# Queue priorities: lower plays first
+PRIORITY_URGENT = 0    # acknowledgements such as "Stopped."
+PRIORITY_NORMAL = 1    # replies
+PRIORITY_WARMUP = 2    # background cache rendering
+PRIORITY_CLOSE = 3
+
+# edge-tts streams constant-bitrate mono MP3 at 48 kbit/s
+MP3_BYTES_PER_SECOND = 48000 // 8
+
+
+class SpeechStream:
+    """Sentences for one utterance, fed while the audio worker is already speaking"""
+
+    def __init__(self):
+        self.sentences = queue.Queue()
+        self.closed = False
+        self.said = 0
+        self.on_first_audio = None  # called with time.monotonic() when playback starts
+
+    def say(self, sentence):
+        if sentence and sentence.strip() and not self.closed:
+            self.sentences.put(sentence.strip())
+            self.said += 1
+
+    def get(self):
+        return self.sentences.get()
+
+    def close(self):
+        if not self.closed:
+            self.closed = True
+            self.sentences.put(None)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def __bool__(self):
+        return True
+
+
+def summarize_latencies(samples):
+    """Count, mean and p95 of a latency sample list (milliseconds)"""
+    if not samples:
+        return {"count": 0, "avg": 0.0, "p95": 0.0}
+    ordered = sorted(samples)
+    return {
+        "count": len(ordered),
+        "avg": round(sum(ordered) / len(ordered), 1),
+        "p95": round(ordered[min(len(ordered) - 1, int(len(ordered) * 0.95))], 1)
+    }
+
 
 class TTSService:
     def __init__(self, voice="en-IN-NeerjaNeural"):
@@ -19,58 +77,247 @@ class TTSService:
         self.current_style = "default"
         pygame.mixer.init()
         
-        # Add threading lock for speech operations
-        self.speech_lock = threading.Lock()
-        self.speech_thread = None
+        # Sentence pipeline state; bumping generation cancels queued and in-flight speech
+        self.generation = 0
+        self._producer = None
+        self.last_first_audio_ms = None
+        
+        # Metrics (recent samples only)
+        self.synthesis_ms = deque(maxlen=200)
+        self.queue_wait_ms = deque(maxlen=200)
+        self.first_audio_ms = deque(maxlen=200)
+        self.max_queue_depth = 0
+        self.utterances = 0
+        
+        # Synthesized audio keyed by (text, voice, style); repeated replies skip edge_tts
+        self.audio_cache = TTSCache()
+        
+        # One long-lived audio worker with its own event loop; speak() only enqueues
+        self._queue = queue.PriorityQueue()
+        self._seq = 0
+        self._seq_lock = threading.Lock()
+        self._loop = asyncio.new_event_loop()
+        self._stop_signal = None
+        self._worker = threading.Thread(target=self._work, name="tts-worker", daemon=True)
+        self._worker.start()
 
-    async def _speak_async(self, text: str) -> None:
-        """Internal async method to handle TTS"""
-        try:
-            if not text:
-                return
-                
-            # Apply voice style only if not default
-            if self.current_style == "default":
-                communicate = Communicate(text, self.voice)
-            else:
-                voice_with_style = f"{self.voice},{self.voice_styles[self.current_style]}"
-                communicate = Communicate(text, voice_with_style)
-            await communicate.save("temp_speech.mp3")
+    def _style(self):
+        return self.voice_styles.get(self.current_style, "")
+
+    async def _synthesize(self, text: str) -> bytes:
+        """Return the audio for text, synthesizing it on a cache miss"""
+        style = self._style()
+        cached = self.audio_cache.read(text, self.voice, style)
+        if cached:
+            return cached
             
-            # Play audio
-            pygame.mixer.music.load("temp_speech.mp3")
-            pygame.mixer.music.play()
-            while pygame.mixer.music.get_busy():
-                time.sleep(0.1)
-                
-            # Cleanup
-            pygame.mixer.music.unload()
-            os.remove("temp_speech.mp3")
-                
+        # Apply voice style only if not default
+        started = time.perf_counter()
+        if self.current_style == "default":
+            communicate = Communicate(text, self.voice)
+        else:
+            communicate = Communicate(text, f"{self.voice},{style}")
+        audio = bytearray()
+        async for chunk in communicate.stream():
+            if chunk["type"] == "audio":
+                audio.extend(chunk["data"])
+        audio = bytes(audio)
+        self.synthesis_ms.append((time.perf_counter() - started) * 1000)
+        self.audio_cache.put(text, self.voice, style, audio)
+        return audio
+
+    async def _sentences(self, source):
+        """Sentences from a full text, or from a SpeechStream as they arrive"""
+        if isinstance(source, str):
+            for sentence in split_sentences(source):
+                yield sentence
+            return
+        loop = asyncio.get_running_loop()
+        while True:
+            sentence = await loop.run_in_executor(None, source.get)
+            if sentence is None:
+                return
+            yield sentence
+
+    async def _produce(self, sentences, buffers, generation):
+        """Synthesize sentences in order into the buffer queue"""
+        try:
+            async for sentence in sentences:
+                if generation != self.generation:
+                    break
+                await buffers.put(await self._synthesize(sentence))
         except Exception as e:
             print(f"TTS error: {e}")
-            
-    def speak(self, text: str) -> None:
-        """Speak text using a separate thread"""
+        finally:
+            await buffers.put(None)
+
+    async def _speak_async(self, text, generation=None) -> None:
+        """Synthesize sentence N+1 while sentence N plays
+
+        Buffers hold at most two sentences, so time to first audio depends on
+        the first sentence only, not on the length of the reply. text may also
+        be a SpeechStream that is still receiving sentences.
+        """
+        if not text:
+            return
+        generation = self.generation if generation is None else generation
+        started = time.perf_counter()
+        buffers = asyncio.Queue(maxsize=2)
+        producer = asyncio.create_task(self._produce(self._sentences(text), buffers, generation))
+        self._producer = producer
+        first = True
+        try:
+            while True:
+                audio = await buffers.get()
+                if audio is None or generation != self.generation:
+                    break
+                if first:
+                    self.last_first_audio_ms = (time.perf_counter() - started) * 1000
+                    self.first_audio_ms.append(self.last_first_audio_ms)
+                    first = False
+                    if getattr(text, "on_first_audio", None):
+                        text.on_first_audio(time.monotonic())
+                    
+                # Play from memory; no temp file
+                pygame.mixer.music.load(io.BytesIO(audio), "mp3")
+                pygame.mixer.music.play()
+                await self._wait_playback(len(audio) / MP3_BYTES_PER_SECOND, generation)
+                pygame.mixer.music.unload()
+        except Exception as e:
+            print(f"TTS error: {e}")
+        finally:
+            producer.cancel()
+            self._producer = None
+
+    async def _wait_playback(self, seconds, generation):
+        """Sleep until the clip is due to end, waking at once if speech is stopped
+
+        The producer runs meanwhile. The mixer has no end event without a
+        display, so the length comes from the bitrate; the last few frames
+        are left to the mixer.
+        """
+        loop = asyncio.get_running_loop()
+        end = loop.time() + seconds
+        while generation == self.generation and loop.time() < end:
+            self._stop_signal.clear()
+            try:
+                await asyncio.wait_for(self._stop_signal.wait(), end - loop.time())
+            except asyncio.TimeoutError:
+                break
+        while generation == self.generation and pygame.mixer.music.get_busy():
+            await asyncio.sleep(0.01)
+
+    def warm_up(self, phrases, background=True):
+        """Pre-render fixed phrases into the cache so they play without synthesis"""
+        if not background:
+            self._run(self._render(phrases))
+            return
+        # One job per phrase so replies queued meanwhile are not held up
+        for phrase in phrases:
+            self._enqueue(PRIORITY_WARMUP, None, ("render", [phrase]))
+
+    async def _render(self, phrases):
+        for phrase in phrases:
+            for sentence in split_sentences(phrase):
+                if (sentence, self.voice, self._style()) not in self.audio_cache:
+                    try:
+                        await self._synthesize(sentence)
+                    except Exception as e:
+                        print(f"TTS warm-up error: {e}")
+
+    def speak(self, text: str, priority: int = PRIORITY_NORMAL, interrupt: bool = False) -> None:
+        """Queue text for the audio worker
+
+        Lower priority numbers play first. interrupt=True stops current and
+        queued speech before this text is queued.
+        """
         if text and isinstance(text, str):
-            self.speech_thread = threading.Thread(target=self._speak_threaded, args=(text,))
-            self.speech_thread.start()
-
-    def _speak_threaded(self, text: str) -> None:
-        """Internal method to handle threaded speech"""
-        with self.speech_lock:
-            self.is_speaking = True
-            asyncio.run(self._speak_async(text))
-        self.is_speaking = False
+            if interrupt:
+                self.stop_speaking()
+            self._enqueue(priority, self.generation, ("speak", text))
+
+    def open_stream(self, priority: int = PRIORITY_NORMAL) -> "SpeechStream":
+        """Start an utterance whose sentences arrive later (e.g. a streamed reply)
+
+        Playback starts with the first say(); close() ends the utterance.
+        """
+        stream = SpeechStream()
+        self._enqueue(priority, self.generation, ("speak", stream))
+        return stream
+
+    def _enqueue(self, priority, generation, job):
+        with self._seq_lock:
+            self._seq += 1
+            seq = self._seq
+        self._queue.put((priority, seq, generation, time.perf_counter(), job))
+        self.max_queue_depth = max(self.max_queue_depth, self._queue.qsize())
+
+    def _run(self, coro):
+        """Run a coroutine on the worker's event loop from any thread"""
+        if threading.current_thread() is self._worker:
+            return self._loop.run_until_complete(coro)
+        done = threading.Event()
+        self._enqueue(PRIORITY_URGENT, None, ("call", (coro, done)))
+        done.wait()
+
+    def _work(self):
+        """Audio worker: one event loop for the life of the service, blocking on the queue"""
+        asyncio.set_event_loop(self._loop)
+        self._stop_signal = asyncio.Event()  # set by stop_speaking() to end a playback wait
+        while True:
+            _, _, generation, enqueued, (kind, payload) = self._queue.get()
+            if kind == "close":
+                break
+            try:
+                if kind == "render":
+                    self._loop.run_until_complete(self._render(payload))
+                elif kind == "call":
+                    coro, done = payload
+                    try:
+                        self._loop.run_until_complete(coro)
+                    finally:
+                        done.set()
+                elif generation == self.generation:  # Stale items were cancelled by stop_speaking()
+                    self.queue_wait_ms.append((time.perf_counter() - enqueued) * 1000)
+                    self.is_speaking = True
+                    self._loop.run_until_complete(self._speak_async(payload, generation))
+                    self.utterances += 1
+            except Exception as e:
+                print(f"TTS worker error: {e}")
+            finally:
+                self.is_speaking = False
+        self._loop.close()
+
+    def close(self):
+        """Stop the audio worker after anything already queued"""
+        self._enqueue(PRIORITY_CLOSE, None, ("close", None))
 
     def stop_speaking(self):
-        """Stop current speech"""
+        """Stop current speech and cancel synthesis of anything not yet played"""
         try:
+            self.generation += 1
+            producer = self._producer
+            if producer:
+                self._loop.call_soon_threadsafe(producer.cancel)
+            if self._stop_signal:
+                self._loop.call_soon_threadsafe(self._stop_signal.set)
             pygame.mixer.music.stop()
             self.is_speaking = False
         except Exception as e:
             print(f"Error stopping speech: {e}")
 
+    def metrics(self):
+        """Queue depth and latency figures for the audio worker"""
+        return {
+            "queue_depth": self._queue.qsize(),
+            "max_queue_depth": self.max_queue_depth,
+            "utterances": self.utterances,
+            "synthesis_ms": summarize_latencies(self.synthesis_ms),
+            "queue_wait_ms": summarize_latencies(self.queue_wait_ms),
+            "first_audio_ms": summarize_latencies(self.first_audio_ms),
+            "cache": self.audio_cache.stats()
+        }
+
     def change_voice(self, voice_type="hinglish"):
         """Change TTS voice"""
         try:
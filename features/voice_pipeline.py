@@ -0,0 +1,223 @@
+import queue
+import threading
+import time
+from collections import deque
+
+
+class LatencyHistogram:
+    """Bucketed latency counts plus recent samples for percentiles (milliseconds)"""
+
+    BOUNDS_MS = (50, 100, 200, 300, 500, 750, 1000, 1500, 2000, 3000, 5000)
+
+    def __init__(self, samples=500):
+        self.buckets = [0] * (len(self.BOUNDS_MS) + 1)
+        self.samples = deque(maxlen=samples)
+        self.lock = threading.Lock()
+
+    def record(self, ms):
+        index = next((i for i, bound in enumerate(self.BOUNDS_MS) if ms <= bound), len(self.BOUNDS_MS))
+        with self.lock:
+            self.buckets[index] += 1
+            self.samples.append(ms)
+
+    def percentile(self, p):
+        with self.lock:
+            ordered = sorted(self.samples)
+        if not ordered:
+            return 0.0
+        return round(ordered[min(len(ordered) - 1, int(len(ordered) * p))], 1)
+
+    def summary(self):
+        labels = [f"<={bound}" for bound in self.BOUNDS_MS] + [f">{self.BOUNDS_MS[-1]}"]
+        with self.lock:
+            counts = {label: count for label, count in zip(labels, self.buckets) if count}
+            total = sum(self.buckets)
+        return {"count": total, "p50": self.percentile(0.5), "p95": self.percentile(0.95), "buckets": counts}
+
+
+class VoiceTurn:
+    """One utterance on its way through the pipeline, with stage timestamps (time.monotonic)"""
+
+    def __init__(self):
+        self.text = None
+        self.match = None
+        self.result = None
+        self.path = None  # "command" or "llm"
+        self.interrupted = False
+        self.prematches = {}  # stable partial -> route match
+        self.times = {"queued": time.monotonic()}
+        self.done = threading.Event()
+
+
+class VoicePipeline:
+    """A voice turn as stages on their own threads, joined by queues
+
+    asr:     listen(on_partial) records the utterance; stable partials are
+             handed to the router while the user is still talking
+    route:   matches partials as they arrive, so the final transcript is
+             usually routed already; short complete commands end listening early
+    respond: runs the route's handler, or converse(text, on_sentence) which
+             streams LLM sentences
+    speech:  sentences go to a TTS stream (open_speech()) as they are produced,
+             so audio starts with the first one
+
+    Per-stage latencies are kept as histograms; end_to_audio.* measures from
+    the end of speech to the first audio, split by command and LLM paths.
+    Routes in quiet_routes speak for themselves; their results are not spoken.
+    on_respond(path) is called as a turn starts responding.
+    """
+
+    STAGES = ("asr", "route", "respond", "tts", "end_to_audio.command", "end_to_audio.llm")
+
+    def __init__(self, listen, router, handlers, converse, open_speech, speech_end=None, quiet_routes=(),
+                 cancel=None, on_respond=None):
+        self.listen = listen
+        self.router = router
+        self.handlers = handlers
+        self.converse = converse
+        self.open_speech = open_speech
+        self.speech_end = speech_end or (lambda: None)
+        self.quiet_routes = set(quiet_routes)
+        self.cancel = cancel or (lambda: None)
+        self.on_respond = on_respond or (lambda path: None)
+        self.interrupted = False
+        self.current = None
+        self.histograms = {stage: LatencyHistogram() for stage in self.STAGES}
+
+        self.turns = queue.Queue()
+        self.events = queue.Queue()
+        self.jobs = queue.Queue()
+        for name, target in (("asr", self._asr_stage), ("route", self._route_stage), ("respond", self._respond_stage)):
+            threading.Thread(target=target, name=f"voice-{name}", daemon=True).start()
+
+    def _record(self, stage, start, end):
+        if start is not None and end is not None:
+            self.histograms[stage].record(max(0.0, end - start) * 1000)
+
+    def run_turn(self, text=None, timeout=60.0):
+        """Listen to (or take) one utterance and respond; returns the handler's result
+
+        Returns once the response has been produced; speech may still be playing.
+        An LLM reply can be cancelled with interrupt() from another thread (e.g.
+        when the wake word is heard); consume_interrupt() then reports it.
+        """
+        turn = VoiceTurn()
+        self.current = turn
+        if text is not None:
+            turn.times["speech_end"] = time.monotonic()
+            self.events.put(("final", turn, text))
+        else:
+            self.turns.put(turn)
+        try:
+            turn.done.wait(timeout)
+        finally:
+            self.current = None
+        return None if turn.interrupted else turn.result
+
+    def interrupt(self):
+        """Cancel the LLM reply of the turn in progress; False if there is none"""
+        turn = self.current
+        if turn is None or turn.path != "llm" or turn.done.is_set():
+            return False
+        turn.interrupted = True
+        self.interrupted = True
+        self.cancel()
+        turn.done.set()
+        return True
+
+    def consume_interrupt(self):
+        """True once after a turn was interrupted"""
+        interrupted, self.interrupted = self.interrupted, False
+        return interrupted
+
+    # Stage 1: speech recognition
+    def _asr_stage(self):
+        while True:
+            turn = self.turns.get()
+            try:
+                text = self.listen(on_partial=lambda partial, turn=turn: self._partial(turn, partial))
+            except Exception as e:
+                print(f"Listening error: {e}")
+                text = None
+            now = time.monotonic()
+            turn.times["speech_end"] = self.speech_end() or now
+            turn.times["transcribed"] = now
+            self._record("asr", turn.times["speech_end"], now)
+            self.events.put(("final", turn, text))
+
+    def _partial(self, turn, partial):
+        """Called from the recognizer thread; True ends listening early"""
+        self.events.put(("partial", turn, partial))
+        return self.router.match_complete(partial.lower().strip()) is not None
+
+    # Stage 2: routing
+    def _route_stage(self):
+        while True:
+            kind, turn, text = self.events.get()
+            if kind == "partial":
+                text = text.lower().strip()
+                if text not in turn.prematches:
+                    turn.prematches[text] = self.router.match(text)
+                continue
+
+            if not text or not isinstance(text, str):
+                turn.done.set()
+                continue
+            turn.text = text.lower().strip()
+            print(f"Processing command: '{turn.text}'")
+            if turn.text in turn.prematches:
+                turn.match = turn.prematches[turn.text]  # routed while the user was still talking
+            else:
+                turn.match = self.router.match(turn.text)
+            turn.times["routed"] = time.monotonic()
+            self._record("route", turn.times.get("transcribed", turn.times["speech_end"]), turn.times["routed"])
+            self.jobs.put(turn)
+
+    # Stages 3 and 4: response and speech
+    def _respond_stage(self):
+        while True:
+            turn = self.jobs.get()
+            try:
+                self._respond(turn)
+            except Exception as e:
+                print(f"Voice input error: {e}")
+                turn.result = f"Error processing command: {str(e)}"
+            finally:
+                turn.done.set()
+
+    def _respond(self, turn):
+        match = turn.match
+        handler = self.handlers.get(match.name) if match else None
+        quiet = bool(match) and match.name in self.quiet_routes
+        turn.path = "command" if handler else "llm"
+        self.on_respond(turn.path)
+
+        speech = None if quiet else self.open_speech()
+        if speech is not None:
+            speech.on_first_audio = lambda at: self._first_audio(turn, at)
+
+        def say(sentence):
+            if "first_sentence" not in turn.times:
+                turn.times["first_sentence"] = time.monotonic()
+                self._record("respond", turn.times["routed"], turn.times["first_sentence"])
+            speech.say(sentence)
+
+        try:
+            if handler:
+                turn.result = handler(match)
+                if speech is not None and isinstance(turn.result, str):
+                    say(turn.result)
+            else:
+                # Only streamed sentences are spoken here; other replies are spoken by their handler
+                turn.result = self.converse(turn.text, on_sentence=say if speech is not None else None)
+        finally:
+            if speech is not None:
+                speech.close()
+
+    def _first_audio(self, turn, at):
+        turn.times["first_audio"] = at
+        self._record("tts", turn.times.get("first_sentence"), at)
+        self._record(f"end_to_audio.{turn.path}", turn.times.get("speech_end"), at)
+
+    def stats(self):
+        return {stage: histogram.summary() for stage, histogram in self.histograms.items()}
@@ -1,30 +1,75 @@
 import speech_recognition as sr
 import time
+import keyword_spotter
 
 class VoiceRecognition:
-    def __init__(self):
+    def __init__(self, capture=None):
         try:
             self.recognizer = sr.Recognizer()
             # Optimized settings for faster processing
             self.recognizer.energy_threshold = 300
-            self.recognizer.dynamic_energy_threshold = False  # Fixed threshold for faster processing
+            # Threshold adapts between phrases; calibrated once on first listen
+            self.recognizer.dynamic_energy_threshold = True
             self.recognizer.pause_threshold = 0.8
             self.recognizer.phrase_threshold = 0.4
             self.recognizer.non_speaking_duration = 0.4
+            self.calibrated = False
+            
+            # Streaming path: endpointed offline recognition from the shared
+            # capture thread; Google recognition is the fallback
+            self.streaming = self._create_streaming_listener(capture)
             
             print("Voice recognition initialized!")
         except Exception as e:
             print(f"Voice recognition initialization error: {e}")
             raise
 
-    def listen(self):
+    def _create_streaming_listener(self, capture):
+        """Offline streaming listener, or None when vosk/model/capture are missing"""
+        if capture is None or not keyword_spotter.is_available():
+            return None
+        try:
+            from streaming_asr import StreamingListener
+            return StreamingListener(capture)
+        except Exception as e:
+            print(f"Streaming recognition disabled: {e}")
+            return None
+
+    def listen(self, on_partial=None):
+        """Listen to user's voice input
+
+        on_partial(text) is called with stable partial results while the user
+        is still speaking; returning True accepts that text immediately.
+        """
+        if self.streaming:
+            return self._listen_streaming(on_partial)
+        return self._listen_online()
+
+    def _listen_streaming(self, on_partial=None):
+        """Offline recognition with VAD endpointing and incremental partials"""
+        try:
+            print("\nListening...")
+            text = self.streaming.listen(timeout=5, phrase_time_limit=10, on_partial=on_partial)
+            if not text:
+                print("Listening timed out")
+                return None
+            text = text.lower().strip()
+            print(f"\nRecognized: '{text}'")
+            return text
+        except Exception as e:
+            print(f"Error in voice recognition: {str(e)}")
+            return None
+
+    def _listen_online(self):
         """Listen to user's voice input using Google Speech Recognition"""
         with sr.Microphone() as source:
             try:
                 print("\nListening...")
                 
-                # Quick noise adjustment
-                self.recognizer.adjust_for_ambient_noise(source, duration=0.3)
+                # Learn the noise floor once; dynamic_energy_threshold keeps it current
+                if not self.calibrated:
+                    self.recognizer.adjust_for_ambient_noise(source, duration=0.3)
+                    self.calibrated = True
                 
                 # Optimized listening timeouts
                 audio = self.recognizer.listen(
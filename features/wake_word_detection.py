@@ -1,27 +1,33 @@
 import os
+import json
+import time
 import pyaudio
 import speech_recognition as sr
 from datetime import datetime
 from plyer import notification
 import logging
+import keyword_spotter
 
 # Configure logging to suppress GRPC warnings
 logging.getLogger('absl').setLevel(logging.ERROR)
 os.environ['GRPC_PYTHON_LOG_LEVEL'] = 'error'
 
 class WakeWordDetection:
-    def __init__(self, default_wake_word="Alexa", notifier=None, tts_service=None):
+    def __init__(self, default_wake_word="Alexa", notifier=None, tts_service=None, capture=None):
         try:
-            # Initialize PyAudio
-            self.audio = pyaudio.PyAudio()
-            self.stream = self.audio.open(
-                format=pyaudio.paInt16,
-                channels=1,
-                rate=16000,
-                input=True,
-                frames_per_buffer=1024,
-                input_device_index=self._get_input_device_index()
-            )
+            # Share the continuous capture thread when given one; otherwise own a stream
+            self.capture = capture
+            self.capture_cursor = None
+            if capture is None:
+                self.audio = pyaudio.PyAudio()
+                self.stream = self.audio.open(
+                    format=pyaudio.paInt16,
+                    channels=1,
+                    rate=16000,
+                    input=True,
+                    frames_per_buffer=1024,
+                    input_device_index=self._get_input_device_index()
+                )
             
             # Initialize voice recognition
             self.recognizer = sr.Recognizer()
@@ -36,7 +42,13 @@ class WakeWordDetection:
             self.config_file = "data/wake_word_config.json"
             self.notifier = notifier
             self.tts_service = tts_service
-            self.wake_word = default_wake_word.lower()
+            self.wake_word = self._load_wake_word(default_wake_word).lower()
+            
+            # Offline keyword spotting on the bundled Vosk model; falls back to
+            # Google recognition when vosk or the model is unavailable
+            self.chunk_size = 1024
+            self.listen_window = 0.5  # seconds of audio per listen_for_wake_word() call
+            self.spotter = self._create_spotter()
             
             # Notification settings
             self.last_notification = None
@@ -48,6 +60,47 @@ class WakeWordDetection:
             print(f"Initialization error: {e}")
             raise
 
+    def _load_wake_word(self, default_wake_word):
+        """Load the saved wake word, if any"""
+        try:
+            if os.path.exists(self.config_file):
+                with open(self.config_file, 'r') as f:
+                    return json.load(f).get("wake_word") or default_wake_word
+        except Exception as e:
+            print(f"Error loading wake word config: {e}")
+        return default_wake_word
+
+    def _create_spotter(self):
+        """Create the offline keyword spotter, or None to use Google recognition"""
+        if not keyword_spotter.is_available():
+            print("Offline wake word model unavailable, using online recognition")
+            return None
+        try:
+            return keyword_spotter.KeywordSpotter(self.wake_word, sample_rate=16000)
+        except Exception as e:
+            print(f"Offline wake word disabled: {e}")
+            return None
+
+    def set_wake_word(self, wake_word):
+        """Change the wake word and remember it"""
+        wake_word = wake_word.lower().strip()
+        if not wake_word:
+            return "Please specify a wake word"
+        try:
+            if self.spotter:
+                self.spotter.set_keyword(wake_word)
+        except ValueError as e:
+            return f"I can't listen for '{wake_word}' offline: {e}"
+        
+        self.wake_word = wake_word
+        try:
+            os.makedirs(os.path.dirname(self.config_file), exist_ok=True)
+            with open(self.config_file, 'w') as f:
+                json.dump({"wake_word": wake_word}, f)
+        except Exception as e:
+            print(f"Error saving wake word: {e}")
+        return f"Wake word changed to {wake_word}"
+
     def _get_input_device_index(self):
         """Get default input device index"""
         for i in range(self.audio.get_device_count()):
@@ -57,7 +110,9 @@ class WakeWordDetection:
         return None
 
     def __del__(self):
-        """Cleanup audio resources"""
+        """Cleanup audio resources (a shared capture is stopped by its owner)"""
+        if getattr(self, 'capture', None):
+            return
         if hasattr(self, 'stream'):
             self.stream.stop_stream()
             self.stream.close()
@@ -66,6 +121,62 @@ class WakeWordDetection:
 
     def listen_for_wake_word(self):
         """Listen for wake word with optimized processing"""
+        if self.spotter:
+            return self._spot_wake_word()
+        return self._recognize_wake_word_online()
+
+    def _drain_stale_audio(self):
+        """Drop audio buffered while nobody was listening (e.g. during a reply)"""
+        if self.capture:
+            # Resume from the newest audio if we fell behind by more than a window
+            latest = self.capture.ring.cursor()
+            if self.capture_cursor is None or latest - self.capture_cursor > self._window_chunks():
+                self.capture_cursor = latest
+                self.spotter.reset()
+            return
+        try:
+            available = self.stream.get_read_available()
+            if available > self.chunk_size * 2:
+                self.stream.read(available, exception_on_overflow=False)
+                self.spotter.reset()
+        except Exception:
+            pass
+
+    def _spot_wake_word(self):
+        """Run the offline spotter over ~listen_window seconds of the open stream"""
+        try:
+            self._drain_stale_audio()
+            for chunk in self._read_window():
+                if self.spotter.process(chunk):
+                    self.notify_wake_word(self.wake_word)
+                    if self.tts_service:
+                        self.tts_service.stop_speaking()
+                    return True
+        except Exception as e:
+            print(f"Wake word error: {e}")
+        return False
+
+    def _window_chunks(self):
+        return max(1, int(self.listen_window * 16000 / self.chunk_size))
+
+    def _read_window(self):
+        """Yield ~listen_window seconds of audio from the capture ring or own stream"""
+        if not self.capture:
+            for _ in range(self._window_chunks()):
+                yield self.stream.read(self.chunk_size, exception_on_overflow=False)
+            return
+        deadline = time.monotonic() + self.listen_window
+        while time.monotonic() < deadline:
+            frames, self.capture_cursor = self.capture.ring.read(self.capture_cursor, timeout=self.listen_window)
+            for frame in frames:
+                yield frame[1]
+
+    def spotter_stats(self):
+        """CPU and latency figures for the offline spotter (None when online)"""
+        return self.spotter.stats() if self.spotter else None
+
+    def _recognize_wake_word_online(self):
+        """Fallback: record a short clip and send it to Google recognition"""
         try:
             with self.microphone as source:
                 audio = self.recognizer.listen(
@@ -0,0 +1,79 @@
+import os
+import sys
+import threading
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "features"))
+
+from chat_context import ChatContext, estimate_tokens
+
+
+def test_keeps_last_turns_and_summarizes_older_ones():
+    prompts = []
+    context = ChatContext(lambda prompt: prompts.append(prompt) or "User is called Sam.",
+                          system_prompt="You are Vani.", keep_turns=2)
+    for i in range(5):
+        context.add_turn(f"question {i}", f"answer {i}")
+        context.wait(1)
+
+    history = context.history()
+    assert "User is called Sam." in history[0]["parts"][0]
+    assert [entry["parts"][0] for entry in history[2:]] == ["question 3", "answer 3", "question 4", "answer 4"]
+    assert "question 0" in prompts[0]
+    assert context.stats()["summaries"] == 3
+
+
+def test_history_size_stays_flat():
+    context = ChatContext(lambda prompt: "summary", budget=200, keep_turns=50)
+    sizes = []
+    for i in range(40):
+        context.add_turn("tell me more " * 10, "here is more detail " * 10)
+        context.wait(1)
+        sizes.append(sum(estimate_tokens(e["parts"][0]) for e in context.history()))
+    assert max(sizes) <= 200 + estimate_tokens("summary") + 50
+    assert sizes[-1] <= sizes[10] + 10
+
+
+def test_turns_stay_verbatim_until_summarized():
+    release = threading.Event()
+
+    def slow_summary(prompt):
+        release.wait(1)
+        return "older stuff"
+
+    context = ChatContext(slow_summary, keep_turns=1)
+    context.add_turn("first", "one")
+    context.add_turn("second", "two")
+    texts = [entry["parts"][0] for entry in context.history()]
+    assert texts == ["first", "one", "second", "two"]  # still being summarized
+
+    release.set()
+    context.wait(1)
+    texts = [entry["parts"][0] for entry in context.history()]
+    assert "older stuff" in texts[0] and texts[2:] == ["second", "two"]
+
+
+def test_failed_summary_is_retried_later():
+    calls = []
+
+    def flaky(prompt):
+        calls.append(prompt)
+        if len(calls) == 1:
+            raise ConnectionError("offline")
+        return "recovered"
+
+    context = ChatContext(flaky, keep_turns=1)
+    context.add_turn("a", "1")
+    context.add_turn("b", "2")
+    context.wait(1)
+    assert context.stats()["summary_errors"] == 1 and not context.summary
+    context.add_turn("c", "3")
+    context.wait(1)
+    assert context.summary == "recovered" and context.stats()["verbatim_turns"] == 1
+
+
+if __name__ == "__main__":
+    test_keeps_last_turns_and_summarizes_older_ones()
+    test_history_size_stays_flat()
+    test_turns_stay_verbatim_until_summarized()
+    test_failed_summary_is_retried_later()
+    print("✓ Chat context tests passed")
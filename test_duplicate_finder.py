@@ -0,0 +1,108 @@
+import os
+import sys
+import tempfile
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "features"))
+
+from duplicate_finder import EDGE_BYTES, DuplicateFinder, HashCache
+
+
+def write(path, data, mtime=None):
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, "wb") as f:
+        f.write(data)
+    if mtime:
+        os.utime(path, (mtime, mtime))
+
+
+def rows(root):
+    files = []
+    for directory, dirs, names in os.walk(root):
+        for name in names:
+            stat = os.stat(os.path.join(directory, name))
+            files.append((os.path.join(directory, name), stat.st_size, stat.st_mtime))
+    return files
+
+
+def make_tree(root):
+    big = os.urandom(3 * EDGE_BYTES)
+    # Same size and same ends as `big`, different middle: only the full hash tells them apart
+    middle = big[:EDGE_BYTES] + bytes(EDGE_BYTES) + big[-EDGE_BYTES:]
+    write(os.path.join(root, "a", "big.bin"), big, mtime=1000)
+    write(os.path.join(root, "b", "big copy.bin"), big, mtime=2000)
+    write(os.path.join(root, "b", "big other.bin"), middle)
+    write(os.path.join(root, "small 1.txt"), b"hello", mtime=1000)
+    write(os.path.join(root, "small 2.txt"), b"hello", mtime=3000)
+    write(os.path.join(root, "small 3.txt"), b"hello", mtime=2000)
+    write(os.path.join(root, "same size.txt"), b"world")
+    write(os.path.join(root, "unique.txt"), b"only one of these")
+    write(os.path.join(root, "empty 1.txt"), b"")
+    write(os.path.join(root, "empty 2.txt"), b"")
+
+
+def test_groups_every_copy():
+    with tempfile.TemporaryDirectory() as root:
+        make_tree(root)
+        finder = DuplicateFinder(HashCache(":memory:"), workers=4)
+        groups = finder.find(rows(root))
+        # All three small copies land in one group (not just pairs with the first), oldest first
+        assert groups == [
+            [os.path.join(root, "a", "big.bin"), os.path.join(root, "b", "big copy.bin")],
+            [os.path.join(root, "small 1.txt"), os.path.join(root, "small 3.txt"), os.path.join(root, "small 2.txt")],
+        ]
+        stats = finder.stats()
+        assert stats["partial_hashed"] == 7  # "unique.txt" and the empty files are never read
+        assert stats["full_hashed"] == 3  # only files too large for the partial hash to cover
+        assert stats["groups"] == 2
+
+
+def test_rerun_reads_only_changed_files():
+    with tempfile.TemporaryDirectory() as root, tempfile.TemporaryDirectory() as db_dir:
+        make_tree(root)
+        cache = HashCache(os.path.join(db_dir, "hashes.sqlite3"))
+        first = DuplicateFinder(cache).find(rows(root))
+        cache.close()
+
+        # A new process reuses the hashes from disk
+        finder = DuplicateFinder(HashCache(os.path.join(db_dir, "hashes.sqlite3")))
+        assert finder.find(rows(root)) == first
+        assert finder.stats()["bytes_read"] == 0
+
+        write(os.path.join(root, "small 2.txt"), b"HELLO", mtime=4000)
+        groups = finder.find(rows(root))
+        assert [os.path.join(root, "small 1.txt"), os.path.join(root, "small 3.txt")] in groups
+        assert finder.stats()["partial_hashed"] == 1
+        finder.cache.close()
+
+
+def test_vanished_files_are_skipped():
+    with tempfile.TemporaryDirectory() as root:
+        make_tree(root)
+        files = rows(root)
+        os.remove(os.path.join(root, "small 3.txt"))
+        finder = DuplicateFinder(HashCache(":memory:"))
+        assert [os.path.join(root, "small 1.txt"), os.path.join(root, "small 2.txt")] in finder.find(files)
+        assert finder.stats()["errors"] == 1
+
+
+def test_stale_listing_is_restated():
+    with tempfile.TemporaryDirectory() as root:
+        write(os.path.join(root, "a.txt"), b"aaaa", mtime=1000)
+        write(os.path.join(root, "b.txt"), b"aaaa", mtime=1000)
+        stale = rows(root)  # e.g. a catalog that missed the next edit
+        finder = DuplicateFinder(HashCache(":memory:"))
+        assert len(finder.find(stale)) == 1
+
+        write(os.path.join(root, "b.txt"), b"bbbbbbbb", mtime=2000)
+        assert finder.find(stale) == []
+        write(os.path.join(root, "b.txt"), b"bbbb", mtime=3000)  # same size again, new content
+        assert finder.find(stale) == []
+        assert finder.stats()["partial_hashed"] == 3  # a.txt came from the cache, b.txt was reread
+
+
+if __name__ == "__main__":
+    test_groups_every_copy()
+    test_rerun_reads_only_changed_files()
+    test_vanished_files_are_skipped()
+    test_stale_listing_is_restated()
+    print("✓ Duplicate finder tests passed")
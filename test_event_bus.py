@@ -0,0 +1,59 @@
+import os
+import sys
+import threading
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "features"))
+
+from event_bus import EventBus
+
+
+def test_mailbox_wakes_on_publish():
+    bus = EventBus()
+    mailbox = bus.subscribe("wake_word", "quit")
+    started = time.monotonic()
+    threading.Timer(0.05, bus.publish, args=("wake_word", "play music")).start()
+    event = mailbox.get(timeout=2)
+    assert event.topic == "wake_word" and event.payload == "play music"
+    assert time.monotonic() - started < 1
+    assert mailbox.get(timeout=0.01) is None
+
+    # Topics a mailbox did not subscribe to never reach it
+    bus.publish("speech.finished")
+    assert mailbox.poll() is None
+    assert bus.stats()["published"] == {"wake_word": 1, "speech.finished": 1}
+
+
+def test_poll_drain_and_close():
+    bus = EventBus()
+    mailbox = bus.subscribe("wake_word", "command")
+    bus.publish("wake_word")
+    bus.publish("command", "stop")
+    bus.publish("wake_word")
+    assert mailbox.poll("command").payload == "stop"
+    assert mailbox.drain("wake_word") == 2 and mailbox.poll() is None
+
+    waiter = threading.Thread(target=lambda: results.append(mailbox.get()))
+    results = []
+    waiter.start()
+    bus.unsubscribe(mailbox)
+    waiter.join(2)
+    assert results == [None]
+
+
+def test_callbacks_run_before_mailboxes_and_survive_errors():
+    bus = EventBus()
+    order = []
+    mailbox = bus.subscribe("wake_word")
+    bus.on("wake_word", lambda event: order.append(("callback", mailbox.poll())))
+    bus.on("wake_word", lambda event: 1 / 0)
+    bus.publish("wake_word")
+    assert order == [("callback", None)]
+    assert mailbox.poll().topic == "wake_word"
+
+
+if __name__ == "__main__":
+    test_mailbox_wakes_on_publish()
+    test_poll_drain_and_close()
+    test_callbacks_run_before_mailboxes_and_survive_errors()
+    print("✓ Event bus tests passed")
@@ -0,0 +1,110 @@
+import os
+import sys
+import tempfile
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "features"))
+
+from file_crawler import DEFAULT_EXCLUDES, FileCrawler, excludes_from_env
+from file_index import FileIndex
+from file_watcher import CatalogWatcher
+
+
+def write(path, text="x"):
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, "w") as f:
+        f.write(text)
+
+
+def make_tree(root):
+    write(os.path.join(root, "docs", "budget.xlsx"))
+    write(os.path.join(root, "docs", "deep", "deeper", "notes.txt"))
+    write(os.path.join(root, "pics", "holiday.jpg"))
+    write(os.path.join(root, "project", "node_modules", "lib", "index.js"))
+    write(os.path.join(root, "project", ".git", "HEAD"))
+    write(os.path.join(root, "project", "Build.Cache", "blob.bin"))
+
+
+def names(rows):
+    return sorted(row[1] for row in rows)
+
+
+def test_walks_several_roots_once():
+    with tempfile.TemporaryDirectory() as root:
+        make_tree(root)
+        crawler = FileCrawler(excludes=DEFAULT_EXCLUDES)
+        # "docs" lies inside root, so it is not walked twice
+        rows = list(crawler.walk([root, os.path.join(root, "docs"), os.path.join(root, "missing")]))
+        assert names(rows) == ["blob.bin", "budget.xlsx", "holiday.jpg", "notes.txt"]
+        path, name, size, mtime = next(row for row in rows if row[1] == "budget.xlsx")
+        assert path == os.path.join(root, "docs", "budget.xlsx") and size == 1 and mtime > 0
+        stats = crawler.stats()
+        assert stats["walks"] == 1 and stats["files"] == 4 and stats["excluded"] == 2
+
+
+def test_exclude_globs_from_environment():
+    with tempfile.TemporaryDirectory() as root:
+        make_tree(root)
+        os.environ["FILE_SEARCH_EXCLUDE"] = "*.cache, pics"
+        try:
+            assert excludes_from_env()[-2:] == ("*.cache", "pics")
+            crawler = FileCrawler()
+        finally:
+            del os.environ["FILE_SEARCH_EXCLUDE"]
+        assert names(crawler.walk([root])) == ["budget.xlsx", "notes.txt"]
+        assert crawler.excluded("NODE_MODULES")
+        assert crawler.excluded_path(os.path.join(root, "project", ".git", "HEAD"))
+        assert not crawler.excluded_path(os.path.join(root, "docs", "budget.xlsx"))
+
+
+def test_max_depth():
+    with tempfile.TemporaryDirectory() as root:
+        make_tree(root)
+        crawler = FileCrawler(excludes=DEFAULT_EXCLUDES, max_depth=1)
+        assert "notes.txt" not in names(crawler.walk([root]))
+        assert "budget.xlsx" in names(crawler.walk([root]))
+
+
+def test_match_and_early_stop():
+    with tempfile.TemporaryDirectory() as root:
+        for i in range(30):
+            write(os.path.join(root, f"dir{i}", f"report {i}.txt"))
+            write(os.path.join(root, f"dir{i}", f"other {i}.txt"))
+        crawler = FileCrawler(excludes=[], workers=4)
+        rows = list(crawler.walk([root], match=lambda name: name.startswith("report"), limit=5))
+        assert len(rows) == 5 and all(row[1].startswith("report") for row in rows)
+        assert crawler.stats()["stopped_early"] == 1
+
+        # Closing the generator early also stops the walk
+        walk = crawler.walk([root])
+        next(walk)
+        walk.close()
+        assert crawler.stats()["walks"] == 2
+
+
+def test_catalog_and_watcher_share_excludes():
+    with tempfile.TemporaryDirectory() as root, tempfile.TemporaryDirectory() as db_dir:
+        make_tree(root)
+        crawler = FileCrawler(excludes=DEFAULT_EXCLUDES)
+        index = FileIndex(os.path.join(db_dir, "files.sqlite3"), exclude=crawler.excluded)
+        watcher = CatalogWatcher(index, [root], use_events=False, exclude=crawler.excluded_path)
+        watcher.rescan()
+        assert names(index.files_in(root)) == ["blob.bin", "budget.xlsx", "holiday.jpg", "notes.txt"]
+
+        write(os.path.join(root, "project", "node_modules", "new.js"))
+        watcher.apply("created", os.path.join(root, "project", "node_modules", "new.js"))
+        # Moving a file into an excluded directory drops it from the catalog
+        os.rename(os.path.join(root, "pics", "holiday.jpg"), os.path.join(root, "project", ".git", "holiday.jpg"))
+        watcher.apply("moved", os.path.join(root, "pics", "holiday.jpg"),
+                      os.path.join(root, "project", ".git", "holiday.jpg"))
+        assert names(index.files_in(root)) == ["blob.bin", "budget.xlsx", "notes.txt"]
+        assert watcher.stats()["ignored"] == 1
+        index.close()
+
+
+if __name__ == "__main__":
+    test_walks_several_roots_once()
+    test_exclude_globs_from_environment()
+    test_max_depth()
+    test_match_and_early_stop()
+    test_catalog_and_watcher_share_excludes()
+    print("✓ File crawler tests passed")
@@ -0,0 +1,134 @@
+import os
+import sys
+import tempfile
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "features"))
+
+from file_index import FileIndex, prefix_range
+
+
+def make_tree(root, paths):
+    for path in paths:
+        full = os.path.join(root, *path.split("/"))
+        os.makedirs(os.path.dirname(full), exist_ok=True)
+        with open(full, "w") as f:
+            f.write(path)
+
+
+def test_crawl_and_search():
+    with tempfile.TemporaryDirectory() as root, tempfile.TemporaryDirectory() as db_dir:
+        make_tree(root, ["Documents/Budget 2024.xlsx", "Documents/notes.txt",
+                         "Downloads/budget_draft.docx", "Downloads/a_b.txt", "Pictures/cat.png"])
+        index = FileIndex(os.path.join(db_dir, "files.sqlite3"))
+        assert not index.covers(root)
+        index.crawl(os.path.join(root, "Documents"), background=False)
+        index.crawl(root, background=False)
+        assert index.covers(os.path.join(root, "Downloads")) and index.count() == 5
+
+        names = lambda rows: sorted(row[1] for row in rows)
+        assert names(index.search(["budget"])) == ["Budget 2024.xlsx", "budget_draft.docx"]
+        assert names(index.search(["budget", "24"])) == ["Budget 2024.xlsx"]
+        assert names(index.search(["budget"], os.path.join(root, "Downloads"))) == ["budget_draft.docx"]
+        # LIKE wildcards in keywords are literal
+        assert names(index.search(["a_b"])) == ["a_b.txt"]
+        path, name, size, mtime = index.search(["cat"])[0]
+        assert size == os.path.getsize(path) and mtime == os.path.getmtime(path)
+
+        # A recrawl drops deleted files and picks up new ones
+        os.remove(os.path.join(root, "Documents", "notes.txt"))
+        make_tree(root, ["Documents/new notes.md"])
+        index.crawl(root, background=False)
+        assert names(index.search(["notes"])) == ["new notes.md"]
+        assert index.stats()["crawls"] == 3
+        index.close()
+
+
+def test_index_persists_between_runs():
+    with tempfile.TemporaryDirectory() as root:
+        make_tree(root, ["music/song.mp3"])
+        db_path = os.path.join(root, "files.sqlite3")
+        index = FileIndex(db_path)
+        index.crawl(os.path.join(root, "music"), background=False)
+        index.close()
+
+        reopened = FileIndex(db_path)
+        assert reopened.covers(os.path.join(root, "music"))
+        assert [row[1] for row in reopened.search(["song"])] == ["song.mp3"]
+        reopened.close()
+
+
+def test_rescan_skips_unchanged_directories():
+    with tempfile.TemporaryDirectory() as root, tempfile.TemporaryDirectory() as db_dir:
+        make_tree(root, ["a/one.txt", "a/deep/two.txt", "b/three.txt", "b/old/four.txt"])
+        index = FileIndex(os.path.join(db_dir, "files.sqlite3"))
+        index.crawl(root, background=False)
+        assert index.stats()["dirs_scanned"] == 5
+
+        # Only b changed: the other directories are stat-ed, not listed
+        os.remove(os.path.join(root, "b", "three.txt"))
+        os.remove(os.path.join(root, "b", "old", "four.txt"))
+        os.rmdir(os.path.join(root, "b", "old"))
+        make_tree(root, ["b/five.txt"])
+        index.crawl(root, background=False)
+        stats = index.stats()
+        assert stats["dirs_scanned"] == 6 and stats["dirs_skipped"] == 3
+        names = sorted(row[1] for row in index.files_in(root))
+        assert names == ["five.txt", "one.txt", "two.txt"]
+        assert [row[1] for row in index.files_in(os.path.join(root, "a"), recursive=False)] == ["one.txt"]
+        index.close()
+
+
+def test_incremental_updates():
+    with tempfile.TemporaryDirectory() as root, tempfile.TemporaryDirectory() as db_dir:
+        make_tree(root, ["docs/report.txt"])
+        index = FileIndex(os.path.join(db_dir, "files.sqlite3"))
+        index.crawl(root, background=False)
+
+        report = os.path.join(root, "docs", "report.txt")
+        with open(report, "a") as f:
+            f.write("more")
+        index.update(report)
+        assert index.search(["report"])[0][2] == os.path.getsize(report)
+
+        make_tree(root, ["new/sub/plan.txt"])
+        index.update(os.path.join(root, "new"))
+        assert [row[1] for row in index.search(["plan"])] == ["plan.txt"]
+
+        moved = os.path.join(root, "docs", "final.txt")
+        os.rename(report, moved)
+        index.move(report, moved)
+        assert [row[1] for row in index.search(["txt"], os.path.join(root, "docs"))] == ["final.txt"]
+
+        index.remove(os.path.join(root, "new"))
+        assert index.search(["plan"]) == []
+        index.close()
+
+
+def test_fuzzy_candidates():
+    with tempfile.TemporaryDirectory() as root, tempfile.TemporaryDirectory() as db_dir:
+        make_tree(root, ["Budget 2024.xlsx", "budget notes.txt", "gadget.pdf", "holiday.zip"])
+        index = FileIndex(os.path.join(db_dir, "files.sqlite3"))
+        index.crawl(root, background=False)
+        names = lambda rows: sorted(row[1] for row in rows)
+        # Names sharing a trigram with every word come first
+        assert names(index.candidates([["bud", "dge", "get", "udg"], ["not", "ote", "tes"]])) == ["budget notes.txt"]
+        # When none do, names sharing any trigram are candidates, misspelt words included
+        assert names(index.candidates([["bud", "dge", "get", "udj"], ["hol", "oli"], ["xyz"]])) == \
+            ["Budget 2024.xlsx", "budget notes.txt", "gadget.pdf", "holiday.zip"]
+        index.close()
+
+
+def test_prefix_range_excludes_siblings():
+    low, high = prefix_range(os.path.join("home", "docs"))
+    assert low <= os.path.join("home", "docs", "a.txt") < high
+    assert not (low <= os.path.join("home", "docs2", "a.txt") < high)
+
+
+if __name__ == "__main__":
+    test_crawl_and_search()
+    test_index_persists_between_runs()
+    test_rescan_skips_unchanged_directories()
+    test_incremental_updates()
+    test_fuzzy_candidates()
+    test_prefix_range_excludes_siblings()
+    print("✓ File index tests passed")
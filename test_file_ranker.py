@@ -0,0 +1,89 @@
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "features"))
+
+from file_ranker import FileRanker, candidate_grams, edit_distance, name_tokens, query_tokens
+
+NOW = time.time()
+DAY = 86400
+
+
+def row(name, age_days=100, directory="/home/user/Documents"):
+    return (f"{directory}/{name}", name, 1000, NOW - age_days * DAY)
+
+
+def names(ranked):
+    return [candidate[1] for score, candidate in ranked]
+
+
+def test_tokens():
+    assert query_tokens("find my budget spreadsheet twenty twenty four") == ["budget", "spreadsheet", "2024"]
+    assert query_tokens("nineteen ninety nine taxes") == ["1999", "taxes"]
+    assert name_tokens("Budget2024_finalDraft-v2.xlsx") == ["budget", "2024", "final", "draft", "v", "2", "xlsx"]
+    assert name_tokens("chapter_one.docx") == ["chapter", "1", "docx"]
+    assert edit_distance("spredsheet", "spreadsheet", 2) == 1
+    assert edit_distance("budget", "gadget", 1) == 2  # gives up past the limit
+    assert edit_distance("taexs", "taxes", 1) == 1  # a swapped pair is one edit
+    assert candidate_grams(["budget", "spreadsheet", "20"]) == [["bud", "dge", "get", "udg"]]
+
+
+def test_spoken_queries_rank_the_right_file_first():
+    ranker = FileRanker()
+    candidates = [row("Budget 2024.xlsx"), row("budget_2023.xlsx"), row("Budget 2024 notes.docx"),
+                  row("gadget review.pdf"), row("holiday photos.zip")]
+    ranked = ranker.rank("budget spreadsheet twenty twenty four", candidates, now=NOW)
+    assert names(ranked)[0] == "Budget 2024.xlsx"
+    assert "holiday photos.zip" not in names(ranked) and "gadget review.pdf" not in names(ranked)
+
+    # A recognizer typo still finds the file
+    ranked = ranker.rank("resume for goggle", [row("Resume Google.pdf"), row("cover letter.pdf")], now=NOW)
+    assert names(ranked) == ["Resume Google.pdf"]
+
+
+def test_recency_and_usage_break_ties():
+    ranker = FileRanker()
+    old, new = row("report.pdf", 400, "/a"), row("report.pdf", 1, "/b")
+    assert names(ranker.rank("report", [old, new], now=NOW)) == ["report.pdf", "report.pdf"]
+    assert ranker.rank("report", [old, new], now=NOW)[0][1] == new
+
+    ranker.load_history({"2024-01-01 10:00:00": {"opened": "/a/report.pdf"},
+                         "2024-01-02 10:00:00": {"opened": "/a/report.pdf"},
+                         "2024-01-03 10:00:00": {"query": "report", "location": "/"}})
+    assert ranker.rank("report", [old, new], now=NOW)[0][1] == old
+    # Boosts never surface files that do not match
+    ranker.record_open("/a/taxes.pdf")
+    assert ranker.rank("report", [row("taxes.pdf", 0, "/a")], now=NOW) == []
+
+
+def test_ranking_is_fast_enough_for_a_voice_turn():
+    words = ["budget", "invoice", "report", "notes", "photo", "draft", "final", "summary", "plan", "letter"]
+    candidates = [row(f"{words[i % 10]}_{words[(i // 10) % 10]}_{2000 + i % 25}_{i}.pdf", i % 500)
+                  for i in range(2000)]
+    started = time.perf_counter()
+    ranked = FileRanker().rank("budget summery twenty twenty four", candidates, limit=5, now=NOW)
+    assert time.perf_counter() - started < 0.5
+    assert all("budget" in name and "summary" in name for name in names(ranked))
+
+
+def test_collect_keeps_crawling_past_weak_matches():
+    ranker = FileRanker()
+    weak = [row(f"budget_{i}.txt") for i in range(10)]  # one of two words: above min_score, below strong
+    strong = [row("budget_summary.xlsx"), row("Budget Summary 2024.xlsx")]
+    rows = iter(weak + strong + [row("budget_summary_copy.xlsx")])
+    pool = ranker.collect("budget summary", rows, enough=2)
+    assert len(pool) == 12 and next(rows)[1] == "budget_summary_copy.xlsx"  # stopped after the second strong one
+    assert names(ranker.rank("budget summary", pool, limit=2, now=NOW))[0].startswith("budget_summary")
+
+    assert len(ranker.collect("budget summary", iter(weak), enough=2, max_rows=4)) == 4
+    assert ranker.collect("", iter(weak), enough=2) == []
+
+
+if __name__ == "__main__":
+    test_tokens()
+    test_spoken_queries_rank_the_right_file_first()
+    test_recency_and_usage_break_ties()
+    test_ranking_is_fast_enough_for_a_voice_turn()
+    test_collect_keeps_crawling_past_weak_matches()
+    print("✓ File ranker tests passed")
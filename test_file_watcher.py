@@ -0,0 +1,97 @@
+import os
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "features"))
+
+from file_index import FileIndex
+from file_watcher import CatalogWatcher, is_available
+
+
+def write(path, text="x"):
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, "w") as f:
+        f.write(text)
+
+
+def wait_for(condition, timeout=5.0):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if condition():
+            return True
+        time.sleep(0.05)
+    return False
+
+
+def test_events_are_applied_to_the_catalog():
+    with tempfile.TemporaryDirectory() as root, tempfile.TemporaryDirectory() as db_dir:
+        write(os.path.join(root, "old.txt"))
+        index = FileIndex(os.path.join(db_dir, "files.sqlite3"))
+        watcher = CatalogWatcher(index, [root], use_events=False)
+        watcher.rescan()
+
+        write(os.path.join(root, "new.txt"))
+        watcher.apply("created", os.path.join(root, "new.txt"))
+        os.rename(os.path.join(root, "old.txt"), os.path.join(root, "renamed.txt"))
+        watcher.apply("moved", os.path.join(root, "old.txt"), os.path.join(root, "renamed.txt"))
+        watcher.apply("modified", root, is_directory=True)  # ignored: entries report themselves
+        assert sorted(row[1] for row in index.files_in(root)) == ["new.txt", "renamed.txt"]
+
+        os.remove(os.path.join(root, "new.txt"))
+        watcher.apply("deleted", os.path.join(root, "new.txt"))
+        assert [row[1] for row in index.files_in(root)] == ["renamed.txt"]
+
+        # Writes to the catalog's own database never feed back
+        watcher.apply("modified", os.path.join(db_dir, "files.sqlite3-wal"))
+        stats = watcher.stats()
+        assert stats["events"] == 3 and stats["ignored"] == 1
+        assert stats["staleness_s"] is not None
+        index.close()
+
+
+def test_polling_rescan_sees_files_edited_in_place():
+    with tempfile.TemporaryDirectory() as root, tempfile.TemporaryDirectory() as db_dir:
+        write(os.path.join(root, "d", "b.txt"), "old")
+        index = FileIndex(os.path.join(db_dir, "files.sqlite3"))
+        watcher = CatalogWatcher(index, [root], use_events=False)
+        watcher.rescan()
+
+        directory_mtime = os.stat(os.path.join(root, "d")).st_mtime
+        with open(os.path.join(root, "d", "b.txt"), "w") as f:
+            f.write("much longer text")
+        os.utime(os.path.join(root, "d", "b.txt"), (2_000_000_000, 2_000_000_000))
+        assert os.stat(os.path.join(root, "d")).st_mtime == directory_mtime  # directory unchanged
+
+        watcher.rescan()
+        assert index.files_in(root) == [(os.path.join(root, "d", "b.txt"), "b.txt", 16, 2_000_000_000)]
+        stats = index.stats()
+        assert stats["dirs_skipped"] == 2 and stats["files_restated"] == 1
+        index.close()
+
+
+def test_live_watching():
+    if not is_available():
+        print("watchdog not installed, skipping live watch test")
+        return
+    with tempfile.TemporaryDirectory() as root, tempfile.TemporaryDirectory() as db_dir:
+        index = FileIndex(os.path.join(db_dir, "files.sqlite3"))
+        watcher = CatalogWatcher(index, [root])
+        watcher.start()
+        try:
+            assert watcher.synced.wait(5) and watcher.mode == "events"
+            write(os.path.join(root, "sub", "live.txt"))
+            assert wait_for(lambda: [row[1] for row in index.search(["live"])] == ["live.txt"])
+            os.remove(os.path.join(root, "sub", "live.txt"))
+            assert wait_for(lambda: index.search(["live"]) == [])
+            assert watcher.stats()["rescans"] == 1  # kept current by events alone
+        finally:
+            watcher.stop()
+            index.close()
+
+
+if __name__ == "__main__":
+    test_events_are_applied_to_the_catalog()
+    test_polling_rescan_sees_files_edited_in_place()
+    test_live_watching()
+    print("✓ File watcher tests passed")
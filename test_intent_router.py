@@ -0,0 +1,101 @@
+import os
+import sys
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "features"))
+
+from intent_router import AhoCorasick, IntentRouter, Route, router, run_commands, split_commands
+
+
+def test_aho_corasick_finds_overlapping_keywords():
+    matcher = AhoCorasick(["he", "she", "his", "hers"])
+    found = sorted((matcher.keywords[i], start) for i, start, _ in matcher.iter_matches("ushers"))
+    assert found == [("he", 2), ("hers", 2), ("she", 1)]
+
+
+def test_routes_and_slots():
+    cases = {
+        "play despacito on youtube": ("music.play_youtube", {"query": "despacito"}),
+        "play shape of you": ("music.play", {"query": "shape of you"}),
+        "open chrome and type hello world": ("app.open_and_type", {"app": "chrome", "text": "hello world"}),
+        "flights from delhi to mumbai": ("flight", {"origin": "delhi", "destination": "mumbai"}),
+        "compare prices of iphone 15": ("price", {"product": "iphone 15"}),
+        "search cats on youtube": ("search.youtube", {"query": "cats"}),
+        "write me an essay on climate change": ("document.essay", {"topic": "climate change"}),
+        "set wake word to jarvis": ("wake_word.set", {"word": "jarvis"}),
+    }
+    for text, (name, slots) in cases.items():
+        match = router.match(text)
+        assert match is not None, text
+        assert (match.name, match.slots) == (name, slots), text
+
+
+def test_priorities_resolve_conflicts():
+    assert router.match("stop recording").name == "camera.record_stop"
+    assert router.match("stop the music").name == "music.pause"
+    assert router.match("stop").name == "stop"
+    assert router.match("what can you do").name == "help"
+    assert router.match("help me write an essay on dogs").name == "document.essay"
+    assert router.match("can you help me find my keys").name != "help"
+
+
+def test_whole_words_only():
+    assert router.match("this is fine") is None  # "hi" inside "this"
+    assert router.match("display settings") is None  # "play" inside "display"
+    assert router.match("what's the capital of france") is None
+
+
+def test_anchor_and_dispatch():
+    custom = IntentRouter([
+        Route("greet", ["hello"], priority=1),
+        Route("start", ["start {thing}"], priority=2, anchor=True),
+    ])
+    assert custom.match("please start the car") is None  # anchored route must start the utterance
+    assert custom.match("start the car").slots == {"thing": "the car"}
+
+    handlers = {"start": lambda m: f"starting {m.slot('thing')}"}
+    assert custom.dispatch("start the car", handlers) == "starting the car"
+    # Best route has no handler on this path, so the default runs
+    assert custom.dispatch("hello there", handlers, default=lambda t: "fallback") == "fallback"
+
+
+def test_complete_routes_for_partials():
+    assert router.match_complete("next song").name == "music.next"
+    assert router.match_complete("stop").name == "stop"
+    assert router.match_complete("next week's weather") is None  # doesn't span the utterance
+    assert router.match_complete("play despacito") is None  # slot routes wait for the endpoint
+
+
+def test_conversation_intents():
+    assert router.match("play some jazz").intent == "music"
+    assert router.match("research black holes").intent == "research"
+    assert router.match("how much does it cost").intent == "price"
+
+
+def test_compound_command_batches_questions():
+    commands = split_commands("Open Chrome and what is the capital of France and who wrote Hamlet")
+    assert commands == ["open chrome", "what is the capital of france", "who wrote hamlet"]
+
+    batches = []
+
+    def answer_all(questions):
+        batches.append(questions)
+        return [f"answer to {q}" for q in questions]
+
+    execute = lambda text: router.dispatch(text, {"app.open": lambda m: f"opened {m.slot('app')}"})
+    responses = run_commands(commands, execute, answer_all)
+    assert batches == [["what is the capital of france", "who wrote hamlet"]]  # one call for both
+    assert responses == ["opened chrome", "answer to what is the capital of france", "answer to who wrote hamlet"]
+
+    assert run_commands(["open chrome"], execute, answer_all) == ["opened chrome"] and len(batches) == 1
+
+
+if __name__ == "__main__":
+    test_aho_corasick_finds_overlapping_keywords()
+    test_routes_and_slots()
+    test_priorities_resolve_conflicts()
+    test_whole_words_only()
+    test_anchor_and_dispatch()
+    test_complete_routes_for_partials()
+    test_conversation_intents()
+    test_compound_command_batches_questions()
+    print("✓ Intent router tests passed")
@@ -0,0 +1,161 @@
+import json
+import os
+import sys
+import tempfile
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "features"))
+
+import keyword_spotter
+from streaming_asr import AudioCapture
+
+try:
+    import wake_word_detection
+except ImportError:  # pyaudio, speech_recognition or plyer missing
+    wake_word_detection = None
+
+VOCABULARY = {"alexa", "jarvis", "hey", "computer"}
+
+
+def frame(word=""):
+    """A 1024-sample chunk tagged with the word the fake recognizer 'hears' in it"""
+    return word.encode().ljust(2048, b"\0")
+
+
+class FakeModel:
+    def __init__(self, path):
+        self.path = path
+
+    def find_word(self, word):
+        return 1 if word in VOCABULARY else -1
+
+
+class FakeKaldiRecognizer:
+    """Vosk stand-in: each chunk carries one word; words outside the grammar decode as [unk]"""
+
+    def __init__(self, model, sample_rate, grammar):
+        self.grammar = json.loads(grammar)
+        self.heard = []
+        self.resets = 0
+
+    def AcceptWaveform(self, chunk):
+        word = chunk.rstrip(b"\0").decode()
+        if word == "<silence>":
+            return True  # endpoint: the segment is final
+        if word:
+            self.heard.append(word if word in self.grammar[0].split() else "[unk]")
+        return False
+
+    def _text(self):
+        return " ".join(self.heard)
+
+    def Result(self):
+        text, self.heard = self._text(), []
+        return json.dumps({"text": text})
+
+    def PartialResult(self):
+        return json.dumps({"partial": self._text()})
+
+    def Reset(self):
+        self.heard = []
+        self.resets += 1
+
+
+def make_spotter(keyword="alexa"):
+    keyword_spotter.Model = FakeModel
+    keyword_spotter.KaldiRecognizer = FakeKaldiRecognizer
+    model_dir = tempfile.mkdtemp()
+    return keyword_spotter.KeywordSpotter(keyword, model_path=model_dir)
+
+
+def test_detects_keyword_from_partials():
+    spotter = make_spotter()
+    assert spotter.recognizer.grammar == ["alexa", "[unk]"]
+    assert [spotter.process(frame(word)) for word in ["", "music", "alexa"]] == [False, False, True]
+    stats = spotter.stats()
+    assert stats["detections"] == 1 and stats["chunks"] == 3
+    assert stats["audio_seconds"] == round(3 * 1024 / 16000, 2)
+
+    # Two-word keywords, and a keyword finalized at an endpoint
+    spotter = make_spotter("hey jarvis")
+    assert not spotter.process(frame("hey"))
+    assert spotter.process(frame("jarvis"))
+
+
+def test_resets_after_a_hit():
+    spotter = make_spotter()
+    assert spotter.process(frame("alexa"))
+    assert spotter.recognizer.resets == 1
+    # The same utterance must not fire again on the next chunks
+    assert not spotter.process(frame())
+    assert not spotter.process(frame("<silence>"))
+    assert spotter.process(frame("alexa"))
+    assert spotter.stats()["detections"] == 2
+
+
+def test_rejects_keywords_outside_the_vocabulary():
+    spotter = make_spotter()
+    try:
+        spotter.set_keyword("hey siri")
+        assert False, "expected ValueError"
+    except ValueError as e:
+        assert "siri" in str(e)
+    assert spotter.keyword == "alexa" and spotter.recognizer.grammar == ["alexa", "[unk]"]
+
+    spotter.set_keyword(" Computer ")
+    assert spotter.keyword == "computer"
+    assert not spotter.process(frame("alexa"))  # decodes as [unk] under the new grammar
+    assert spotter.process(frame("computer"))
+
+
+def make_detector(capture):
+    detector = wake_word_detection.WakeWordDetection.__new__(wake_word_detection.WakeWordDetection)
+    detector.capture = capture
+    detector.capture_cursor = None
+    detector.chunk_size = 1024
+    detector.listen_window = 0.2
+    detector.wake_word = "alexa"
+    detector.spotter = make_spotter()
+    detector.tts_service = None
+    detector.notified = []
+    detector.notify_wake_word = detector.notified.append
+    return detector
+
+
+def test_windows_skip_stale_audio():
+    if wake_word_detection is None:
+        print("wake word dependencies not installed, skipping capture ring test")
+        return
+    capture = AudioCapture(ring_seconds=5)
+    detector = make_detector(capture)
+
+    # Audio buffered before listening started (e.g. during a reply) is dropped
+    capture.feed(frame("alexa"))
+    assert detector.listen_for_wake_word() is False
+    assert detector.notified == []
+
+    for word in ["music", "alexa"]:
+        capture.feed(frame(word))
+    assert detector.listen_for_wake_word() is True
+    assert detector.notified == ["alexa"]
+
+    # Falling more than a window behind jumps to the newest audio
+    for _ in range(detector._window_chunks() + 2):
+        capture.feed(frame("alexa"))
+    resets = detector.spotter.recognizer.resets
+    detector._drain_stale_audio()
+    assert detector.capture_cursor == capture.ring.cursor()
+    assert detector.spotter.recognizer.resets == resets + 1
+
+    # Within a window, nothing is skipped
+    capture.feed(frame("music"))
+    capture.feed(frame("jazz"))
+    detector._drain_stale_audio()
+    assert [chunk.rstrip(b"\0") for chunk in detector._read_window()] == [b"music", b"jazz"]
+
+
+if __name__ == "__main__":
+    test_detects_keyword_from_partials()
+    test_resets_after_a_hit()
+    test_rejects_keywords_outside_the_vocabulary()
+    test_windows_skip_stale_audio()
+    print("✓ Keyword spotter tests passed")
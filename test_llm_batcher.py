@@ -0,0 +1,68 @@
+import json
+import os
+import sys
+import threading
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "features"))
+
+from llm_batcher import LLMBatcher, build_batch_prompt, parse_batch_answers
+
+
+def answer_all(prompt):
+    questions = [line.split(". ", 1)[1] for line in prompt.splitlines() if line[:1].isdigit()]
+    return json.dumps([f"A: {q}" for q in questions])
+
+
+def test_questions_share_one_request():
+    sent, single = [], []
+    batcher = LLMBatcher(lambda p: sent.append(p) or answer_all(p), lambda q: single.append(q) or q)
+    assert batcher.ask_many(["capital of france", "two plus two", "who wrote hamlet"]) == [
+        "A: capital of france", "A: two plus two", "A: who wrote hamlet"]
+    assert len(sent) == 1 and not single
+    assert batcher.stats()["requests_saved"] == 2
+
+    # Callers on different threads within the window are batched too
+    results = {}
+    threads = [threading.Thread(target=lambda q=q: results.update({q: batcher.ask(q)})) for q in "xyz"]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert results == {"x": "A: x", "y": "A: y", "z": "A: z"} and len(sent) == 2
+
+
+def test_single_question_and_bad_reply_fall_back():
+    single = []
+    batcher = LLMBatcher(lambda p: "Sorry, I can only answer one thing.", lambda q: single.append(q) or f"one: {q}")
+    assert batcher.ask("hello") == "one: hello"
+    assert batcher.ask_many(["a", "b"]) == ["one: a", "one: b"]
+    assert single == ["hello", "a", "b"]
+    assert batcher.stats()["fallbacks"] == 1
+
+
+def test_send_errors_reach_every_caller():
+    def fail(prompt):
+        raise ConnectionError("offline")
+
+    batcher = LLMBatcher(fail, lambda q: q)
+    futures = [batcher.submit(q) for q in ("a", "b")]
+    for future in futures:
+        assert isinstance(future.exception(1), ConnectionError)
+
+
+def test_parse_batch_answers():
+    assert parse_batch_answers('```json\n["1", 2]\n```', 2) == ["1", "2"]
+    try:
+        parse_batch_answers('["only one"]', 2)
+        assert False, "expected ValueError"
+    except ValueError:
+        pass
+    assert "2. b" in build_batch_prompt(["a", "b"])
+
+
+if __name__ == "__main__":
+    test_questions_share_one_request()
+    test_single_question_and_bad_reply_fall_back()
+    test_send_errors_reach_every_caller()
+    test_parse_batch_answers()
+    print("✓ LLM batcher tests passed")
@@ -0,0 +1,91 @@
+import os
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "features"))
+
+from llm_cache import LLMCache, POLICIES, resolve_policy, topic_policy
+
+
+def test_lru_by_entries_and_bytes():
+    cache = LLMCache(max_entries=2)
+    cache.put("a", "1")
+    cache.put("b", "2")
+    assert cache.get("a") == "1"  # "a" is now most recent
+    cache.put("c", "3")
+    assert cache.get("b") is None
+    assert cache.get("a") == "1" and cache.get("c") == "3"
+
+    small = LLMCache(max_bytes=200)
+    small.put("first", "x" * 100)
+    small.put("second", "y" * 100)
+    assert len(small) == 1 and small.bytes <= 200
+    assert small.stats()["evictions"] == 1
+
+
+def test_ttl_and_policies():
+    cache = LLMCache()
+    cache.put("explain recursion", "answer", policy="default")
+    key = cache.make_key("explain recursion")
+    value, _, size = cache.entries[key]
+    cache.entries[key] = (value, time.time() - 1, size)  # expire it
+    assert cache.get("explain recursion") is None
+    assert cache.stats()["expired"] == 1
+
+    assert resolve_policy("what's the weather today").name == "never"
+    assert resolve_policy("history of rome", "research").ttl == POLICIES["research"].ttl
+    cache.put("latest news", "headline")
+    assert cache.get("latest news") is None
+    assert cache.stats()["bypassed"] == 1
+
+
+def test_time_sensitivity_is_judged_on_the_question():
+    for question in ["explain the rate of change", "what is the current in a circuit", "how do live wires work",
+                     "what time complexity does quicksort have", "history of the stock exchange"]:
+        assert resolve_policy(question).name == "default", question
+    for question in ["what's the weather today", "latest iphone news", "what time is it in tokyo",
+                     "price of bitcoin", "live score of the match"]:
+        assert resolve_policy(question).name == "never", question
+
+    # The research template asks for "current developments"; only the topic decides
+    prompt = ("Provide a comprehensive research report on: history of rome\n"
+              "4. Key Findings\n   - Current developments\n5. Detailed Analysis\n   - Current state")
+    assert resolve_policy(prompt, topic_policy("history of rome", "research")).name == "research"
+    live = resolve_policy(prompt, topic_policy("latest ai news", "research"))
+    assert str(live) == "research" and not live.cacheable
+    cache = LLMCache()
+    cache.put(prompt, "report", policy=topic_policy("history of rome", "research"))
+    assert cache.get(prompt, policy="research") == "report"
+
+
+def test_config_is_part_of_the_key():
+    cache = LLMCache()
+    cache.put("hi", "long answer", config={"max_output_tokens": 1024})
+    assert cache.get("hi", config={"max_output_tokens": 50}) is None
+    assert cache.get("  HI ", config={"max_output_tokens": 1024}) == "long answer"
+
+
+def test_persistent_tier():
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "llm.sqlite3")
+        cache = LLMCache(db_path=path)
+        cache.put("capital of france", "Paris", policy="research")
+        cache.db.close()
+
+        reopened = LLMCache(db_path=path)
+        assert reopened.get("capital of france", policy="research") == "Paris"
+        assert reopened.get("capital of france", policy="research") == "Paris"
+        stats = reopened.stats()
+        assert (stats["disk_hits"], stats["memory_hits"]) == (1, 1)
+        reopened.trim()
+        reopened.db.close()
+
+
+if __name__ == "__main__":
+    test_lru_by_entries_and_bytes()
+    test_ttl_and_policies()
+    test_time_sensitivity_is_judged_on_the_question()
+    test_config_is_part_of_the_key()
+    test_persistent_tier()
+    print("✓ LLM cache tests passed")
@@ -0,0 +1,130 @@
+import os
+import sys
+import threading
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "features"))
+
+from llm_client import LLMCancelled, LLMClient, LLMTimeout
+
+
+def test_hedged_request_wins_over_slow_primary():
+    client = LLMClient(hedge_default=0.1)
+    calls = []
+
+    def slow_first():
+        calls.append(1)
+        if len(calls) == 1:
+            time.sleep(1)
+            return "slow"
+        return "fast"
+
+    started = time.perf_counter()
+    assert client.call(slow_first) == "fast"
+    assert time.perf_counter() - started < 0.8
+    assert (client.counters["hedges"], client.counters["hedge_wins"]) == (1, 1)
+
+    client.call(lambda: "quick", hedge=False)
+    assert client.counters["hedges"] == 1  # hedge=False never duplicates
+
+
+def test_retries_with_backoff_and_non_retryable_errors():
+    client = LLMClient(backoff=0.01)
+    attempts = []
+
+    def flaky():
+        attempts.append(1)
+        if len(attempts) < 3:
+            raise ConnectionError("reset")
+        return "ok"
+
+    assert client.call(flaky, hedge=False) == "ok"
+    assert client.counters["retries"] == 2
+
+    def bad_request():
+        attempts.append(1)
+        raise ValueError("invalid argument")
+
+    attempts.clear()
+    try:
+        client.call(bad_request, hedge=False)
+        assert False, "expected ValueError"
+    except ValueError:
+        pass
+    assert len(attempts) == 1
+
+
+def test_deadline_and_cancellation():
+    client = LLMClient()
+    try:
+        client.call(time.sleep, 2, deadline=0.2, hedge=False)
+        assert False, "expected LLMTimeout"
+    except LLMTimeout:
+        pass
+
+    threading.Timer(0.1, client.cancel_all).start()
+    started = time.perf_counter()
+    try:
+        client.call(time.sleep, 2, hedge=False)
+        assert False, "expected LLMCancelled"
+    except LLMCancelled:
+        pass
+    assert time.perf_counter() - started < 1
+
+
+def test_stream():
+    client = LLMClient()
+    assert list(client.stream(lambda: iter(["a", "b"]))) == ["a", "b"]
+
+
+def test_map_keeps_order_and_isolates_failures():
+    client = LLMClient(requests_per_minute=6000)
+    active, peak = [0], [0]
+    lock = threading.Lock()
+
+    def query(n):
+        with lock:
+            active[0] += 1
+            peak[0] = max(peak[0], active[0])
+        try:
+            time.sleep(0.05 * (5 - n))  # later items finish first
+            if n == 2:
+                raise ConnectionError("boom")
+            return client.call(lambda: f"answer {n}", hedge=False)
+        finally:
+            with lock:
+                active[0] -= 1
+
+    results = client.map(query, range(5), max_workers=3, on_error=lambda n, e: f"failed {n}")
+    assert results == ["answer 0", "answer 1", "failed 2", "answer 3", "answer 4"]
+    assert peak[0] <= 3
+
+
+def test_rate_limiter_spaces_requests():
+    client = LLMClient(requests_per_minute=600)  # 10/s after a burst of 5
+    started = time.perf_counter()
+    for _ in range(7):
+        client.call(lambda: None, hedge=False)
+    assert time.perf_counter() - started >= 0.15
+    assert client.stats()["rate_limited"] >= 1
+
+
+def test_rate_is_read_from_the_environment_on_first_use():
+    client = LLMClient()  # created before the environment is set, as at import
+    os.environ["GEMINI_RPM"] = "6"
+    try:
+        client.call(lambda: None, hedge=False)
+    finally:
+        del os.environ["GEMINI_RPM"]
+    assert client.limiter.rate == 0.1
+
+
+if __name__ == "__main__":
+    test_hedged_request_wins_over_slow_primary()
+    test_retries_with_backoff_and_non_retryable_errors()
+    test_deadline_and_cancellation()
+    test_stream()
+    test_map_keeps_order_and_isolates_failures()
+    test_rate_limiter_spaces_requests()
+    test_rate_is_read_from_the_environment_on_first_use()
+    print("✓ LLM client tests passed")
@@ -0,0 +1,144 @@
+import json
+import os
+import sys
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "features"))
+
+from local_llm import LocalLLMError, ModelRouter, OllamaClient, ollama_options
+
+
+class FakeOllama(BaseHTTPRequestHandler):
+    """Stand-in for /api/generate that streams NDJSON like Ollama"""
+    protocol_version = "HTTP/1.1"
+    delay = 0.0
+    requests_seen = []
+
+    def do_POST(self):
+        payload = json.loads(self.rfile.read(int(self.headers["Content-Length"])))
+        FakeOllama.requests_seen.append((self.client_address[1], payload))
+        time.sleep(FakeOllama.delay)
+        lines = [{"response": word + " ", "done": False} for word in ["local", "answer"]]
+        lines.append({"response": "", "done": True})
+        body = "".join(json.dumps(line) + "\n" for line in lines).encode()
+        self.send_response(200)
+        self.send_header("Content-Type", "application/x-ndjson")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        try:
+            self.wfile.write(body)
+        except BrokenPipeError:
+            pass  # the client gave up waiting
+
+    def log_message(self, *args):
+        pass
+
+
+def start_server():
+    server = ThreadingHTTPServer(("127.0.0.1", 0), FakeOllama)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server, f"http://127.0.0.1:{server.server_port}"
+
+
+def stop_server(server):
+    server.shutdown()
+    server.server_close()
+
+
+def test_streaming_and_pooled_connection():
+    server, url = start_server()
+    try:
+        FakeOllama.requests_seen.clear()
+        client = OllamaClient(base_url=url, model="mistral")
+        assert list(client.stream("hi", {"temperature": 0.2})) == ["local ", "answer "]
+        assert client.generate("hi again") == "local answer"
+        ports = {port for port, _ in FakeOllama.requests_seen}
+        assert len(ports) == 1  # keep-alive: both requests reused one connection
+        assert FakeOllama.requests_seen[0][1]["options"] == {"temperature": 0.2}
+    finally:
+        stop_server(server)
+
+
+def test_router_prefers_local_for_short_prompts():
+    server, url = start_server()
+    try:
+        FakeOllama.delay = 0.0
+        router = ModelRouter(OllamaClient(base_url=url))
+        remote_calls = []
+        remote = lambda: remote_calls.append(1) or "gemini answer"
+        assert router.generate("what is the capital of peru", remote) == "local answer"
+        assert router.generate("write an essay about peru", remote) == "gemini answer"
+        assert router.generate("hi", remote, long_form=True) == "gemini answer"
+        assert len(remote_calls) == 2
+    finally:
+        stop_server(server)
+
+
+def test_fallback_when_local_is_slow_or_down():
+    server, url = start_server()
+    try:
+        FakeOllama.delay = 1.0
+        router = ModelRouter(OllamaClient(base_url=url, read_timeout=0.2))
+        assert router.generate("hello there", lambda: "gemini answer") == "gemini answer"
+        assert router.counters["local_fallbacks"] == 1
+    finally:
+        FakeOllama.delay = 0.0
+        stop_server(server)
+
+    down = OllamaClient(base_url=url)  # server is gone
+    router = ModelRouter(down)
+    assert router.generate("hello there", lambda: "gemini answer") == "gemini answer"
+    assert not down.available()  # marked down, so the next call skips it
+    try:
+        down.generate("hello")
+        assert False, "expected LocalLLMError"
+    except LocalLLMError:
+        pass
+
+
+def test_remote_failure_falls_back_to_local():
+    server, url = start_server()
+    try:
+        router = ModelRouter(OllamaClient(base_url=url))
+
+        def gemini_down():
+            raise ConnectionError("no network")
+
+        assert router.generate("write a report", gemini_down) == "local answer"
+        assert "".join(router.stream("write a report", gemini_down)) == "local answer "
+        assert router.counters["remote_fallbacks"] == 2
+    finally:
+        stop_server(server)
+
+
+def test_local_tier_is_opt_in():
+    client = OllamaClient(base_url="")
+    assert not client.available()
+    router = ModelRouter(client)
+    assert router.generate("hello there", lambda: "gemini answer") == "gemini answer"
+    assert client.counters["requests"] == 0  # nothing was probed
+
+    # Settings are read when the client is created, after .env has been loaded
+    os.environ["OLLAMA_URL"] = "http://127.0.0.1:11434/"
+    try:
+        assert OllamaClient().base_url == "http://127.0.0.1:11434"
+    finally:
+        del os.environ["OLLAMA_URL"]
+    assert OllamaClient().base_url == ""
+
+
+def test_ollama_options():
+    config = {"temperature": 0.9, "max_output_tokens": 1024, "stop_sequences": ["."], "candidate_count": 1}
+    assert ollama_options(config) == {"temperature": 0.9, "num_predict": 1024, "stop": ["."]}
+
+
+if __name__ == "__main__":
+    test_streaming_and_pooled_connection()
+    test_router_prefers_local_for_short_prompts()
+    test_fallback_when_local_is_slow_or_down()
+    test_remote_failure_falls_back_to_local()
+    test_local_tier_is_opt_in()
+    test_ollama_options()
+    print("✓ Local LLM tests passed")
@@ -0,0 +1,76 @@
+import os
+import sys
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "features"))
+
+from semantic_cache import SemanticCache
+from text_normalize import normalize_text
+
+
+def test_normalization():
+    assert normalize_text("Um, what's the capital of France?") == "what is the capital of france"
+    assert normalize_text("whats twenty one plus one hundred and five") == "what is 21 plus 105"
+    assert normalize_text("so I don't know") == "i do not know"
+    assert normalize_text("seven thousand two hundred") == "7200"
+
+
+def test_near_duplicates_hit():
+    cache = SemanticCache()
+    cache.put("what is the capital of france", "Paris")
+    assert cache.get("Um, what's the capital of France?") == "Paris"
+    assert cache.get("can you tell me what the capital of france is") == "Paris"
+    assert cache.get("what is the capital of germany") is None
+    stats = cache.stats()
+    assert (stats["hits"], stats["misses"]) == (2, 1)
+    for _ in range(300):
+        cache.get("what's the capital of france")
+    assert len(cache.similarities) == 200  # only recent hits are kept for the average
+
+
+def test_guards():
+    cache = SemanticCache()
+    cache.put("what is two plus three", "5")
+    assert cache.get("what is two plus four") is None  # numbers must match
+    assert cache.get("whats 2 plus 3") == "5"
+    assert cache.get("what is two plus three", config={"max_output_tokens": 50}) is None
+
+    cache.put("weather today in delhi", "Sunny")  # time-sensitive: never stored
+    assert cache.get("weather today in delhi") is None
+    long_prompt = "write a detailed report on " + " ".join(["topic"] * 40)
+    cache.put(long_prompt, "report")
+    assert cache.get(long_prompt) is None
+    assert cache.stats()["skipped"] == 2
+
+
+def test_different_subjects_miss():
+    cache = SemanticCache()
+    cache.put("is it safe to eat raw salmon", "Yes, if it is sushi grade")
+    cache.put("how many calories are in a banana", "About 105")
+    cache.put("who wrote the book dune", "Frank Herbert")
+    assert cache.get("is it safe to eat raw chicken") is None
+    assert cache.get("is it not safe to eat raw salmon") is None
+    assert cache.get("how many calories are in an apple") is None
+    assert cache.get("how many calories are in a banana bread") is None
+    assert cache.get("who wrote the book emma") is None
+    assert cache.get("when was the book dune written") is None
+    assert cache.get("tell me who wrote the book dune") == "Frank Herbert"
+
+
+def test_threshold_is_configurable():
+    strict = SemanticCache(threshold=1.0)
+    strict.put("what is the capital of france", "Paris")
+    assert strict.get("what is the capital city of france") is None
+    assert strict.get("what's the capital of france") == "Paris"
+    assert strict.get("can you tell me the capital of france") == "Paris"
+    cache = SemanticCache()
+    cache.put("dog bites man", "news")
+    assert cache.get("man bites dog") is None  # same words, different order
+
+
+if __name__ == "__main__":
+    test_normalization()
+    test_near_duplicates_hit()
+    test_guards()
+    test_different_subjects_miss()
+    test_threshold_is_configurable()
+    print("✓ Semantic cache tests passed")
@@ -0,0 +1,96 @@
+import os
+import sys
+import threading
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "features"))
+
+from service_registry import ServiceRegistry
+
+
+def test_services_are_created_once_on_first_use():
+    registry = ServiceRegistry()
+    calls = []
+    registry.register("clock", lambda r: calls.append("clock") or object())
+
+    assert not registry.is_created("clock")
+    first = registry.get("clock")
+    assert registry.get("clock") is first
+    assert calls == ["clock"]
+
+
+def test_dependencies_and_lazy_proxy():
+    registry = ServiceRegistry()
+
+    class Speaker:
+        def __init__(self):
+            self.volume = 5
+
+    registry.register("speaker", lambda r: Speaker())
+    registry.register("player", lambda r: ("player", r.get("speaker")))
+
+    proxy = registry.lazy("speaker")
+    assert not proxy  # truthiness must not build the service
+    assert not registry.is_created("speaker")
+
+    assert registry.get("player")[1] is registry.get("speaker")
+    assert proxy.volume == 5
+    proxy.volume = 7
+    assert registry.get("speaker").volume == 7
+
+
+def test_concurrent_get_shares_one_instance():
+    registry = ServiceRegistry()
+    created = []
+
+    def slow_factory(r):
+        time.sleep(0.05)
+        created.append(1)
+        return object()
+
+    registry.register("slow", slow_factory)
+    results = []
+    threads = [threading.Thread(target=lambda: results.append(registry.get("slow"))) for _ in range(5)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert len(created) == 1
+    assert all(result is results[0] for result in results)
+
+
+def test_circular_dependency_is_reported():
+    registry = ServiceRegistry()
+    registry.register("a", lambda r: r.get("b"))
+    registry.register("b", lambda r: r.get("a"))
+    try:
+        registry.get("a")
+    except RuntimeError as e:
+        assert "a -> b -> a" in str(e)
+    else:
+        raise AssertionError("expected a circular dependency error")
+
+
+def test_startup_report_lists_costs():
+    registry = ServiceRegistry()
+    seen = []
+    registry.listeners.append(lambda name, seconds: seen.append(name))
+    registry.register("fast", lambda r: 1)
+    registry.register("unused", lambda r: 2)
+    registry.get("fast")
+
+    report = registry.startup_report()
+    assert "fast" in report
+    assert "not created: unused" in report
+    assert seen == ["fast"]
+    assert list(registry.startup_cost()) == ["fast"]
+
+
+if __name__ == "__main__":
+    test_services_are_created_once_on_first_use()
+    test_dependencies_and_lazy_proxy()
+    test_concurrent_get_shares_one_instance()
+    test_circular_dependency_is_reported()
+    test_startup_report_lists_costs()
+    print("✓ Service registry tests passed")
@@ -0,0 +1,61 @@
+import os
+import sys
+import threading
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "features"))
+
+from single_flight import SingleFlight, fingerprint
+
+
+def run_concurrently(count, target):
+    results = [None] * count
+    threads = [threading.Thread(target=lambda i=i: results.__setitem__(i, target())) for i in range(count)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    return results
+
+
+def test_concurrent_identical_calls_run_once():
+    flight = SingleFlight()
+    calls = []
+
+    def slow_query():
+        calls.append(1)
+        time.sleep(0.2)
+        return "answer"
+
+    results = run_concurrently(5, lambda: flight.do("capital of peru", slow_query))
+    assert results == ["answer"] * 5 and len(calls) == 1
+    assert flight.stats() == {"calls": 5, "shared": 4, "in_flight": 0}
+
+    # Not a cache: a later call runs again
+    assert flight.do("capital of peru", slow_query) == "answer" and len(calls) == 2
+
+
+def test_errors_reach_waiting_callers_and_keys_are_separate():
+    flight = SingleFlight()
+
+    def fail():
+        time.sleep(0.1)
+        raise ConnectionError("offline")
+
+    def call():
+        try:
+            return flight.do("k", fail)
+        except ConnectionError as e:
+            return str(e)
+
+    assert run_concurrently(3, call) == ["offline"] * 3
+    assert flight.in_flight() == 0
+
+    assert flight.do("a", lambda: 1) == 1 and flight.do("b", lambda: 2) == 2
+    assert fingerprint("q", "x", {"a": 1}) == fingerprint("q", "x", {"a": 1}) != fingerprint("q", "y")
+
+
+if __name__ == "__main__":
+    test_concurrent_identical_calls_run_once()
+    test_errors_reach_waiting_callers_and_keys_are_separate()
+    print("✓ Single-flight tests passed")
@@ -0,0 +1,70 @@
+import os
+import sys
+import threading
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "features"))
+
+from speculative_prefetch import SpeculativePrefetcher, predict_followups
+
+
+def wait_for(condition, timeout=1.0):
+    deadline = time.time() + timeout
+    while not condition() and time.time() < deadline:
+        time.sleep(0.01)
+
+
+def test_predictions():
+    predictions = predict_followups("Lima is the capital of Peru. It lies near the Andes.", "travel")
+    assert predictions == ["tell me more", "what about andes", "tell me more about travel"]
+    assert predict_followups("Sure thing!", limit=3) == ["tell me more", "give me an example"]
+
+
+def test_prefetched_answer_is_served_once():
+    fetched = []
+    prefetcher = SpeculativePrefetcher(lambda prompt: fetched.append(prompt) or f"answer to {prompt}")
+    prefetcher.speculate("Lima is the capital of Peru.")
+    wait_for(lambda: prefetcher.stats()["fetched"] == 3)
+
+    assert prefetcher.take("Go on") == "answer to tell me more"  # a "tell me more" variant
+    assert prefetcher.take("What about the Peru?") == "answer to what about peru"
+    assert prefetcher.take("tell me more") is None  # already used
+    assert prefetcher.take("play some jazz") is None
+    stats = prefetcher.stats()
+    assert (stats["hits"], stats["misses"]) == (2, 2)
+
+    # The next round retires the unused answer as wasted
+    prefetcher.speculate("Okay.")
+    stats = prefetcher.stats()
+    assert stats["wasted"] == 1 and stats["wasted_tokens"] > 0
+
+
+def test_cancel_drops_unstarted_and_can_run_gates():
+    release = threading.Event()
+    started = []
+
+    def slow(prompt):
+        started.append(prompt)
+        release.wait(1)
+        return "slow answer"
+
+    prefetcher = SpeculativePrefetcher(slow)
+    prefetcher.speculate("Lima is the capital of Peru.")
+    wait_for(lambda: started)
+    prefetcher.cancel()  # the user started speaking
+    release.set()
+    assert prefetcher.take("tell me more") == "slow answer"  # the running one is still usable
+    time.sleep(0.1)
+    assert started == ["tell me more"] and prefetcher.stats()["cancelled"] == 2
+
+    gated = SpeculativePrefetcher(lambda prompt: "x", can_run=lambda: False)
+    gated.speculate("Fine.")
+    wait_for(lambda: gated.stats()["skipped"] == 2)
+    assert gated.take("tell me more") is None and gated.stats()["fetched"] == 0
+
+
+if __name__ == "__main__":
+    test_predictions()
+    test_prefetched_answer_is_served_once()
+    test_cancel_drops_unstarted_and_can_run_gates()
+    print("✓ Speculative prefetch tests passed")
@@ -0,0 +1,62 @@
+import json
+import os
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "features"))
+
+from startup_profiler import StartupProfiler
+from service_registry import ServiceRegistry
+
+
+def test_nested_spans_report_self_time():
+    profiler = StartupProfiler()
+    with profiler.span("outer"):
+        time.sleep(0.02)
+        with profiler.span("inner"):
+            time.sleep(0.03)
+
+    records = {r["name"]: r for r in profiler.records}
+    assert records["outer"]["duration"] >= records["inner"]["duration"]
+    assert records["outer"]["self"] < records["outer"]["duration"]
+    assert profiler.sorted_records()[0]["name"] == "inner"
+    assert profiler.check_budget(total_budget=10) == []
+    assert profiler.check_budget(total_budget=0.001)
+
+
+def test_import_hook_and_service_tracer():
+    profiler = StartupProfiler()
+    registry = ServiceRegistry()
+    registry.tracer = profiler.trace_service
+
+    with tempfile.TemporaryDirectory() as tmp:
+        with open(os.path.join(tmp, "vani_profiled_module.py"), "w") as f:
+            f.write("class Fake:\n    pass\n")
+        sys.path.insert(0, tmp)
+        profiler.install_import_hook()
+        try:
+            registry.register_class("fake", "vani_profiled_module", "Fake")
+            registry.get("fake")
+            import vani_profiled_module  # noqa: F401  (already cached, not recorded twice)
+        finally:
+            profiler.remove_import_hook()
+            sys.path.remove(tmp)
+            sys.modules.pop("vani_profiled_module", None)
+
+        kinds = [(r["kind"], r["name"]) for r in profiler.records]
+        assert ("service", "fake") in kinds
+        assert kinds.count(("import", "vani_profiled_module")) == 1
+
+        report_path, trace_path = profiler.write(tmp)
+        with open(trace_path) as f:
+            trace = json.load(f)
+        assert {event["ph"] for event in trace["traceEvents"]} == {"X"}
+        with open(report_path, encoding="utf-8") as f:
+            assert "vani_profiled_module" in f.read()
+
+
+if __name__ == "__main__":
+    test_nested_spans_report_self_time()
+    test_import_hook_and_service_tracer()
+    print("✓ Startup profiler tests passed")
@@ -0,0 +1,114 @@
+import json
+import math
+import os
+import sys
+import threading
+from array import array
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "features"))
+
+from streaming_asr import AudioCapture, AudioRingBuffer, EnergyVAD, StreamingListener, chunk_rms
+
+
+def tone(amplitude, samples=1024):
+    return array("h", (int(amplitude * math.sin(i / 5)) for i in range(samples))).tobytes()
+
+
+def test_chunk_rms():
+    assert chunk_rms(b"") == 0.0
+    assert chunk_rms(array("h", [100] * 64).tobytes()) == 100.0
+
+
+def test_vad_learns_and_tracks_noise_floor():
+    vad = EnergyVAD(warmup_frames=4)
+    assert not any(vad.observe(50.0) for _ in range(4))  # warm-up never reports speech
+    assert vad.noise_floor == 50.0
+    assert vad.observe(1000.0)  # loud frame is speech and does not move the floor
+    assert vad.noise_floor == 50.0
+
+    for _ in range(100):  # room gets noisier: floor follows without re-calibration
+        vad.observe(100.0)
+    assert 95.0 < vad.noise_floor <= 100.0
+    assert not vad.observe(200.0)
+    assert vad.observe(400.0)
+
+
+def test_ring_buffer_readers_and_overwrite():
+    ring = AudioRingBuffer(capacity=3)
+    for i in range(5):
+        ring.append(bytes([i]), 0.0, False)
+
+    frames, cursor = ring.read(0)  # Cursor fell behind: resume at the oldest frame kept
+    assert [f[0] for f in frames] == [2, 3, 4]
+    assert cursor == 5
+    assert ring.cursor(back=1) == 4
+    assert ring.cursor(back=10) == 2
+
+    result = []
+    reader = threading.Thread(target=lambda: result.append(ring.read(cursor, timeout=2)))
+    reader.start()
+    ring.append(b"x", 0.0, True)
+    reader.join()
+    assert [f[1] for f in result[0][0]] == [b"x"]
+
+
+def test_capture_marks_speech_frames():
+    capture = AudioCapture(ring_seconds=5)
+    for _ in range(10):
+        capture.feed(tone(100))
+    capture.feed(tone(5000))
+    frames, _ = capture.ring.read(0)
+    assert [f[3] for f in frames] == [False] * 10 + [True]
+
+
+class FakeRecognizer:
+    """Vosk stand-in: finalizes a first segment mid-utterance, then hears one more word"""
+
+    def __init__(self):
+        self.chunks = 0
+
+    def AcceptWaveform(self, chunk):
+        self.chunks += 1
+        return self.chunks == 4
+
+    def Result(self):
+        return json.dumps({"text": "play some"})
+
+    def PartialResult(self):
+        return json.dumps({"partial": "jazz" if self.chunks > 4 else "play some"})
+
+    def FinalResult(self):
+        return json.dumps({"text": "jazz"})
+
+
+class FakeListener(StreamingListener):
+    def __init__(self, capture):
+        self.capture = capture
+        self.preroll_frames = 50  # reach back over every frame fed before listen()
+        self.hangover_frames = 3
+        self.start_frames = 2
+        self.stable_updates = 3
+        self.speech_ended_at = None
+
+    def _recognizer(self):
+        return FakeRecognizer()
+
+
+def test_listener_keeps_segments_and_marks_speech_end():
+    capture = AudioCapture(ring_seconds=5)
+    for amplitude in [100] * 10 + [5000] * 8 + [100] * 4:
+        capture.feed(tone(amplitude))
+    listener = FakeListener(capture)
+    partials = []
+    assert listener.listen(timeout=1, on_partial=lambda p: partials.append(p) and False) == "play some jazz"
+    assert "play some jazz" in partials
+    assert listener.speech_ended_at is not None
+
+
+if __name__ == "__main__":
+    test_chunk_rms()
+    test_vad_learns_and_tracks_noise_floor()
+    test_ring_buffer_readers_and_overwrite()
+    test_capture_marks_speech_frames()
+    test_listener_keeps_segments_and_marks_speech_end()
+    print("✓ Streaming ASR tests passed")
@@ -0,0 +1,67 @@
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "features"))
+
+from text_stream import SentenceChunker, prefetch, split_sentences, stream_paragraphs, stream_sentences
+
+
+def test_split_sentences():
+    text = 'Hello there! I am Dr. Smith. Version 3.5 is out.\n- item one\n- item two'
+    assert split_sentences(text) == ["Hello there!", "I am Dr. Smith.", "Version 3.5 is out.", "item one", "item two"]
+    assert split_sentences('Really? "Yes." Okay') == ["Really?", '"Yes."', "Okay"]
+    assert split_sentences("") == []
+
+
+def test_long_sentences_break_at_clauses():
+    sentence = ", ".join(["word " * 10] * 10).strip()
+    parts = split_sentences(sentence, max_chars=120)
+    assert len(parts) > 1
+    assert all(len(part) <= 120 for part in parts)
+    assert " ".join(parts).split() == sentence.split()
+
+
+def test_sentences_complete_as_chunks_arrive():
+    chunker = SentenceChunker()
+    assert chunker.feed("Hello th") == []
+    assert chunker.feed("ere! I am Dr") == ["Hello there!"]
+    assert chunker.feed(". Smith. Ok") == ["I am Dr. Smith."]  # "Dr." is not a boundary
+    assert chunker.flush() == ["Ok"]
+    assert list(stream_sentences(["One. Two", "! Three"])) == ["One.", "Two!", "Three"]
+
+
+def test_paragraphs_complete_as_chunks_arrive():
+    chunks = ["Title\n", "\nPara one. ", "More.\n\nPara two"]
+    assert list(stream_paragraphs(chunks)) == ["Title", "Para one. More.", "Para two"]
+
+
+def test_prefetch_starts_immediately_and_reraises():
+    started = []
+
+    def produce():
+        started.append(True)
+        yield "a"
+        raise RuntimeError("stream broke")
+
+    items = prefetch(produce())
+    for _ in range(100):
+        if started:
+            break
+        time.sleep(0.01)
+    assert started  # producing began before the first next()
+    assert next(items) == "a"
+    try:
+        next(items)
+        assert False, "producer error was swallowed"
+    except RuntimeError:
+        pass
+
+
+if __name__ == "__main__":
+    test_split_sentences()
+    test_long_sentences_break_at_clauses()
+    test_sentences_complete_as_chunks_arrive()
+    test_paragraphs_complete_as_chunks_arrive()
+    test_prefetch_starts_immediately_and_reraises()
+    print("✓ Text stream tests passed")
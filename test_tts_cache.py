@@ -0,0 +1,67 @@
+import json
+import os
+import sys
+import tempfile
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "features"))
+
+from tts_cache import TTSCache
+from conversation_manager import template_phrases
+
+
+def test_keyed_by_text_voice_and_style():
+    with tempfile.TemporaryDirectory() as tmp:
+        cache = TTSCache(tmp)
+        path = cache.put("Stopped.", "en-IN-NeerjaNeural", "", b"audio-1")
+        assert cache.get("Stopped.", "en-IN-NeerjaNeural", "") == path
+        assert cache.get("Stopped.", "en-US-JennyNeural", "") is None
+        assert cache.get("Stopped.", "en-IN-NeerjaNeural", "style=calm") is None
+        assert ("Stopped.", "en-IN-NeerjaNeural", "") in cache
+        assert cache.stats()["hits"] == 1
+
+        # Index survives a restart; no temp files are left behind
+        reopened = TTSCache(tmp)
+        assert reopened.read("Stopped.", "en-IN-NeerjaNeural", "") == b"audio-1"
+        assert not [name for name in os.listdir(tmp) if name.startswith(".tmp-")]
+
+
+def test_lru_eviction_by_size():
+    with tempfile.TemporaryDirectory() as tmp:
+        cache = TTSCache(tmp, max_bytes=25)
+        cache.put("one", "v", "", b"x" * 10)
+        cache.put("two", "v", "", b"x" * 10)
+        cache.index[cache.key("one", "v")]["last_used"] += 100  # "one" used more recently
+        cache.put("three", "v", "", b"x" * 10)
+
+        assert cache.get("two", "v") is None
+        assert cache.get("one", "v") and cache.get("three", "v")
+        assert cache.total_bytes == 20
+        with open(os.path.join(tmp, "index.json")) as f:
+            assert len(json.load(f)) == 2
+
+        cache.clear()
+        assert cache.stats()["entries"] == 0
+        assert os.listdir(tmp) == ["index.json"]
+
+
+def test_missing_audio_is_a_miss():
+    with tempfile.TemporaryDirectory() as tmp:
+        cache = TTSCache(tmp)
+        path = cache.put("hello", "v", "", b"abc")
+        os.remove(path)
+        assert cache.get("hello", "v") is None
+        assert TTSCache(tmp).stats()["entries"] == 0
+
+
+def test_template_phrases_are_fixed_text():
+    phrases = template_phrases()
+    assert "No worries at all!" in phrases
+    assert not [p for p in phrases if "{" in p]
+
+
+if __name__ == "__main__":
+    test_keyed_by_text_voice_and_style()
+    test_lru_eviction_by_size()
+    test_missing_audio_is_a_miss()
+    test_template_phrases_are_fixed_text()
+    print("✓ TTS cache tests passed")
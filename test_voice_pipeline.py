@@ -0,0 +1,135 @@
+import os
+import sys
+import threading
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "features"))
+
+from intent_router import router
+from service_registry import ServiceRegistry, deferred
+from voice_pipeline import LatencyHistogram, VoicePipeline
+
+
+class FakeSpeech:
+    """TTS stream stand-in: audio 'starts' with the first sentence"""
+
+    opened = []
+
+    def __init__(self):
+        self.sentences = []
+        self.said = 0
+        self.closed = False
+        self.on_first_audio = None
+        FakeSpeech.opened.append(self)
+
+    def say(self, sentence):
+        if not self.sentences and self.on_first_audio:
+            self.on_first_audio(time.monotonic())
+        self.sentences.append(sentence)
+        self.said += 1
+
+    def close(self):
+        self.closed = True
+
+
+def make_pipeline(utterances, converse=None, handlers=None, **kwargs):
+    utterances = list(utterances)
+
+    def listen(on_partial):
+        partials, final = utterances.pop(0)
+        for partial in partials:
+            if on_partial(partial):
+                return partial
+        return final
+
+    FakeSpeech.opened.clear()
+    return VoicePipeline(
+        listen=listen,
+        router=router,
+        handlers=handlers if handlers is not None else {"music.next": lambda m: "Skipping to the next track"},
+        converse=converse or (lambda text, on_sentence=None: "chat"),
+        open_speech=FakeSpeech,
+        **kwargs
+    )
+
+
+def test_command_is_routed_from_a_stable_partial_and_spoken():
+    pipeline = make_pipeline([(["next", "next song"], "next song please")])
+    assert pipeline.run_turn(timeout=2) == "Skipping to the next track"
+    speech = FakeSpeech.opened[0]
+    assert speech.sentences == ["Skipping to the next track"] and speech.closed
+    stats = pipeline.stats()
+    assert stats["end_to_audio.command"]["count"] == 1
+    assert stats["end_to_audio.command"]["p95"] < 1000
+    assert stats["route"]["count"] == 1
+
+
+def test_conversation_streams_sentences_to_speech():
+    def converse(text, on_sentence=None):
+        for sentence in ["Sure.", "Here is more."]:
+            on_sentence(sentence)
+        return "Sure. Here is more."
+
+    pipeline = make_pipeline([([], "tell me about rome")], converse=converse)
+    assert pipeline.run_turn(timeout=2) == "Sure. Here is more."
+    assert FakeSpeech.opened[0].sentences == ["Sure.", "Here is more."]
+    assert pipeline.stats()["end_to_audio.llm"]["count"] == 1
+
+    # Typed or wake-word commands skip the listening stage
+    assert pipeline.run_turn("tell me more", timeout=2) == "Sure. Here is more."
+
+
+def test_quiet_routes():
+    stopped = []
+    pipeline = make_pipeline([], handlers={"stop": lambda m: stopped.append(1) or "Stopped"},
+                             quiet_routes=["stop"])
+    assert pipeline.run_turn("stop", timeout=2) == "Stopped"
+    assert stopped and not FakeSpeech.opened  # the handler speaks for itself
+
+
+def test_interrupt_from_another_thread():
+    release = threading.Event()
+    paths = []
+    pipeline = make_pipeline([], converse=lambda text, on_sentence=None: release.wait(2) and "late",
+                             cancel=release.set, on_respond=paths.append)
+    # Nothing to interrupt between turns or during a command
+    assert pipeline.interrupt() is False
+    threading.Timer(0.1, pipeline.interrupt).start()
+    started = time.monotonic()
+    assert pipeline.run_turn("explain quantum physics", timeout=5) is None
+    assert time.monotonic() - started < 1
+    assert paths == ["llm"] and pipeline.consume_interrupt() and not pipeline.consume_interrupt()
+
+
+def test_histogram():
+    histogram = LatencyHistogram()
+    for ms in (40, 120, 120, 900, 6000):
+        histogram.record(ms)
+    summary = histogram.summary()
+    assert summary["count"] == 5 and summary["p50"] == 120
+    assert summary["buckets"] == {"<=50": 1, "<=200": 2, "<=1000": 1, ">5000": 1}
+
+
+def test_building_the_pipeline_leaves_the_conversation_uncreated():
+    registry = ServiceRegistry()
+
+    class Conversation:
+        def process_user_input(self, text, on_sentence=None):
+            return f"chat: {text}"
+
+    registry.register("conversation", lambda r: Conversation())
+    conversation = registry.lazy("conversation")
+    pipeline = make_pipeline([([], "tell me about owls")], converse=deferred(conversation, "process_user_input"))
+    assert not registry.is_created("conversation")
+    assert pipeline.run_turn(timeout=2) == "chat: tell me about owls"
+    assert registry.is_created("conversation")
+
+
+if __name__ == "__main__":
+    test_command_is_routed_from_a_stable_partial_and_spoken()
+    test_conversation_streams_sentences_to_speech()
+    test_quiet_routes()
+    test_interrupt_from_another_thread()
+    test_histogram()
+    test_building_the_pipeline_leaves_the_conversation_uncreated()
+    print("✓ Voice pipeline tests passed")